@@ -1,7 +1,8 @@
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
-from sqlalchemy import pool
+from sqlalchemy import inspect, pool, text
+from sqlalchemy.exc import IntegrityError
 
 from alembic import context
 
@@ -9,6 +10,7 @@ from alembic import context
 from app.db.database import Base
 from app.models import *  # noqa: F401, F403
 from app.core.config import settings
+from app.models.schedule import POSTGRES_RANGE_DDL, POSTGRES_RANGE_INDEXES
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -26,6 +28,26 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 target_metadata = Base.metadata
 
+# Raised when existing shifts keep the overlap constraint from being added
+OVERLAPPING_SHIFTS_HINT = (
+    "schedule_intervals contains overlapping shifts, so the overlap exclusion "
+    "constraint cannot be added. List them with "
+    "`python -m app.workers.rebuild_intervals --check`, resolve them and run "
+    "`alembic upgrade head` again."
+)
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    """Keep autogenerate from dropping the objects of POSTGRES_RANGE_DDL"""
+    return not (type_ == "index" and reflected and name in POSTGRES_RANGE_INDEXES)
+
+
+def autogenerating() -> bool:
+    """alembic revision --autogenerate / alembic check only compare the schema"""
+    cmd = getattr(config.cmd_opts, "cmd", None)
+    return cmd is not None and cmd[0].__name__ in ("revision", "check")
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -48,12 +70,33 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
 
     with context.begin_transaction():
         context.run_migrations()
+        if url.startswith("postgresql") and not autogenerating():
+            for statement in POSTGRES_RANGE_DDL:
+                context.execute(statement)
+
+
+def apply_range_ddl(connection) -> None:
+    """GiST index and shift overlap constraint of schedule_intervals
+
+    Autogenerate cannot detect them, so they are applied at the end of every
+    upgrade, in the same transaction (the statements are idempotent).
+    """
+    if connection.dialect.name != "postgresql" or autogenerating():
+        return
+    if not inspect(connection).has_table("schedule_intervals"):
+        return
+    try:
+        for statement in POSTGRES_RANGE_DDL:
+            connection.execute(text(statement))
+    except IntegrityError as e:
+        raise RuntimeError(OVERLAPPING_SHIFTS_HINT) from e
 
 
 def run_migrations_online() -> None:
@@ -71,11 +114,14 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
             context.run_migrations()
+            apply_range_ddl(connection)
 
 
 if context.is_offline_mode():
@@ -0,0 +1,84 @@
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+from fastapi.requests import HTTPConnection
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from app.db.replicas import token_subject
+from app.services.admission import AdmissionRejected, Lease, admission_controller
+
+
+class AdmissionSlot:
+    """Concurrency slot of an admitted request, released exactly once
+
+    The dependency releases it when the endpoint returns. A streamed body is
+    produced after that, so endpoints returning a StreamingResponse pass it
+    to ``hold`` to keep the slot until the body has been sent.
+    """
+
+    def __init__(self, lease: Optional[Lease]):
+        self._lease = lease
+        self._released = False
+        self.streaming = False
+
+    async def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        await admission_controller.release(self._lease)
+
+    def hold(self, response: StreamingResponse) -> StreamingResponse:
+        """Release the slot once ``response``'s body is sent, fails or the client goes away"""
+        self.streaming = True
+        body = response.body_iterator
+
+        async def body_then_release() -> AsyncIterator:
+            try:
+                async for chunk in body:
+                    yield chunk
+            finally:
+                await self.release()
+
+        response.body_iterator = body_then_release()
+        if response.background is None:
+            # Also runs when the client disconnects before the body starts
+            response.background = BackgroundTask(self.release)
+        return response
+
+
+def admission(route_class: str, cost: float = 1):
+    """Dependency admitting a request of ``route_class`` weighing ``cost``
+
+    Declare it in the route's ``dependencies`` (or as the first parameter,
+    to get the AdmissionSlot) so it runs before the session and user
+    dependencies: a refused request (429/503 with Retry-After) never touches
+    the database. Callers are identified by their token's subject (no DB
+    lookup), anonymous ones by client address. The slot is held until the
+    endpoint returns, or until a body passed to ``AdmissionSlot.hold`` is
+    sent.
+    """
+    admission_controller.limits(route_class)  # fail at import on a typo
+
+    async def admit(connection: HTTPConnection):
+        subject = token_subject(connection) or (
+            f"addr:{connection.client.host}" if connection.client else "anonymous"
+        )
+        try:
+            lease = await admission_controller.admit(route_class, cost, subject)
+        except AdmissionRejected as e:
+            raise HTTPException(
+                status_code=e.status_code,
+                detail=e.detail,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        slot = AdmissionSlot(lease)
+        try:
+            yield slot
+        except BaseException:
+            await slot.release()
+            raise
+        if not slot.streaming:
+            await slot.release()
+
+    return admit
@@ -1,12 +1,14 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.db.database import get_db
+from app.db.replicas import get_read_db
 from app.core.security import verify_token
 from app.models.user import User
 from typing import Optional
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
 
 
 def get_current_user(
@@ -34,6 +36,33 @@ def get_current_user(
     return user
 
 
+def get_current_user_for_stream(
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    access_token: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+) -> User:
+    """Get current user for streaming endpoints
+
+    Browsers' EventSource/WebSocket APIs cannot set headers, so the token may
+    also be passed as the ``access_token`` query parameter.
+    """
+    token = token or access_token
+    if token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return get_current_user(token, db)
+
+
+def get_current_read_user(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)
+) -> User:
+    """Get current user for read-only endpoints (same session as ``get_read_db``)"""
+    return get_current_user(token, db)
+
+
 def get_current_admin_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -44,3 +73,10 @@ def get_current_admin_user(
             detail="Admin access required",
         )
     return current_user
+
+
+def get_current_admin_read_user(
+    current_user: User = Depends(get_current_read_user),
+) -> User:
+    """Get current admin user for read-only endpoints"""
+    return get_current_admin_user(current_user)
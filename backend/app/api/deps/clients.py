@@ -0,0 +1,13 @@
+import httpx
+
+from app.core.http_clients import HTTPClients, http_clients
+
+
+def get_http_clients() -> HTTPClients:
+    """Dependency to get the shared outbound client registry"""
+    return http_clients
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Dependency to get the shared pooled HTTP client"""
+    return http_clients.http
@@ -0,0 +1,334 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import Response
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import date, datetime, time, timedelta
+import uuid
+
+import numpy as np
+
+from app.db.replicas import get_read_db
+from app.api.deps.auth import get_current_admin_read_user
+from app.api.deps.admission import admission
+from app.models.user import User
+from app.models.project import Project
+from app.models.shift import ConfirmedShift
+from app.models.workload import MonthlyWorkload
+from app.schemas.analytics import (
+    CoverageResponse,
+    CoverageProject,
+    LLMUsageResponse,
+    LLMUsageRow,
+    WorkloadResponse,
+    WorkloadMember,
+    WorkloadProject,
+    StaffingResponse,
+    StaffingProject,
+)
+from app.services.analytics import AnalyticsService, MINUTES_PER_DAY
+from app.services.llm_usage import LLMUsageService
+from app.services.single_flight import SingleFlight, single_flight
+
+router = APIRouter()
+
+
+def parse_month(month: str) -> date:
+    """Parse YYYY-MM into the first day of the month"""
+    try:
+        return datetime.strptime(month, "%Y-%m").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="month must be in YYYY-MM format",
+        )
+
+
+def add_months(day: date, months: int) -> date:
+    """First day of the month ``months`` after ``day``"""
+    total = day.year * 12 + day.month - 1 + months
+    return date(total // 12, total % 12 + 1, 1)
+
+
+@router.get(
+    "/coverage",
+    response_model=CoverageResponse,
+    dependencies=[Depends(admission("bulk", cost=2))],
+)
+async def get_coverage(
+    month: str = Query(..., description="YYYY-MM"),
+    months: int = Query(1, ge=1, le=12),
+    bucket_minutes: int = Query(60),
+    day_start: time = Query(time(0, 0)),
+    day_end: Optional[time] = Query(None, description="Defaults to end of day"),
+    project_id: Optional[uuid.UUID] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin_read_user),
+):
+    """Assigned headcount vs. required members per project, day and time bucket (admin only)"""
+    if bucket_minutes <= 0 or MINUTES_PER_DAY % bucket_minutes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="bucket_minutes must divide 1440",
+        )
+
+    start_minute = day_start.hour * 60 + day_start.minute
+    end_minute = day_end.hour * 60 + day_end.minute if day_end else MINUTES_PER_DAY
+    if end_minute <= start_minute:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="day_end must be after day_start",
+        )
+
+    start_date = parse_month(month)
+    end_date = add_months(start_date, months) - timedelta(days=1)
+    days = (end_date - start_date).days + 1
+
+    def render() -> bytes:
+        project_query = db.query(Project).filter(Project.is_active == True)
+        if project_id:
+            project_query = project_query.filter(Project.id == project_id)
+        projects = project_query.order_by(Project.name).all()
+        project_ids = [p.id for p in projects]
+
+        # Only the columns the matrix needs, for the whole range in one query
+        rows = []
+        if project_ids:
+            rows = (
+                db.query(
+                    ConfirmedShift.project_id,
+                    ConfirmedShift.date,
+                    ConfirmedShift.start_time,
+                    ConfirmedShift.end_time,
+                )
+                .filter(ConfirmedShift.date >= start_date)
+                .filter(ConfirmedShift.date <= end_date)
+                .filter(ConfirmedShift.project_id.in_(project_ids))
+                .all()
+            )
+
+        headcount = AnalyticsService.coverage_matrix(
+            project_ids,
+            start_date,
+            days,
+            rows,
+            bucket_minutes=bucket_minutes,
+            day_start_minute=start_minute,
+            day_end_minute=end_minute,
+        )
+
+        first_bucket = start_minute // bucket_minutes
+        bucket_labels = [
+            f"{m // 60:02d}:{m % 60:02d}"
+            for m in range(first_bucket * bucket_minutes, end_minute, bucket_minutes)
+        ]
+
+        required = np.array([p.required_members for p in projects], dtype=np.int32)
+        met = headcount >= required[:, None, None]
+        total_buckets = days * len(bucket_labels)
+
+        response = CoverageResponse(
+            start_date=start_date,
+            end_date=end_date,
+            bucket_minutes=bucket_minutes,
+            dates=[start_date + timedelta(days=d) for d in range(days)],
+            buckets=bucket_labels,
+            projects=[
+                CoverageProject(
+                    id=p.id,
+                    name=p.name,
+                    color=p.color,
+                    required_members=p.required_members,
+                    understaffed_buckets=int(total_buckets - met[i].sum()),
+                    coverage_rate=round(float(met[i].mean()) * 100, 1) if total_buckets else 0.0,
+                )
+                for i, p in enumerate(projects)
+            ],
+            headcount=headcount.tolist(),
+        )
+        return response.model_dump_json().encode()
+
+    key = await SingleFlight.key(
+        "coverage",
+        "admin",
+        {
+            "start_date": start_date,
+            "months": months,
+            "bucket_minutes": bucket_minutes,
+            "start_minute": start_minute,
+            "end_minute": end_minute,
+            "project_id": project_id,
+        },
+        db,
+    )
+    return Response(content=await single_flight.do(key, render, db), media_type="application/json")
+
+
+@router.get("/llm-usage", response_model=LLMUsageResponse)
+async def get_llm_usage(
+    month: str = Query(..., description="YYYY-MM"),
+    months: int = Query(1, ge=1, le=12),
+    provider: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin_read_user),
+):
+    """LLM calls, tokens, latency and estimated cost by month and provider (admin only)"""
+    start = parse_month(month)
+    start_month = f"{start:%Y-%m}"
+    end_month = f"{add_months(start, months):%Y-%m}"
+
+    rows = [
+        LLMUsageRow(**row)
+        for row in LLMUsageService.aggregate(db, start_month, end_month, provider)
+    ]
+    return LLMUsageResponse(
+        start_month=start_month,
+        end_month=end_month,
+        rows=rows,
+        total_cost_usd=round(sum(r.cost_usd for r in rows), 6),
+        total_input_tokens=sum(r.input_tokens for r in rows),
+        total_output_tokens=sum(r.output_tokens for r in rows),
+    )
+
+
+@router.get("/workload", response_model=WorkloadResponse)
+async def get_workload(
+    month: str = Query(..., description="YYYY-MM"),
+    months: int = Query(1, ge=1, le=12),
+    user_id: Optional[uuid.UUID] = Query(None),
+    project_id: Optional[uuid.UUID] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin_read_user),
+):
+    """Confirmed shifts and hours per member and project (admin only)
+
+    Read from monthly_workloads, so the cost follows the number of members
+    and projects rather than the shift history.
+    """
+    start = parse_month(month)
+    start_month = f"{start:%Y-%m}"
+    end_month = f"{add_months(start, months):%Y-%m}"
+
+    def render() -> bytes:
+        query = db.query(
+            MonthlyWorkload.user_id,
+            MonthlyWorkload.project_id,
+            func.sum(MonthlyWorkload.shift_count),
+            func.sum(MonthlyWorkload.total_minutes),
+        ).filter(MonthlyWorkload.month >= start_month, MonthlyWorkload.month < end_month)
+        if user_id:
+            query = query.filter(MonthlyWorkload.user_id == user_id)
+        if project_id:
+            query = query.filter(MonthlyWorkload.project_id == project_id)
+        rows = query.group_by(MonthlyWorkload.user_id, MonthlyWorkload.project_id).all()
+
+        users = {
+            u.id: u
+            for u in db.query(User.id, User.name, User.email).filter(
+                User.id.in_({row[0] for row in rows})
+            )
+        }
+        project_names = dict(
+            db.query(Project.id, Project.name).filter(Project.id.in_({row[1] for row in rows})).all()
+        )
+
+        by_user = {}
+        for row_user_id, row_project_id, shift_count, total_minutes in rows:
+            by_user.setdefault(row_user_id, []).append(
+                WorkloadProject(
+                    project_id=row_project_id,
+                    project_name=project_names.get(row_project_id, ""),
+                    shift_count=int(shift_count),
+                    total_minutes=int(total_minutes),
+                )
+            )
+
+        members = []
+        for member_id, projects in by_user.items():
+            user = users.get(member_id)
+            total_minutes = sum(p.total_minutes for p in projects)
+            members.append(
+                WorkloadMember(
+                    user_id=member_id,
+                    name=user.name if user else "",
+                    email=user.email if user else "",
+                    shift_count=sum(p.shift_count for p in projects),
+                    total_minutes=total_minutes,
+                    total_hours=round(total_minutes / 60, 2),
+                    projects=sorted(projects, key=lambda p: -p.total_minutes),
+                )
+            )
+        members.sort(key=lambda m: (-m.total_minutes, m.name))
+
+        response = WorkloadResponse(start_month=start_month, end_month=end_month, members=members)
+        return response.model_dump_json().encode()
+
+    key = await SingleFlight.key(
+        "workload",
+        "admin",
+        {"start_month": start_month, "end_month": end_month, "user_id": user_id, "project_id": project_id},
+        db,
+    )
+    return Response(content=await single_flight.do(key, render, db), media_type="application/json")
+
+
+@router.get("/staffing", response_model=StaffingResponse)
+async def get_staffing(
+    month: str = Query(..., description="YYYY-MM"),
+    months: int = Query(1, ge=1, le=12),
+    project_id: Optional[uuid.UUID] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_admin_read_user),
+):
+    """Confirmed members, shifts and hours per active project (admin only, from monthly_workloads)"""
+    start = parse_month(month)
+    start_month = f"{start:%Y-%m}"
+    end_month = f"{add_months(start, months):%Y-%m}"
+
+    def render() -> bytes:
+        project_query = db.query(Project).filter(Project.is_active == True)
+        if project_id:
+            project_query = project_query.filter(Project.id == project_id)
+        projects = project_query.order_by(Project.name).all()
+
+        totals = {
+            row[0]: row[1:]
+            for row in db.query(
+                MonthlyWorkload.project_id,
+                func.count(func.distinct(MonthlyWorkload.user_id)),
+                func.sum(MonthlyWorkload.shift_count),
+                func.sum(MonthlyWorkload.total_minutes),
+            )
+            .filter(
+                MonthlyWorkload.month >= start_month,
+                MonthlyWorkload.month < end_month,
+                MonthlyWorkload.project_id.in_([p.id for p in projects]),
+            )
+            .group_by(MonthlyWorkload.project_id)
+        }
+
+        staffing = []
+        for project in projects:
+            member_count, shift_count, total_minutes = totals.get(project.id, (0, 0, 0))
+            staffing.append(
+                StaffingProject(
+                    id=project.id,
+                    name=project.name,
+                    color=project.color,
+                    member_count=int(member_count),
+                    shift_count=int(shift_count),
+                    total_minutes=int(total_minutes),
+                    total_hours=round(int(total_minutes) / 60, 2),
+                )
+            )
+
+        response = StaffingResponse(start_month=start_month, end_month=end_month, projects=staffing)
+        return response.model_dump_json().encode()
+
+    key = await SingleFlight.key(
+        "staffing",
+        "admin",
+        {"start_month": start_month, "end_month": end_month, "project_id": project_id},
+        db,
+    )
+    return Response(content=await single_flight.do(key, render, db), media_type="application/json")
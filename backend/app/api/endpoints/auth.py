@@ -1,72 +1,93 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.schemas.auth import GoogleAuthRequest, AuthResponse, UserResponse
+from app.db.database import get_db, get_write_db
+from app.db.types import new_id
+from app.api.deps.auth import get_current_user
+from app.api.deps.clients import get_http_client
+from app.schemas.auth import GoogleAuthRequest, AuthResponse, UserResponse, UserUpdate
 from app.services.google_oauth import GoogleOAuthService
 from app.models.user import User
 from app.core.security import create_access_token, create_refresh_token
-from datetime import datetime, timedelta
-import uuid
+from typing import Dict
+import httpx
 
 router = APIRouter()
 
 
+def upsert_google_user(db: Session, identity: Dict, tokens: Dict) -> User:
+    """Create or update the user for a Google account in one statement"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"Unsupported database dialect: {dialect}")
+
+    stmt = insert(User).values(
+        id=new_id(),
+        google_id=identity["id"],
+        email=identity["email"],
+        name=identity.get("name") or identity["email"],
+        avatar_url=identity.get("picture"),
+        role="member",
+        google_access_token=tokens["access_token"],
+        google_refresh_token=tokens.get("refresh_token"),
+        token_expires_at=tokens.get("expiry"),
+    )
+    updates = {
+        "google_access_token": stmt.excluded.google_access_token,
+        # Google only returns a refresh token on first consent
+        "google_refresh_token": func.coalesce(
+            stmt.excluded.google_refresh_token, User.google_refresh_token
+        ),
+        "token_expires_at": stmt.excluded.token_expires_at,
+        "avatar_url": stmt.excluded.avatar_url,
+        "updated_at": func.now(),
+    }
+    if identity.get("name"):
+        updates["name"] = stmt.excluded.name
+    stmt = stmt.on_conflict_do_update(index_elements=[User.google_id], set_=updates)
+
+    return db.scalars(
+        stmt.returning(User), execution_options={"populate_existing": True}
+    ).one()
+
+
 @router.post("/google", response_model=AuthResponse)
 async def google_auth(
     request: GoogleAuthRequest,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
+    http: httpx.AsyncClient = Depends(get_http_client),
 ):
     """Authenticate with Google OAuth"""
     try:
         # Exchange code for tokens
         redirect_uri = request.redirect_uri or "http://localhost:3000/oauth2callback"
         tokens = await GoogleOAuthService.exchange_code_for_tokens(
-            request.code, redirect_uri
+            request.code, redirect_uri, http
         )
 
-        # Get user info from Google
-        user_info = await GoogleOAuthService.get_user_info(tokens["access_token"])
+        # Identity from the locally verified ID token (userinfo only as fallback)
+        user_info = await GoogleOAuthService.get_identity(tokens, http)
         if not user_info:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Failed to get user info from Google",
             )
 
-        # Check if user exists
-        user = db.query(User).filter(User.google_id == user_info["id"]).first()
-
-        if not user:
-            # Create new user
-            user = User(
-                id=str(uuid.uuid4()),
-                google_id=user_info["id"],
-                email=user_info["email"],
-                name=user_info.get("name", user_info["email"]),
-                avatar_url=user_info.get("picture"),
-                role="member",
-                google_access_token=tokens["access_token"],
-                google_refresh_token=tokens.get("refresh_token"),
-                token_expires_at=tokens.get("expiry"),
-            )
-            db.add(user)
-        else:
-            # Update existing user tokens
-            user.google_access_token = tokens["access_token"]
-            if tokens.get("refresh_token"):
-                user.google_refresh_token = tokens["refresh_token"]
-            user.token_expires_at = tokens.get("expiry")
-            user.avatar_url = user_info.get("picture")
-            user.name = user_info.get("name", user.name)
-
+        user = upsert_google_user(db, user_info, tokens)
+        # Built before commit, which would expire the returned row
+        user_response = UserResponse.model_validate(user)
         db.commit()
-        db.refresh(user)
 
         # Create JWT tokens
-        access_token = create_access_token({"sub": user.id})
-        refresh_token = create_refresh_token({"sub": user.id})
+        access_token = create_access_token({"sub": user_response.id})
+        refresh_token = create_refresh_token({"sub": user_response.id})
 
         return AuthResponse(
-            user=UserResponse.model_validate(user),
+            user=user_response,
             access_token=access_token,
             refresh_token=refresh_token,
         )
@@ -88,3 +109,17 @@ async def get_current_user_info(
 
     user = get_current_user(current_user)
     return UserResponse.model_validate(user)
+
+
+@router.patch("/me", response_model=UserResponse)
+async def update_current_user(
+    update: UserUpdate,
+    db: Session = Depends(get_write_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Update the current user's settings"""
+    if update.share_google_busy is not None:
+        current_user.share_google_busy = update.share_google_busy
+    db.commit()
+    db.refresh(current_user)
+    return UserResponse.model_validate(current_user)
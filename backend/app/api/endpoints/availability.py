@@ -0,0 +1,189 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from datetime import datetime, time, timedelta
+import asyncio
+
+from app.db.database import get_db
+from app.api.deps.auth import get_current_user
+from app.api.deps.admission import admission
+from app.models.user import User
+from app.models.shift import ConfirmedShift
+from app.models.meeting import Meeting, MeetingParticipant
+from app.models.project import ProjectMember
+from app.schemas.availability import (
+    CommonSlotsRequest,
+    CommonSlotsResponse,
+    CandidateSlot,
+)
+from app.services.availability import AvailabilityService, SLOT_MINUTES
+from app.services.google_tokens import token_manager
+
+router = APIRouter()
+
+MAX_RANGE_DAYS = 92
+GOOGLE_BUSY_PARALLEL = 8  # concurrent free/busy lookups per request
+
+
+def visible_user_ids(db: Session, user: User, user_ids: list) -> set:
+    """The subset of ``user_ids`` whose schedule ``user`` may see
+
+    Admins see everyone; members see themselves and the users they share a
+    project or a meeting with.
+    """
+    if user.role == "admin":
+        return set(user_ids)
+    my_projects = db.query(ProjectMember.project_id).filter(ProjectMember.user_id == user.id)
+    my_meetings = db.query(MeetingParticipant.meeting_id).filter(
+        MeetingParticipant.user_id == user.id
+    )
+    visible = {user.id}
+    visible.update(
+        uid
+        for (uid,) in db.query(ProjectMember.user_id)
+        .filter(ProjectMember.user_id.in_(user_ids))
+        .filter(ProjectMember.project_id.in_(my_projects))
+    )
+    visible.update(
+        uid
+        for (uid,) in db.query(MeetingParticipant.user_id)
+        .filter(MeetingParticipant.user_id.in_(user_ids))
+        .filter(MeetingParticipant.meeting_id.in_(my_meetings))
+    )
+    return visible
+
+
+@router.post(
+    "/common-slots",
+    response_model=CommonSlotsResponse,
+    dependencies=[Depends(admission("google", cost=5))],
+)
+async def find_common_slots(
+    request: CommonSlotsRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Find meeting slots where the most participants are free
+
+    Members may only include users they share a project or meeting with.
+    Google free/busy is read for the caller and for participants who have
+    turned on ``share_google_busy``.
+    """
+    days = (request.end_date - request.start_date).days + 1
+    if days < 1 or days > MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range must be between 1 and {MAX_RANGE_DAYS} days",
+        )
+    if request.work_end <= request.work_start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="work_end must be after work_start",
+        )
+
+    participant_ids = list(dict.fromkeys(str(uid) for uid in request.participant_ids))
+    if set(participant_ids) - visible_user_ids(db, current_user, participant_ids):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view these participants' availability",
+        )
+    range_start = datetime.combine(request.start_date, time.min)
+    range_end = range_start + timedelta(days=days)
+
+    # Confirmed shifts in range
+    shift_rows = (
+        db.query(
+            ConfirmedShift.user_id,
+            ConfirmedShift.date,
+            ConfirmedShift.start_time,
+            ConfirmedShift.end_time,
+        )
+        .filter(ConfirmedShift.user_id.in_(participant_ids))
+        .filter(ConfirmedShift.date >= request.start_date)
+        .filter(ConfirmedShift.date <= request.end_date)
+        .all()
+    )
+    intervals = AvailabilityService.shift_intervals(shift_rows)
+
+    # Meetings the participants have not declined
+    meeting_rows = (
+        db.query(
+            MeetingParticipant.user_id,
+            Meeting.start_datetime,
+            Meeting.end_datetime,
+        )
+        .join(Meeting, Meeting.id == MeetingParticipant.meeting_id)
+        .filter(MeetingParticipant.user_id.in_(participant_ids))
+        .filter(MeetingParticipant.status != "declined")
+        .filter(Meeting.start_datetime < range_end)
+        .filter(Meeting.end_datetime > range_start)
+        .all()
+    )
+    intervals.extend(tuple(row) for row in meeting_rows)
+
+    if request.include_google_busy:
+        users = (
+            db.query(
+                User.id,
+                User.google_access_token,
+                User.google_refresh_token,
+                User.token_expires_at,
+            )
+            .filter(User.id.in_(participant_ids))
+            .filter(User.google_refresh_token.isnot(None))
+            .filter(or_(User.id == current_user.id, User.share_google_busy.is_(True)))
+            .all()
+        )
+        # One token check and free/busy query per participant, in parallel
+        parallel = asyncio.Semaphore(GOOGLE_BUSY_PARALLEL)
+
+        async def google_busy(user) -> list:
+            async with parallel:
+                access_token = await token_manager.get_access_token(user)
+                if not access_token:
+                    return []
+                return await AvailabilityService.get_google_busy(
+                    user.id,
+                    access_token,
+                    user.google_refresh_token,
+                    request.start_date,
+                    request.end_date,
+                )
+
+        for busy in await asyncio.gather(*(google_busy(user) for user in users)):
+            intervals.extend(busy)
+
+    busy = AvailabilityService.build_busy_bitmap(
+        participant_ids, request.start_date, days, intervals
+    )
+    candidates = AvailabilityService.find_common_slots(
+        busy,
+        start_date=request.start_date,
+        duration_minutes=request.duration_minutes,
+        work_start=request.work_start,
+        work_end=request.work_end,
+        exclude_weekends=request.exclude_weekends,
+        min_available=min(request.min_available, len(participant_ids)),
+        limit=request.limit,
+    )
+
+    duration = timedelta(minutes=request.duration_minutes)
+    slots = []
+    for start, free in candidates:
+        available = [uid for uid, is_free in zip(participant_ids, free) if is_free]
+        unavailable = [uid for uid, is_free in zip(participant_ids, free) if not is_free]
+        slots.append(
+            CandidateSlot(
+                start_datetime=start,
+                end_datetime=start + duration,
+                available_count=len(available),
+                available_user_ids=available,
+                unavailable_user_ids=unavailable,
+            )
+        )
+
+    return CommonSlotsResponse(
+        participant_count=len(participant_ids),
+        slot_minutes=SLOT_MINUTES,
+        slots=slots,
+    )
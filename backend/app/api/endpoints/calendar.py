@@ -1,14 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+import uuid
 
-from app.db.database import get_db
-from app.api.deps.auth import get_current_user
+from app.db.database import get_write_db
+from app.db.replicas import get_read_db
+from app.api.deps.auth import get_current_user, get_current_read_user
+from app.api.deps.admission import admission
 from app.models.user import User
 from app.models.shift import ConfirmedShift
 from app.models.meeting import Meeting
-from app.models.project import Project
-from app.services.google_calendar import GoogleCalendarService
+from app.models.outbox import CalendarOutbox
+from app.services.calendar_outbox import CalendarOutboxService
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -17,22 +19,30 @@ router = APIRouter()
 class SyncShiftRequest(BaseModel):
     """Sync shift to calendar request"""
 
-    shift_id: str
+    shift_id: uuid.UUID
 
 
 class SyncMeetingRequest(BaseModel):
     """Sync meeting to calendar request"""
 
-    meeting_id: str
+    meeting_id: uuid.UUID
 
 
-@router.post("/sync/shift")
+def queued_response(row: CalendarOutbox, message: str) -> dict:
+    return {"message": message, "outbox_id": row.id, "status": row.status}
+
+
+@router.post(
+    "/sync/shift",
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(admission("google"))],
+)
 async def sync_shift_to_calendar(
     request: SyncShiftRequest,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Sync a confirmed shift to Google Calendar"""
+    """Queue a confirmed shift for sync to Google Calendar"""
 
     # Get shift
     shift = db.query(ConfirmedShift).filter(ConfirmedShift.id == request.shift_id).first()
@@ -54,46 +64,23 @@ async def sync_shift_to_calendar(
             detail="Google Calendar not connected",
         )
 
-    # Get project
-    project = db.query(Project).filter(Project.id == shift.project_id).first()
-
-    # Create calendar event
-    start_datetime = datetime.combine(shift.date, shift.start_time)
-    end_datetime = datetime.combine(shift.date, shift.end_time)
-
-    result = await GoogleCalendarService.create_shift_event(
-        user_access_token=current_user.google_access_token,
-        user_refresh_token=current_user.google_refresh_token,
-        title=f"シフト: {project.name if project else 'プロジェクト'}",
-        description=shift.comment or "",
-        start_datetime=start_datetime,
-        end_datetime=end_datetime,
-    )
-
-    if not result:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to create calendar event",
-        )
-
-    # Update shift with calendar event ID
-    shift.calendar_event_id = result["event_id"]
+    row = CalendarOutboxService.enqueue(db, current_user.id, "shift", shift.id, "upsert")
     db.commit()
 
-    return {
-        "message": "Shift synced to calendar successfully",
-        "event_id": result["event_id"],
-        "html_link": result.get("html_link"),
-    }
+    return queued_response(row, "Shift queued for calendar sync")
 
 
-@router.post("/sync/meeting")
+@router.post(
+    "/sync/meeting",
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(admission("google"))],
+)
 async def sync_meeting_to_calendar(
     request: SyncMeetingRequest,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Sync a meeting to Google Calendar with Meet link"""
+    """Queue a meeting for sync to Google Calendar with Meet link"""
 
     # Get meeting
     meeting = db.query(Meeting).filter(Meeting.id == request.meeting_id).first()
@@ -116,59 +103,23 @@ async def sync_meeting_to_calendar(
             detail="Google Calendar not connected",
         )
 
-    # Get participants
-    from app.models.meeting import MeetingParticipant
-
-    participants = (
-        db.query(MeetingParticipant)
-        .filter(MeetingParticipant.meeting_id == meeting.id)
-        .all()
-    )
-
-    participant_emails = []
-    for p in participants:
-        user = db.query(User).filter(User.id == p.user_id).first()
-        if user:
-            participant_emails.append(user.email)
-
-    # Create calendar event with Meet link
-    result = await GoogleCalendarService.create_meeting_event(
-        user_access_token=current_user.google_access_token,
-        user_refresh_token=current_user.google_refresh_token,
-        title=meeting.title,
-        description=meeting.description or "",
-        start_datetime=meeting.start_datetime,
-        end_datetime=meeting.end_datetime,
-        attendees=participant_emails,
-        create_meet_link=True,
-    )
-
-    if not result:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to create calendar event",
-        )
-
-    # Update meeting with calendar event ID and Meet link
-    meeting.calendar_event_id = result["event_id"]
-    meeting.meet_link = result.get("meet_link")
+    row = CalendarOutboxService.enqueue(db, current_user.id, "meeting", meeting.id, "upsert")
     db.commit()
 
-    return {
-        "message": "Meeting synced to calendar successfully",
-        "event_id": result["event_id"],
-        "html_link": result.get("html_link"),
-        "meet_link": result.get("meet_link"),
-    }
+    return queued_response(row, "Meeting queued for calendar sync")
 
 
-@router.delete("/sync/shift/{shift_id}")
+@router.delete(
+    "/sync/shift/{shift_id}",
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(admission("google"))],
+)
 async def remove_shift_from_calendar(
-    shift_id: str,
-    db: Session = Depends(get_db),
+    shift_id: uuid.UUID,
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Remove a shift from Google Calendar"""
+    """Queue removal of a shift from Google Calendar"""
 
     shift = db.query(ConfirmedShift).filter(ConfirmedShift.id == shift_id).first()
     if not shift:
@@ -187,21 +138,36 @@ async def remove_shift_from_calendar(
             detail="Shift not synced to calendar",
         )
 
-    # Delete from calendar
-    success = await GoogleCalendarService.delete_event(
-        user_access_token=current_user.google_access_token,
-        user_refresh_token=current_user.google_refresh_token,
-        event_id=shift.calendar_event_id,
+    row = CalendarOutboxService.enqueue(
+        db, current_user.id, "shift", shift.id, "delete", calendar_event_id=shift.calendar_event_id
     )
+    db.commit()
 
-    if not success:
+    return queued_response(row, "Shift queued for removal from calendar")
+
+
+@router.get("/outbox/{outbox_id}")
+async def get_outbox_status(
+    outbox_id: uuid.UUID,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
+):
+    """Get the status of a queued calendar write"""
+    row = db.query(CalendarOutbox).filter(CalendarOutbox.id == outbox_id).first()
+    if not row or row.user_id != current_user.id:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to delete calendar event",
+            status_code=status.HTTP_404_NOT_FOUND, detail="Outbox entry not found"
         )
 
-    # Remove calendar event ID from shift
-    shift.calendar_event_id = None
-    db.commit()
-
-    return {"message": "Shift removed from calendar successfully"}
+    return {
+        "id": row.id,
+        "entity_type": row.entity_type,
+        "entity_id": row.entity_id,
+        "operation": row.operation,
+        "status": row.status,
+        "attempts": row.attempts,
+        "next_attempt_at": row.next_attempt_at,
+        "last_error": row.last_error,
+        "result": row.result,
+        "completed_at": row.completed_at,
+    }
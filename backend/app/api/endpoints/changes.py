@@ -0,0 +1,104 @@
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+import asyncio
+
+from app.db.database import SessionLocal
+from app.api.deps.auth import get_current_user
+from app.models.project import ProjectMember
+from app.services.changes import change_hub, user_scope
+from app.services.pubsub import OverflowQueue
+
+router = APIRouter()
+
+
+def is_scope_allowed(scope: str, user_id: str, is_admin: bool, project_ids: set) -> bool:
+    """Whether a user may subscribe to a scope"""
+    if not isinstance(scope, str):
+        return False
+    kind, _, value = scope.partition(":")
+    if not value:
+        return False
+    if is_admin:
+        # Month scopes carry every member's changes, so they are admin-only
+        return kind in ("user", "project") or (kind == "month" and len(value) == 7)
+    if kind == "user":
+        return value == user_id
+    if kind == "project":
+        return value in project_ids
+    return False
+
+
+@router.websocket("/ws")
+async def change_stream(websocket: WebSocket, access_token: str = Query(...)):
+    """WebSocket stream of change events for subscribed scopes
+
+    Send ``{"subscribe": ["project:<id>", "month:2025-12"]}`` or
+    ``{"unsubscribe": [...]}``; the user's own scope is subscribed on connect
+    (month scopes are admin-only). Events look like ``{"entity", "id", "op",
+    "scopes", "version"}``; a client too slow to keep up gets
+    ``{"type": "resync"}`` instead of the events it missed.
+    """
+    db = SessionLocal()
+    try:
+        try:
+            user = get_current_user(access_token, db)
+        except HTTPException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        user_id = user.id
+        is_admin = user.role == "admin"
+        project_ids = {
+            project_id
+            for (project_id,) in db.query(ProjectMember.project_id)
+            .filter(ProjectMember.user_id == user_id)
+            .all()
+        }
+    finally:
+        db.close()
+
+    await websocket.accept()
+
+    queue = OverflowQueue(maxsize=100)
+    scopes = {user_scope(user_id)}
+    change_hub.subscribe(scopes, queue)
+
+    async def sender():
+        while True:
+            item = await queue.get()
+            if queue.overflowed:
+                # Events were dropped for this slow client: it has to re-fetch
+                queue.reset()
+                item = {"type": "resync", "scopes": sorted(scopes)}
+            await websocket.send_json(item)
+
+    sender_task = asyncio.create_task(sender())
+    try:
+        while True:
+            message = await websocket.receive_json()
+            if not isinstance(message, dict):
+                queue.put_nowait({"type": "error", "detail": "Expected a JSON object"})
+                continue
+            subscribe, unsubscribe = message.get("subscribe", []), message.get("unsubscribe", [])
+            if not isinstance(subscribe, list) or not isinstance(unsubscribe, list):
+                queue.put_nowait({"type": "error", "detail": "subscribe/unsubscribe must be lists"})
+                continue
+            rejected = []
+
+            for scope in subscribe:
+                if is_scope_allowed(scope, user_id, is_admin, project_ids):
+                    scopes.add(scope)
+                    change_hub.subscribe([scope], queue)
+                else:
+                    rejected.append(scope)
+
+            removed = [s for s in unsubscribe if isinstance(s, str) and s in scopes]
+            scopes.difference_update(removed)
+            change_hub.unsubscribe(removed, queue)
+
+            queue.put_nowait(
+                {"type": "subscribed", "scopes": sorted(scopes), "rejected": rejected}
+            )
+    except (WebSocketDisconnect, ValueError):
+        pass
+    finally:
+        sender_task.cancel()
+        change_hub.unsubscribe(scopes, queue)
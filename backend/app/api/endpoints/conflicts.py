@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+import uuid
+
+from app.db.replicas import get_read_db
+from app.api.deps.auth import get_current_read_user
+from app.models.user import User
+from app.schemas.conflict import ConflictResponse, ScheduleIntervalResponse
+from app.services.conflicts import ConflictService
+
+router = APIRouter()
+
+
+@router.get("", response_model=List[ConflictResponse])
+async def get_conflicts(
+    start: datetime = Query(...),
+    end: datetime = Query(...),
+    user_id: Optional[uuid.UUID] = Query(None),
+    project_id: Optional[uuid.UUID] = Query(None),
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
+):
+    """Get overlapping shifts/meetings for a user or project in a range"""
+    if end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end must be after start",
+        )
+
+    user_id = str(user_id) if user_id else None
+    project_id = str(project_id) if project_id else None
+    if not user_id and not project_id:
+        user_id = current_user.id
+
+    if current_user.role != "admin" and (project_id or user_id != current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Access denied"
+        )
+
+    pairs = ConflictService.find_conflicts(
+        db, start, end, user_id=user_id, project_id=project_id, limit=limit
+    )
+
+    return [
+        ConflictResponse(
+            user_id=first.user_id,
+            first=ScheduleIntervalResponse.model_validate(first),
+            second=ScheduleIntervalResponse.model_validate(second),
+            overlap_start=max(first.start_at, second.start_at),
+            overlap_end=min(first.end_at, second.end_at),
+        )
+        for first, second in pairs
+    ]
@@ -0,0 +1,157 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import List
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+import secrets
+import uuid
+
+from app.db.database import get_write_db, SessionLocal
+from app.db.replicas import get_read_db, replica_router
+from app.db.types import new_id
+from app.api.deps.auth import get_current_user, get_current_read_user
+from app.models.feed import CalendarFeed
+from app.models.project import Project, ProjectMember
+from app.models.user import User
+from app.schemas.feed import CalendarFeedCreate, CalendarFeedResponse
+from app.services.feeds import FeedService
+
+router = APIRouter()
+
+ICS_MEDIA_TYPE = "text/calendar; charset=utf-8"
+
+
+def feed_response(request: Request, feed: CalendarFeed) -> CalendarFeedResponse:
+    return CalendarFeedResponse(
+        id=feed.id,
+        project_id=feed.project_id,
+        url=str(request.url_for("get_feed", token=feed.token)),
+        created_at=feed.created_at,
+    )
+
+
+def not_modified(request: Request, etag: str, stamp: int) -> bool:
+    """Conditional GET; If-None-Match wins over If-Modified-Since (RFC 9110 13.2.2)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # Last-Modified has one-second resolution
+        return datetime.fromtimestamp(stamp // 1000, timezone.utc) <= since
+    return False
+
+
+@router.post("", response_model=CalendarFeedResponse, status_code=status.HTTP_201_CREATED)
+async def create_feed(
+    feed_data: CalendarFeedCreate,
+    request: Request,
+    db: Session = Depends(get_write_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Create an iCalendar feed of your own schedule or of a project you belong to"""
+    if feed_data.project_id:
+        project = db.query(Project).filter(Project.id == feed_data.project_id).first()
+        if not project:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+        is_member = (
+            db.query(ProjectMember.id)
+            .filter(
+                ProjectMember.project_id == feed_data.project_id,
+                ProjectMember.user_id == current_user.id,
+            )
+            .first()
+        )
+        if current_user.role != "admin" and not is_member:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+
+    feed = CalendarFeed(
+        id=new_id(),
+        token=secrets.token_urlsafe(32),
+        user_id=current_user.id,
+        project_id=str(feed_data.project_id) if feed_data.project_id else None,
+    )
+    db.add(feed)
+    db.commit()
+    db.refresh(feed)
+    return feed_response(request, feed)
+
+
+@router.get("", response_model=List[CalendarFeedResponse])
+async def get_feeds(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
+):
+    """Get your calendar feeds"""
+    feeds = (
+        db.query(CalendarFeed)
+        .filter(CalendarFeed.user_id == current_user.id)
+        .order_by(CalendarFeed.created_at)
+        .all()
+    )
+    return [feed_response(request, feed) for feed in feeds]
+
+
+@router.delete("/{feed_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_feed(
+    feed_id: uuid.UUID,
+    db: Session = Depends(get_write_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Revoke a calendar feed (its URL stops working)"""
+    feed = db.query(CalendarFeed).filter(CalendarFeed.id == feed_id).first()
+    if not feed:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Feed not found")
+
+    if feed.user_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+
+    db.delete(feed)
+    db.commit()
+    await FeedService.forget(feed)
+    return None
+
+
+@router.get("/{token}.ics", name="get_feed")
+async def get_feed(token: str, request: Request):
+    """iCalendar feed (the token in the URL is the credential)
+
+    Conditional requests are answered from the feed's Redis stamp without
+    touching shifts or meetings; an unchanged feed is served from cache,
+    otherwise it is streamed from server-side cursors (on a replica if
+    configured).
+    """
+    meta = await FeedService.meta(SessionLocal, token)
+    if meta is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Feed not found")
+
+    stamp = await FeedService.modified(FeedService.scope(meta))
+    etag = f'"{meta["id"]}-{stamp}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stamp / 1000, usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+    if not_modified(request, etag, stamp):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    body = await FeedService.cached_body(meta["id"], stamp)
+    if body is not None:
+        return Response(body, media_type=ICS_MEDIA_TYPE, headers=headers)
+
+    replica = await replica_router.pick() if replica_router.replicas else None
+    return StreamingResponse(
+        FeedService.stream(replica.sessions if replica else SessionLocal, meta, stamp),
+        media_type=ICS_MEDIA_TYPE,
+        headers=headers,
+    )
@@ -4,8 +4,10 @@ from typing import List, Optional
 from datetime import datetime
 import uuid
 
-from app.db.database import get_db
-from app.api.deps.auth import get_current_user
+from app.db.database import get_write_db
+from app.db.replicas import get_read_db
+from app.db.types import new_id
+from app.api.deps.auth import get_current_user, get_current_read_user
 from app.models.user import User
 from app.models.meeting import Meeting, MeetingParticipant
 from app.schemas.meeting import (
@@ -13,21 +15,53 @@ from app.schemas.meeting import (
     MeetingResponse,
     MeetingParticipantResponse,
 )
+from app.services.conflicts import ConflictService
+from app.services.notifications import NotificationService
+from app.services.changes import ChangeFeed, user_scope, project_scope, month_scope
+from app.services.calendar_outbox import CalendarOutboxService
 
 router = APIRouter()
 
 
+def meeting_scopes(meeting: Meeting, user_ids) -> list:
+    """Change-event scopes for a meeting"""
+    return [
+        project_scope(meeting.project_id),
+        month_scope(meeting.start_datetime),
+        user_scope(meeting.created_by),
+        *(user_scope(uid) for uid in user_ids),
+    ]
+
+
 @router.post("", response_model=MeetingResponse, status_code=status.HTTP_201_CREATED)
 async def create_meeting(
     meeting_data: MeetingCreate,
-    db: Session = Depends(get_db),
+    allow_conflicts: bool = Query(False),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
     """Create a new meeting"""
+    participant_ids = list(dict.fromkeys(str(uid) for uid in meeting_data.participant_ids))
+
+    # Check participants are not double-booked
+    if not allow_conflicts:
+        overlaps = ConflictService.find_overlaps(
+            db,
+            participant_ids,
+            meeting_data.start_datetime,
+            meeting_data.end_datetime,
+        )
+        if overlaps:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Participants already booked at this time: "
+                + ", ".join(sorted({o.user_id for o in overlaps})),
+            )
+
     # Create meeting
     meeting = Meeting(
-        id=str(uuid.uuid4()),
-        project_id=meeting_data.project_id,
+        id=new_id(),
+        project_id=str(meeting_data.project_id),
         title=meeting_data.title,
         description=meeting_data.description,
         start_datetime=meeting_data.start_datetime,
@@ -40,17 +74,31 @@ async def create_meeting(
     db.flush()
 
     # Add participants
-    for participant_id in meeting_data.participant_ids:
+    for participant_id in participant_ids:
         participant = MeetingParticipant(
-            id=str(uuid.uuid4()),
+            id=new_id(),
             meeting_id=meeting.id,
             user_id=participant_id,
             status="pending",
         )
         db.add(participant)
+    ConflictService.add_meeting(db, meeting, participant_ids)
+
+    notifications = NotificationService.create_bulk(
+        db,
+        [uid for uid in participant_ids if uid != current_user.id],
+        type="meeting_invitation",
+        title="ミーティングに招待されました",
+        message=f"{meeting.title}（{meeting.start_datetime:%Y-%m-%d %H:%M}）",
+        link=f"/meetings/{meeting.id}",
+    )
 
     db.commit()
     db.refresh(meeting)
+    await NotificationService.publish(notifications)
+    await ChangeFeed.emit(
+        "meeting", meeting.id, "created", meeting_scopes(meeting, participant_ids)
+    )
 
     return meeting
 
@@ -59,9 +107,9 @@ async def create_meeting(
 async def get_meetings(
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
-    project_id: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    project_id: Optional[uuid.UUID] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
 ):
     """Get meetings"""
     # Get meetings where user is a participant or creator
@@ -83,9 +131,9 @@ async def get_meetings(
 
 @router.get("/{meeting_id}", response_model=MeetingResponse)
 async def get_meeting(
-    meeting_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    meeting_id: uuid.UUID,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
 ):
     """Get a specific meeting"""
     meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
@@ -115,9 +163,9 @@ async def get_meeting(
 
 @router.get("/{meeting_id}/participants", response_model=List[MeetingParticipantResponse])
 async def get_meeting_participants(
-    meeting_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    meeting_id: uuid.UUID,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
 ):
     """Get meeting participants"""
     participants = (
@@ -130,13 +178,14 @@ async def get_meeting_participants(
 
 @router.patch("/{meeting_id}/participants/{user_id}/status")
 async def update_participant_status(
-    meeting_id: str,
-    user_id: str,
+    meeting_id: uuid.UUID,
+    user_id: uuid.UUID,
     status_value: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
     """Update participant status"""
+    meeting_id, user_id = str(meeting_id), str(user_id)
     if user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -157,16 +206,29 @@ async def update_participant_status(
             status_code=status.HTTP_404_NOT_FOUND, detail="Participant not found"
         )
 
+    meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
+
+    # Declined participants no longer block the time slot
+    was_declined = participant.status == "declined"
     participant.status = status_value
+    if status_value == "declined" and not was_declined:
+        ConflictService.remove_source(db, "meeting", meeting_id, user_id=user_id)
+    elif was_declined and status_value != "declined":
+        ConflictService.add_meeting(db, meeting, [user_id])
+    event = ChangeFeed.event(
+        "meeting_participant", participant.id, "updated", meeting_scopes(meeting, [user_id])
+    )
     db.commit()
 
+    await ChangeFeed.publish([event])
+
     return {"message": "Status updated successfully"}
 
 
 @router.delete("/{meeting_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_meeting(
-    meeting_id: str,
-    db: Session = Depends(get_db),
+    meeting_id: uuid.UUID,
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
     """Delete a meeting"""
@@ -182,5 +244,23 @@ async def delete_meeting(
             detail="Only meeting creator can delete",
         )
 
+    participant_ids = [
+        uid
+        for (uid,) in db.query(MeetingParticipant.user_id)
+        .filter(MeetingParticipant.meeting_id == meeting_id)
+        .all()
+    ]
+    scopes = meeting_scopes(meeting, participant_ids)
+
+    ConflictService.remove_source(db, "meeting", meeting.id)
+    CalendarOutboxService.enqueue(
+        db,
+        meeting.created_by,
+        "meeting",
+        meeting.id,
+        "delete",
+        calendar_event_id=meeting.calendar_event_id,
+    )
     db.delete(meeting)
     db.commit()
+    await ChangeFeed.emit("meeting", str(meeting_id), "deleted", scopes)
@@ -0,0 +1,162 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime
+import asyncio
+import json
+import uuid
+
+from app.db.database import get_db, get_write_db
+from app.db.replicas import get_read_db
+from app.api.deps.auth import get_current_user, get_current_read_user, get_current_user_for_stream
+from app.models.user import User
+from app.models.notification import Notification
+from app.schemas.notification import (
+    NotificationPage,
+    NotificationResponse,
+    MarkReadRequest,
+)
+from app.services.notifications import notification_hub
+
+router = APIRouter()
+
+HEARTBEAT_SECONDS = 15
+
+
+def encode_cursor(notification: Notification) -> str:
+    return f"{notification.created_at.isoformat()}|{notification.id}"
+
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, notification_id = cursor.split("|", 1)
+        return datetime.fromisoformat(created_at), str(uuid.UUID(notification_id))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+@router.get("", response_model=NotificationPage)
+async def get_notifications(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    unread_only: bool = Query(False),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
+):
+    """Get notifications, newest first (keyset pagination)"""
+    query = db.query(Notification).filter(Notification.user_id == current_user.id)
+
+    if unread_only:
+        query = query.filter(Notification.is_read == False)
+
+    if cursor:
+        created_at, notification_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                Notification.created_at < created_at,
+                and_(
+                    Notification.created_at == created_at,
+                    Notification.id < notification_id,
+                ),
+            )
+        )
+
+    rows = (
+        query.order_by(Notification.created_at.desc(), Notification.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return NotificationPage(
+        items=[NotificationResponse.model_validate(n) for n in rows[:limit]],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/unread-count")
+async def get_unread_count(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
+):
+    """Get number of unread notifications"""
+    count = (
+        db.query(Notification)
+        .filter(Notification.user_id == current_user.id)
+        .filter(Notification.is_read == False)
+        .count()
+    )
+    return {"unread": count}
+
+
+@router.post("/read")
+async def mark_notifications_read(
+    request: MarkReadRequest,
+    db: Session = Depends(get_write_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Mark notifications as read in a single UPDATE"""
+    if not request.all and not request.ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Specify ids or all=true",
+        )
+
+    query = (
+        db.query(Notification)
+        .filter(Notification.user_id == current_user.id)
+        .filter(Notification.is_read == False)
+    )
+    if not request.all:
+        query = query.filter(Notification.id.in_(request.ids))
+    if request.before:
+        query = query.filter(Notification.created_at <= request.before)
+
+    updated = query.update({Notification.is_read: True}, synchronize_session=False)
+    db.commit()
+
+    return {"updated": updated}
+
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_for_stream),
+):
+    """Server-Sent Events stream of new notifications"""
+    user_id = current_user.id
+    # Release the pooled DB connection; the stream may stay open for hours
+    db.close()
+
+    async def event_stream():
+        # Subscribed here, not in the endpoint: a client that disconnects
+        # before the body starts never runs the generator or its finally
+        queue = notification_hub.subscribe([user_id])
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield (
+                    f"id: {item['id']}\n"
+                    "event: notification\n"
+                    f"data: {json.dumps(item, ensure_ascii=False)}\n\n"
+                )
+        finally:
+            notification_hub.unsubscribe([user_id], queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,16 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import date, datetime, time as dtime
+import time
 import uuid
 
-from app.db.database import get_db
-from app.api.deps.auth import get_current_user, get_current_admin_user
+from app.db.database import get_write_db
+from app.db.replicas import get_read_db
+from app.db.types import new_id
+from app.api.deps.auth import get_current_read_user, get_current_admin_user, get_current_admin_read_user
 from app.models.user import User
 from app.models.shift import ShiftRequest
 from app.models.project import Project
 from app.models.optimization import OptimizationSuggestion, OptimizationAssignment
 from app.services.llm_service import LLMService
+from app.services.llm_router import llm_router, LLMRoutingError
+from app.services.llm_usage import LLMUsageService
+from app.services.assignment_validation import AssignmentRepairService, AssignmentValidator
+from app.services.reoptimization import ReoptimizationService
+from app.services.suggestion_diff import SuggestionDiffService
+from app.api.deps.clients import get_http_clients
+from app.api.deps.admission import admission
+from app.core.http_clients import HTTPClients
+from app.services.conflicts import ConflictService
+from app.services.notifications import NotificationService
+from app.services.changes import ChangeFeed, user_scope, project_scope
+from app.services.calendar_outbox import CalendarOutboxService
+from app.services.workload import WorkloadService
+from app.core.config import settings
 from pydantic import BaseModel
 
 
@@ -27,35 +46,72 @@ class OptimizationResponse(BaseModel):
     month: str
     status: str
     summary: dict
+    version: int = 1
+    parent_id: Optional[str] = None
+    llm_provider: Optional[str] = None
+    llm_timings: Optional[dict] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
 
 
+class AssignmentItem(BaseModel):
+    """Assignment in a suggestion diff"""
+
+    user_id: str
+    project_id: str
+    date: date
+    start_time: dtime
+    end_time: dtime
+
+
+class MovedAssignment(BaseModel):
+    """Assignment whose project or time changed for the same member and day"""
+
+    before: AssignmentItem
+    after: AssignmentItem
+
+
+class MemberHoursDelta(BaseModel):
+    """Assigned hours of a member in both suggestions"""
+
+    user_id: str
+    hours_a: float
+    hours_b: float
+    delta_hours: float
+
+
+class SuggestionDiffResponse(BaseModel):
+    """Changes from suggestion a to suggestion b"""
+
+    suggestion_a: str
+    suggestion_b: str
+    added: List[AssignmentItem]
+    removed: List[AssignmentItem]
+    moved: List[MovedAssignment]
+    unchanged: int
+    members: List[MemberHoursDelta]  # members with any change
+
+
 router = APIRouter()
 
 
-@router.post("/shifts", response_model=OptimizationResponse)
-async def optimize_shifts(
-    request: OptimizeRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user),
-):
-    """Generate shift optimization using LLM (admin only)"""
+def _load_inputs(db: Session, month: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Submitted requests and active projects of a month, as sent to the LLM"""
 
     # Get shift requests for the month
     shift_requests = (
         db.query(ShiftRequest)
         .filter(ShiftRequest.status == "submitted")
-        .filter(ShiftRequest.date.like(f"{request.month}%"))
+        .filter(ShiftRequest.date.like(f"{month}%"))
         .all()
     )
 
     if not shift_requests:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"No submitted shift requests found for {request.month}",
+            detail=f"No submitted shift requests found for {month}",
         )
 
     # Get active projects
@@ -88,54 +144,110 @@ async def optimize_shifts(
         for p in projects
     ]
 
+    return shift_data, project_data
+
+
+def _save_assignments(db: Session, suggestion_id: str, assignments: List[Dict[str, str]]) -> None:
+    """Insert validated assignments in a single INSERT
+
+    Does not commit.
+    """
+    rows = [
+        {
+            "id": new_id(),
+            "suggestion_id": suggestion_id,
+            "user_id": assignment["user_id"],
+            "project_id": assignment["project_id"],
+            "date": datetime.fromisoformat(assignment["date"]).date(),
+            "start_time": datetime.fromisoformat(f"2000-01-01T{assignment['start_time']}").time(),
+            "end_time": datetime.fromisoformat(f"2000-01-01T{assignment['end_time']}").time(),
+        }
+        for assignment in assignments
+    ]
+    if rows:
+        db.execute(insert(OptimizationAssignment), rows)
+
+
+@router.post(
+    "/shifts",
+    response_model=OptimizationResponse,
+    dependencies=[Depends(admission("llm", cost=10))],
+)
+async def optimize_shifts(
+    request: OptimizeRequest,
+    db: Session = Depends(get_write_db),
+    current_user: User = Depends(get_current_admin_user),
+    clients: HTTPClients = Depends(get_http_clients),
+):
+    """Generate shift optimization using LLM (admin only)"""
+    shift_data, project_data = _load_inputs(db, request.month)
+
     # Call LLM service
     try:
-        result = await LLMService.optimize_shifts(
+        result, routing = await LLMService.optimize_shifts(
             shift_requests=shift_data,
             projects=project_data,
             month=request.month,
+            clients=clients,
         )
     except Exception as e:
+        if isinstance(e, LLMRoutingError):
+            # Failed calls still cost money; keep them in the usage ledger
+            LLMUsageService.record(db, e.attempts, request.month)
+            db.commit()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to generate optimization: {str(e)}",
         )
 
+    # Drop invalid assignments and re-staff only the days/projects they hit
+    result, repair_attempts = await AssignmentRepairService.validate_and_repair(
+        result, shift_data, project_data, request.month, clients
+    )
+
     # Save optimization suggestion
     suggestion = OptimizationSuggestion(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         month=request.month,
         status="pending",
         summary=result.get("summary", {}),
+        llm_provider=routing["provider"],
+        llm_timings={k: v for k, v in routing.items() if k != "provider"},
+        request_snapshot=ReoptimizationService.snapshot(shift_data, project_data),
         created_by=current_user.id,
     )
     db.add(suggestion)
     db.flush()
+    LLMUsageService.record(
+        db, routing["attempts"] + repair_attempts, request.month, suggestion.id
+    )
 
     # Save assignments
-    for assignment in result.get("assignments", []):
-        opt_assignment = OptimizationAssignment(
-            id=str(uuid.uuid4()),
-            suggestion_id=suggestion.id,
-            user_id=assignment["user_id"],
-            project_id=assignment["project_id"],
-            date=datetime.fromisoformat(assignment["date"]).date(),
-            start_time=datetime.fromisoformat(f"2000-01-01T{assignment['start_time']}").time(),
-            end_time=datetime.fromisoformat(f"2000-01-01T{assignment['end_time']}").time(),
-        )
-        db.add(opt_assignment)
+    _save_assignments(db, suggestion.id, result["assignments"])
 
     db.commit()
     db.refresh(suggestion)
 
+    await ChangeFeed.emit(
+        "optimization_suggestion", suggestion.id, "created", [f"month:{suggestion.month}"]
+    )
+
     return OptimizationResponse.model_validate(suggestion)
 
 
+@router.get("/llm/providers")
+async def get_llm_provider_stats(
+    current_user: User = Depends(get_current_admin_read_user),
+):
+    """Latency/error stats of LLM providers in this worker (admin only)"""
+    return llm_router.snapshot()
+
+
 @router.get("/suggestions", response_model=List[OptimizationResponse])
 async def get_optimization_suggestions(
     month: str = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
 ):
     """Get optimization suggestions"""
     query = db.query(OptimizationSuggestion)
@@ -147,10 +259,185 @@ async def get_optimization_suggestions(
     return [OptimizationResponse.model_validate(s) for s in suggestions]
 
 
-@router.post("/suggestions/{suggestion_id}/approve")
+@router.get("/suggestions/{suggestion_a}/diff/{suggestion_b}", response_model=SuggestionDiffResponse)
+async def diff_suggestions(
+    suggestion_a: uuid.UUID,
+    suggestion_b: uuid.UUID,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
+):
+    """Added/removed/moved assignments and per-member hour deltas from a to b"""
+    suggestion_a, suggestion_b = str(suggestion_a), str(suggestion_b)
+    months = dict(
+        db.query(OptimizationSuggestion.id, OptimizationSuggestion.month)
+        .filter(OptimizationSuggestion.id.in_([suggestion_a, suggestion_b]))
+        .all()
+    )
+
+    if suggestion_a not in months or suggestion_b not in months:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Optimization suggestion not found",
+        )
+
+    if months[suggestion_a] != months[suggestion_b]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Suggestions are for different months",
+        )
+
+    return SuggestionDiffResponse(
+        suggestion_a=suggestion_a,
+        suggestion_b=suggestion_b,
+        **SuggestionDiffService.diff(db, suggestion_a, suggestion_b),
+    )
+
+
+@router.post(
+    "/suggestions/{suggestion_id}/reoptimize",
+    response_model=OptimizationResponse,
+    dependencies=[Depends(admission("llm", cost=4))],
+)
+async def reoptimize_suggestion(
+    suggestion_id: uuid.UUID,
+    solver: str = Query("llm", pattern="^(llm|local)$"),
+    db: Session = Depends(get_write_db),
+    current_user: User = Depends(get_current_admin_user),
+    clients: HTTPClients = Depends(get_http_clients),
+):
+    """Re-solve only the days whose requests changed since the suggestion (admin only)
+
+    Assignments on unchanged days are carried over; the result is stored as a
+    new pending version and the original is marked superseded. Returns the
+    original suggestion when nothing changed.
+    """
+    started = time.perf_counter()
+    suggestion = (
+        db.query(OptimizationSuggestion)
+        .filter(OptimizationSuggestion.id == suggestion_id)
+        .first()
+    )
+
+    if not suggestion:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Optimization suggestion not found",
+        )
+
+    if suggestion.status != "pending":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only pending suggestions can be re-optimized",
+        )
+
+    if not suggestion.request_snapshot:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Suggestion has no request snapshot; run a full optimization",
+        )
+
+    month = suggestion.month
+    shift_data, project_data = _load_inputs(db, month)
+    changed = ReoptimizationService.changed_days(
+        suggestion.request_snapshot, shift_data, project_data
+    )
+    if not changed:
+        return OptimizationResponse.model_validate(suggestion)
+
+    kept = ReoptimizationService.carry_over(
+        [
+            AssignmentValidator.format((a.user_id, a.project_id, a.date, a.start_time, a.end_time))
+            for a in db.query(OptimizationAssignment)
+            .filter(OptimizationAssignment.suggestion_id == suggestion_id)
+            .all()
+        ],
+        changed,
+    )
+    day_requests = [sr for sr in shift_data if sr["date"] in changed]
+
+    routing = None
+    if solver == "local" or not day_requests:
+        validator = AssignmentValidator(day_requests, project_data, month)
+        added = validator.fill(
+            [], {date.fromisoformat(day): set(validator.projects) for day in changed}
+        )
+        result = {"assignments": [validator.format(slot) for slot in added], "summary": {}}
+    else:
+        try:
+            result, routing = await LLMService.optimize_shifts(
+                shift_requests=day_requests,
+                projects=project_data,
+                month=month,
+                clients=clients,
+            )
+        except Exception as e:
+            if isinstance(e, LLMRoutingError):
+                LLMUsageService.record(db, e.attempts, month)
+                db.commit()
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to generate optimization: {str(e)}",
+            )
+
+    # Anything outside the changed days fails validation as outside_request
+    result, repair_attempts = await AssignmentRepairService.validate_and_repair(
+        result, day_requests, project_data, month, clients
+    )
+    assignments = kept + result["assignments"]
+
+    summary = dict(result["summary"])
+    summary.update(
+        total_shifts=len(assignments),
+        members_utilized=len({a["user_id"] for a in assignments}),
+        reoptimization={
+            "base_id": suggestion.id,
+            "base_version": suggestion.version,
+            "solver": solver,
+            "changed_days": sorted(changed),
+            "kept": len(kept),
+            "resolved": len(result["assignments"]),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000),
+        },
+    )
+
+    new_version = OptimizationSuggestion(
+        id=new_id(),
+        month=month,
+        status="pending",
+        summary=summary,
+        version=(suggestion.version or 1) + 1,
+        parent_id=suggestion.id,
+        llm_provider=routing["provider"] if routing else None,
+        llm_timings={k: v for k, v in routing.items() if k != "provider"} if routing else None,
+        request_snapshot=ReoptimizationService.snapshot(shift_data, project_data),
+        created_by=current_user.id,
+    )
+    suggestion.status = "superseded"
+    db.add(new_version)
+    db.flush()
+    LLMUsageService.record(
+        db, (routing["attempts"] if routing else []) + repair_attempts, month, new_version.id
+    )
+    _save_assignments(db, new_version.id, assignments)
+
+    db.commit()
+    db.refresh(new_version)
+
+    scope = [f"month:{month}"]
+    await ChangeFeed.publish(
+        [
+            ChangeFeed.event("optimization_suggestion", suggestion.id, "updated", scope),
+            ChangeFeed.event("optimization_suggestion", new_version.id, "created", scope),
+        ]
+    )
+
+    return OptimizationResponse.model_validate(new_version)
+
+
+@router.post("/suggestions/{suggestion_id}/approve", dependencies=[Depends(admission("bulk", cost=5))])
 async def approve_optimization(
-    suggestion_id: str,
-    db: Session = Depends(get_db),
+    suggestion_id: uuid.UUID,
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(get_current_admin_user),
 ):
     """Approve optimization suggestion and create confirmed shifts"""
@@ -174,6 +461,12 @@ async def approve_optimization(
             detail="Optimization already approved",
         )
 
+    if suggestion.status == "superseded":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Optimization was superseded by a re-optimized version",
+        )
+
     # Create confirmed shifts from assignments
     assignments = (
         db.query(OptimizationAssignment)
@@ -181,9 +474,44 @@ async def approve_optimization(
         .all()
     )
 
+    # Reject if assignments overlap each other or existing confirmed shifts
+    conflicts = ConflictService.check_batch(
+        db,
+        [
+            {
+                "user_id": a.user_id,
+                "start": datetime.combine(a.date, a.start_time),
+                "end": datetime.combine(a.date, a.end_time),
+            }
+            for a in assignments
+        ],
+        kinds=["shift"],
+    )
+    if conflicts:
+        users = sorted({interval["user_id"] for interval, _ in conflicts})
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{len(conflicts)} overlapping assignment(s) for users: "
+            + ", ".join(users),
+        )
+
+    # Users whose new shifts are pushed to Google Calendar by the outbox worker
+    calendar_user_ids = set()
+    calendar_items = []
+    if settings.CALENDAR_SYNC_ON_APPROVAL:
+        calendar_user_ids = {
+            uid
+            for (uid,) in db.query(User.id)
+            .filter(
+                User.id.in_({a.user_id for a in assignments}),
+                User.google_refresh_token.isnot(None),
+            )
+            .all()
+        }
+
     for assignment in assignments:
         confirmed_shift = ConfirmedShift(
-            id=str(uuid.uuid4()),
+            id=new_id(),
             user_id=assignment.user_id,
             project_id=assignment.project_id,
             date=assignment.date,
@@ -192,12 +520,57 @@ async def approve_optimization(
             created_by=current_user.id,
         )
         db.add(confirmed_shift)
+        ConflictService.add_shift(db, confirmed_shift)
+        if assignment.user_id in calendar_user_ids:
+            calendar_items.append((assignment.user_id, "shift", confirmed_shift.id))
+    CalendarOutboxService.enqueue_new_upserts(db, calendar_items)
+    WorkloadService.add_shifts(
+        db, [(a.user_id, a.project_id, a.date, a.start_time, a.end_time) for a in assignments]
+    )
 
     # Update suggestion status
     suggestion.status = "approved"
     suggestion.approved_by = current_user.id
     suggestion.approved_at = datetime.utcnow()
 
-    db.commit()
+    notifications = NotificationService.create_bulk(
+        db,
+        [a.user_id for a in assignments],
+        type="shift_confirmed",
+        title="シフトが確定しました",
+        message=f"{suggestion.month} のシフトが確定しました",
+        link=f"/shifts?month={suggestion.month}",
+    )
+
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if not ConflictService.is_overlap_violation(e):
+            raise
+        # Shifts confirmed concurrently, rejected by the exclusion constraint
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Assignments overlap shifts confirmed in the meantime",
+        )
+    await NotificationService.publish(notifications)
+
+    # One compact event for the whole batch instead of one per shift
+    month = f"month:{suggestion.month}"
+    await ChangeFeed.publish(
+        [
+            ChangeFeed.event("optimization_suggestion", suggestion.id, "updated", [month]),
+            ChangeFeed.event(
+                "confirmed_shift",
+                suggestion.id,
+                "bulk_created",
+                [
+                    month,
+                    *(project_scope(pid) for pid in {a.project_id for a in assignments}),
+                    *(user_scope(uid) for uid in {a.user_id for a in assignments}),
+                ],
+            ),
+        ]
+    )
 
     return {"message": "Optimization approved successfully"}
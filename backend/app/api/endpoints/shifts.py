@@ -1,11 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, File, HTTPException, status, Query, UploadFile
+from fastapi.responses import Response, StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from datetime import date, datetime
+import asyncio
 import uuid
 
-from app.db.database import get_db
-from app.api.deps.auth import get_current_user, get_current_admin_user
+from app.db.database import get_write_db, is_foreign_key_violation, SessionLocal
+from app.db.replicas import get_read_db, replica_router
+from app.db.types import new_id
+from app.api.deps.auth import (
+    get_current_user,
+    get_current_read_user,
+    get_current_admin_user,
+    get_current_admin_read_user,
+)
+from app.api.deps.admission import AdmissionSlot, admission
 from app.models.user import User
 from app.models.shift import ShiftRequest, ConfirmedShift
 from app.schemas.shift import (
@@ -14,21 +26,30 @@ from app.schemas.shift import (
     ShiftRequestResponse,
     ConfirmedShiftCreate,
     ConfirmedShiftResponse,
+    ShiftImportResponse,
 )
+from app.services.conflicts import ConflictService
+from app.services.changes import ChangeFeed, user_scope, project_scope, month_scope
+from app.services.calendar_outbox import CalendarOutboxService
+from app.services.shift_csv import ShiftCSVService, ShiftImportError
+from app.services.single_flight import SingleFlight, single_flight
+from app.services.workload import WorkloadService
 
 router = APIRouter()
 
+CONFIRMED_SHIFTS = TypeAdapter(List[ConfirmedShiftResponse])
+
 
 # Shift Requests
 @router.post("/requests", response_model=ShiftRequestResponse, status_code=status.HTTP_201_CREATED)
 async def create_shift_request(
     shift_data: ShiftRequestCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
     """Create a new shift request"""
     shift = ShiftRequest(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         user_id=current_user.id,
         date=shift_data.date,
         start_time=shift_data.start_time,
@@ -39,6 +60,9 @@ async def create_shift_request(
     db.add(shift)
     db.commit()
     db.refresh(shift)
+    await ChangeFeed.emit(
+        "shift_request", shift.id, "created", [user_scope(shift.user_id), month_scope(shift.date)]
+    )
     return shift
 
 
@@ -47,8 +71,8 @@ async def get_shift_requests(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     status_filter: Optional[str] = Query(None, alias="status"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
 ):
     """Get shift requests for current user"""
     query = db.query(ShiftRequest).filter(ShiftRequest.user_id == current_user.id)
@@ -66,9 +90,9 @@ async def get_shift_requests(
 
 @router.get("/requests/{shift_id}", response_model=ShiftRequestResponse)
 async def get_shift_request(
-    shift_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    shift_id: uuid.UUID,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
 ):
     """Get a specific shift request"""
     shift = db.query(ShiftRequest).filter(ShiftRequest.id == shift_id).first()
@@ -83,9 +107,9 @@ async def get_shift_request(
 
 @router.patch("/requests/{shift_id}", response_model=ShiftRequestResponse)
 async def update_shift_request(
-    shift_id: str,
+    shift_id: uuid.UUID,
     shift_data: ShiftRequestUpdate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
     """Update a shift request"""
@@ -96,19 +120,27 @@ async def update_shift_request(
     if shift.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
+    previous_month = month_scope(shift.date)
+
     # Update fields
     for field, value in shift_data.model_dump(exclude_unset=True).items():
         setattr(shift, field, value)
 
     db.commit()
     db.refresh(shift)
+    await ChangeFeed.emit(
+        "shift_request",
+        shift.id,
+        "updated",
+        [user_scope(shift.user_id), previous_month, month_scope(shift.date)],
+    )
     return shift
 
 
 @router.post("/requests/{shift_id}/submit", response_model=ShiftRequestResponse)
 async def submit_shift_request(
-    shift_id: str,
-    db: Session = Depends(get_db),
+    shift_id: uuid.UUID,
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
     """Submit a shift request"""
@@ -124,13 +156,16 @@ async def submit_shift_request(
 
     db.commit()
     db.refresh(shift)
+    await ChangeFeed.emit(
+        "shift_request", shift.id, "updated", [user_scope(shift.user_id), month_scope(shift.date)]
+    )
     return shift
 
 
 @router.delete("/requests/{shift_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_shift_request(
-    shift_id: str,
-    db: Session = Depends(get_db),
+    shift_id: uuid.UUID,
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
     """Delete a shift request"""
@@ -141,22 +176,41 @@ async def delete_shift_request(
     if shift.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
+    scopes = [user_scope(shift.user_id), month_scope(shift.date)]
     db.delete(shift)
     db.commit()
+    await ChangeFeed.emit("shift_request", str(shift_id), "deleted", scopes)
 
 
 # Confirmed Shifts
 @router.post("/confirmed", response_model=ConfirmedShiftResponse, status_code=status.HTTP_201_CREATED)
 async def create_confirmed_shift(
     shift_data: ConfirmedShiftCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(get_current_admin_user),
 ):
     """Create a confirmed shift (admin only)"""
+    user_id, project_id = str(shift_data.user_id), str(shift_data.project_id)
+
+    # Reject double-booking: one indexed range lookup on schedule_intervals
+    overlaps = ConflictService.find_overlaps(
+        db,
+        [user_id],
+        datetime.combine(shift_data.date, shift_data.start_time),
+        datetime.combine(shift_data.date, shift_data.end_time),
+        kinds=["shift"],
+    )
+    if overlaps:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Shift overlaps existing shift(s): "
+            + ", ".join(o.source_id for o in overlaps),
+        )
+
     shift = ConfirmedShift(
-        id=str(uuid.uuid4()),
-        user_id=shift_data.user_id,
-        project_id=shift_data.project_id,
+        id=new_id(),
+        user_id=user_id,
+        project_id=project_id,
         date=shift_data.date,
         start_time=shift_data.start_time,
         end_time=shift_data.end_time,
@@ -164,8 +218,33 @@ async def create_confirmed_shift(
         created_by=current_user.id,
     )
     db.add(shift)
-    db.commit()
+    ConflictService.add_shift(db, shift)
+    WorkloadService.add_shifts(db, [WorkloadService.row(shift)])
+
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if ConflictService.is_overlap_violation(e):
+            # Concurrent overlapping insert rejected by the exclusion constraint
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Shift overlaps an existing shift",
+            )
+        if is_foreign_key_violation(e):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Unknown user or project",
+            )
+        raise
+
     db.refresh(shift)
+    await ChangeFeed.emit(
+        "confirmed_shift",
+        shift.id,
+        "created",
+        [user_scope(shift.user_id), project_scope(shift.project_id), month_scope(shift.date)],
+    )
     return shift
 
 
@@ -173,36 +252,43 @@ async def create_confirmed_shift(
 async def get_confirmed_shifts(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
-    user_id: Optional[str] = Query(None),
-    project_id: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    user_id: Optional[uuid.UUID] = Query(None),
+    project_id: Optional[uuid.UUID] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_read_user),
 ):
-    """Get confirmed shifts"""
-    query = db.query(ConfirmedShift)
-
-    # Filter by user if specified, otherwise show all shifts for current user
-    if current_user.role == "admin":
+    """Get confirmed shifts (identical concurrent requests share one query)"""
+    # Members only ever see their own shifts; admins share one view
+    scope = "admin"
+    if current_user.role != "admin":
+        scope, user_id = user_scope(current_user.id), current_user.id
+
+    def render() -> bytes:
+        query = db.query(ConfirmedShift)
         if user_id:
             query = query.filter(ConfirmedShift.user_id == user_id)
-    else:
-        query = query.filter(ConfirmedShift.user_id == current_user.id)
-
-    if start_date:
-        query = query.filter(ConfirmedShift.date >= start_date)
-    if end_date:
-        query = query.filter(ConfirmedShift.date <= end_date)
-    if project_id:
-        query = query.filter(ConfirmedShift.project_id == project_id)
-
-    shifts = query.order_by(ConfirmedShift.date, ConfirmedShift.start_time).all()
-    return shifts
+        if start_date:
+            query = query.filter(ConfirmedShift.date >= start_date)
+        if end_date:
+            query = query.filter(ConfirmedShift.date <= end_date)
+        if project_id:
+            query = query.filter(ConfirmedShift.project_id == project_id)
+        shifts = query.order_by(ConfirmedShift.date, ConfirmedShift.start_time).all()
+        return CONFIRMED_SHIFTS.dump_json(CONFIRMED_SHIFTS.validate_python(shifts, from_attributes=True))
+
+    key = await SingleFlight.key(
+        "confirmed_shifts",
+        scope,
+        {"start_date": start_date, "end_date": end_date, "user_id": user_id, "project_id": project_id},
+        db,
+    )
+    return Response(content=await single_flight.do(key, render, db), media_type="application/json")
 
 
 @router.delete("/confirmed/{shift_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_confirmed_shift(
-    shift_id: str,
-    db: Session = Depends(get_db),
+    shift_id: uuid.UUID,
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(get_current_admin_user),
 ):
     """Delete a confirmed shift (admin only)"""
@@ -210,5 +296,74 @@ async def delete_confirmed_shift(
     if not shift:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Confirmed shift not found")
 
+    scopes = [user_scope(shift.user_id), project_scope(shift.project_id), month_scope(shift.date)]
+    ConflictService.remove_source(db, "shift", shift.id)
+    WorkloadService.remove_shifts(db, [WorkloadService.row(shift)])
+    CalendarOutboxService.enqueue(
+        db, shift.user_id, "shift", shift.id, "delete", calendar_event_id=shift.calendar_event_id
+    )
     db.delete(shift)
     db.commit()
+    await ChangeFeed.emit("confirmed_shift", str(shift_id), "deleted", scopes)
+
+
+# CSV import/export
+@router.post(
+    "/import",
+    response_model=ShiftImportResponse,
+    dependencies=[Depends(admission("bulk", cost=10))],
+)
+async def import_confirmed_shifts(
+    file: UploadFile = File(...),
+    dry_run: bool = Query(False),
+    db: Session = Depends(get_write_db),
+    current_user: User = Depends(get_current_admin_user),
+):
+    """Import confirmed shifts from CSV (admin only)
+
+    Columns: date, start_time, end_time, user_id or user_email, project_id
+    or project_name, and optionally comment. All rows are imported or none:
+    invalid rows are reported by line and roll the import back.
+    """
+    try:
+        report = await asyncio.to_thread(
+            ShiftCSVService.import_csv, db, file.file, current_user.id, dry_run
+        )
+    except ShiftImportError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except IntegrityError as e:
+        if not ConflictService.is_overlap_violation(e):
+            raise
+        # Concurrent overlapping insert rejected by the exclusion constraint
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Imported shifts overlap existing shifts",
+        )
+
+    scopes = report.pop("scopes")
+    if scopes:
+        await ChangeFeed.emit("confirmed_shift", new_id(), "bulk_created", scopes)
+    return report
+
+
+@router.get("/export")
+async def export_confirmed_shifts(
+    slot: AdmissionSlot = Depends(admission("bulk", cost=5)),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    project_id: Optional[uuid.UUID] = Query(None),
+    user_id: Optional[uuid.UUID] = Query(None),
+    current_user: User = Depends(get_current_admin_read_user),
+):
+    """Export confirmed shifts as CSV for payroll (admin only, streamed)"""
+    replica = await replica_router.pick() if replica_router.replicas else None
+    filename = f"shifts_{start_date or 'all'}_{end_date or 'all'}.csv"
+    response = StreamingResponse(
+        ShiftCSVService.export_csv(
+            replica.sessions if replica else SessionLocal, start_date, end_date, project_id, user_id
+        ),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+    # The export is the expensive part: keep the admission slot while it streams
+    return slot.hold(response)
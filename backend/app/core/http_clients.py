@@ -0,0 +1,96 @@
+from importlib.util import find_spec
+from typing import Any, Optional
+
+import httpx
+
+from app.core.config import settings
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+HTTP2_AVAILABLE = find_spec("h2") is not None
+
+
+def build_async_client(timeout: float, **kwargs) -> httpx.AsyncClient:
+    """Pooled keep-alive client with the configured limits"""
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        timeout=httpx.Timeout(timeout, connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        **kwargs,
+    )
+
+
+class HTTPClients:
+    """Long-lived outbound clients shared by all requests in a process
+
+    Each client owns a connection pool, so TLS handshakes happen once per
+    host and keep-alive connections are reused across requests. Clients are
+    created on first use and closed by the application lifespan.
+    """
+
+    def __init__(self):
+        self._http: Optional[httpx.AsyncClient] = None
+        self._anthropic: Any = None
+        self._openai: Any = None
+        self._gemini_models = {}
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """General-purpose client (Google REST endpoints etc.)"""
+        if self._http is None or self._http.is_closed:
+            self._http = build_async_client(settings.HTTP_TIMEOUT_SECONDS)
+        return self._http
+
+    @property
+    def anthropic(self):
+        if self._anthropic is None:
+            from anthropic import AsyncAnthropic
+
+            # Retries are counted by LLMService, not hidden in the SDK
+            self._anthropic = AsyncAnthropic(
+                api_key=settings.ANTHROPIC_API_KEY,
+                http_client=build_async_client(settings.LLM_TIMEOUT_SECONDS),
+                max_retries=0,
+            )
+        return self._anthropic
+
+    @property
+    def openai(self):
+        if self._openai is None:
+            from openai import AsyncOpenAI
+
+            self._openai = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                http_client=build_async_client(settings.LLM_TIMEOUT_SECONDS),
+                max_retries=0,
+            )
+        return self._openai
+
+    def gemini_model(self, model_name: str):
+        """Gemini model handle (the SDK keeps its own gRPC channel)"""
+        model = self._gemini_models.get(model_name)
+        if model is None:
+            import google.generativeai as genai
+
+            genai.configure(api_key=settings.GEMINI_API_KEY)
+            model = genai.GenerativeModel(model_name)
+            self._gemini_models[model_name] = model
+        return model
+
+    async def aclose(self) -> None:
+        """Close every pool that was opened"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        for client in (self._anthropic, self._openai):
+            if client is not None:
+                await client.close()
+        self._anthropic = None
+        self._openai = None
+        self._gemini_models.clear()
+
+
+http_clients = HTTPClients()
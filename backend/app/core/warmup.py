@@ -0,0 +1,87 @@
+from time import perf_counter
+from typing import Awaitable, Callable, Dict, Optional
+import asyncio
+
+from app.core.config import settings
+
+
+def _warm_database() -> None:
+    """Open pooled connections so the first requests skip the handshake"""
+    from app.db.database import engine
+
+    connections = [engine.connect() for _ in range(settings.STARTUP_WARMUP_DB_CONNECTIONS)]
+    for connection in connections:
+        connection.close()  # returned to the pool, not closed
+
+
+def _warm_google_calendar() -> None:
+    """Import the discovery client and parse the Calendar discovery document"""
+    import googleapiclient.discovery  # noqa: F401
+    from app.services.google_calendar import GoogleCalendarService
+
+    GoogleCalendarService.discovery_document()
+
+
+def _warm_http_clients() -> None:
+    """Create the pooled clients (and import the SDK) of the configured LLM provider"""
+    from app.core.http_clients import http_clients
+
+    http_clients.http
+    if settings.AI_PROVIDER == "claude" and settings.ANTHROPIC_API_KEY:
+        http_clients.anthropic
+    elif settings.AI_PROVIDER == "openai" and settings.OPENAI_API_KEY:
+        http_clients.openai
+    elif settings.AI_PROVIDER == "gemini" and settings.GEMINI_API_KEY:
+        http_clients.gemini_model(settings.GEMINI_MODEL)
+
+
+def _warm_passwords() -> None:
+    from app.core.security import get_pwd_context
+
+    get_pwd_context()
+
+
+async def _warm_redis() -> None:
+    from app.db.redis import get_redis
+
+    await get_redis().ping()
+
+
+SYNC_STEPS: Dict[str, Callable[[], None]] = {
+    "database": _warm_database,
+    "google_calendar": _warm_google_calendar,
+    "http_clients": _warm_http_clients,
+    "passwords": _warm_passwords,
+}
+ASYNC_STEPS: Dict[str, Callable[[], Awaitable[None]]] = {
+    "redis": _warm_redis,
+}
+
+
+async def warm_up() -> Dict[str, Optional[float]]:
+    """Run the warm-up steps concurrently; returns ms per step (None if it failed)
+
+    A failing step is reported and skipped: the resource is then created on
+    first use as before, so startup never fails because of warm-up.
+    """
+
+    async def timed(name: str, step: Callable[[], Awaitable[None]]) -> Optional[float]:
+        started = perf_counter()
+        try:
+            await asyncio.wait_for(step(), settings.STARTUP_WARMUP_TIMEOUT_SECONDS)
+        except Exception as e:
+            print(f"Warm-up step {name} failed: {e!r}")
+            return None
+        return round((perf_counter() - started) * 1000, 1)
+
+    steps = {
+        **{name: (lambda step=step: asyncio.to_thread(step)) for name, step in SYNC_STEPS.items()},
+        **ASYNC_STEPS,
+    }
+    started = perf_counter()
+    timings = dict(
+        zip(steps, await asyncio.gather(*(timed(name, step) for name, step in steps.items())))
+    )
+    timings["total"] = round((perf_counter() - started) * 1000, 1)
+    print(f"Warm-up finished: {timings}")
+    return timings
@@ -1,27 +1,100 @@
-from sqlalchemy import create_engine
+from typing import Any, Dict, Tuple
+from fastapi import Depends
+from fastapi.requests import HTTPConnection
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 from app.core.config import settings
 
+
+def pool_limits(workers: int) -> Tuple[int, int]:
+    """(pool_size, max_overflow) of one worker process
+
+    With DB_MAX_CONNECTIONS set, the budget is split into equal shares for
+    ``workers`` processes plus the extra one a rolling restart adds, so all
+    pools together never exceed it. Every engine (the primary and each
+    replica) uses these limits, so the budget holds per database server.
+    """
+    pool_size, max_overflow = settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+    if settings.DB_MAX_CONNECTIONS:
+        share = max(1, settings.DB_MAX_CONNECTIONS // (max(1, workers) + 1))
+        pool_size = min(pool_size, share)
+        max_overflow = max(0, min(max_overflow, share - pool_size))
+    return pool_size, max_overflow
+
+
+POOL_SIZE, MAX_OVERFLOW = pool_limits(settings.WEB_CONCURRENCY or 1)
+
+
+
+def make_engine(url: str, connect_args: Dict[str, Any] = None) -> Engine:
+    """Engine with the per-worker pool limits (SQLite, used for local benchmarks, keeps its default pool)"""
+    if url.startswith("sqlite"):
+        return create_engine(
+            url, pool_pre_ping=True, connect_args={"check_same_thread": False, **(connect_args or {})}
+        )
+    return create_engine(
+        url,
+        pool_pre_ping=True,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        connect_args=connect_args or {},
+    )
+
+
+def pool_usage(engine: Engine) -> Tuple[int, int]:
+    """(checked-out connections, capacity) of an engine's pool; capacity 0 when unbounded"""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return 0, 0
+    overflow = getattr(pool, "_max_overflow", 0)
+    return pool.checkedout(), (pool.size() + overflow if overflow >= 0 else 0)
+
+
+def is_foreign_key_violation(error: IntegrityError) -> bool:
+    """Whether ``error`` is a foreign key violation (e.g. an unknown user_id)"""
+    if getattr(error.orig, "pgcode", None) == "23503":
+        return True
+    return "FOREIGN KEY constraint failed" in str(error.orig)
+
+
 # Create SQLAlchemy engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-)
+engine = make_engine(settings.DATABASE_URL)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+@event.listens_for(SessionLocal, "after_commit")
+def _remember_commit(session) -> None:
+    # Read-your-writes: get_write_db keeps the user's reads on the primary afterwards
+    session.info["committed"] = True
+
 # Base class for models
 Base = declarative_base()
 
 
 def get_db():
-    """Dependency to get database session"""
+    """Dependency to get database session (primary)"""
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_write_db(connection: HTTPConnection, db: Session = Depends(get_db)):
+    """Primary session for endpoints that commit
+
+    Same session as ``get_db`` (closed there, in the threadpool); after a
+    commit it keeps the user's reads on the primary (read-your-writes).
+    """
+    yield db
+    if db.info.get("committed") and settings.DATABASE_REPLICA_URLS:
+        from app.db.replicas import replica_router, token_subject
+
+        # Runs before the response is sent, so the user's next read sees the write
+        await replica_router.mark_write(token_subject(connection))
@@ -0,0 +1,23 @@
+from typing import Optional
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+_client: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> aioredis.Redis:
+    """Get the shared async Redis client (created on first use)"""
+    global _client
+    if _client is None:
+        _client = aioredis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _client
+
+
+async def close_redis() -> None:
+    """Close the shared Redis client"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,174 @@
+"""Read replica routing
+
+Read-only GET endpoints take their session from ``get_read_db``, which
+round-robins over the healthy replicas in DATABASE_REPLICA_URLS. Health is
+checked lazily (at most every DB_REPLICA_HEALTH_CHECK_SECONDS per replica,
+off the event loop): the replica must answer and, on Postgres, be less
+than DB_REPLICA_MAX_LAG_SECONDS behind. A replica that fails a query is
+taken out until its next check. After a user commits on the primary their
+reads stay on the primary for DB_READ_YOUR_WRITES_SECONDS (tracked in Redis
+so every worker sees it), and with no healthy replica every read goes to
+the primary.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import asyncio
+import time
+
+from fastapi.requests import HTTPConnection
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.security import verify_token
+from app.db.database import SessionLocal, make_engine
+from app.db.redis import get_redis
+
+RECENT_WRITE_KEY = "db:recent_write:{user_id}"
+REPLICA_CONNECT_TIMEOUT_SECONDS = 2
+
+# Seconds the replica is behind; 0 when it has replayed everything it received
+# (an idle primary would otherwise look like growing lag), NULL on a primary
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+@dataclass
+class Replica:
+    name: str
+    engine: Engine
+    sessions: sessionmaker
+    healthy: bool = True
+    checked_at: float = field(default=float("-inf"))
+
+
+def token_subject(connection: HTTPConnection) -> Optional[str]:
+    """User id from the request's bearer token (or ``access_token`` query), if valid"""
+    scheme, _, token = connection.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        token = connection.query_params.get("access_token")
+    payload = verify_token(token) if token else None
+    return payload.get("sub") if payload else None
+
+
+class ReplicaRouter:
+    """Round-robin over healthy replicas with read-your-writes for recent writers"""
+
+    def __init__(self, urls: List[str]):
+        self.replicas: List[Replica] = []
+        for index, url in enumerate(urls):
+            connect_args = (
+                {} if url.startswith("sqlite") else {"connect_timeout": REPLICA_CONNECT_TIMEOUT_SECONDS}
+            )
+            engine = make_engine(url, connect_args)
+            self.replicas.append(
+                Replica(
+                    name=f"replica{index}",
+                    engine=engine,
+                    sessions=sessionmaker(autocommit=False, autoflush=False, bind=engine),
+                )
+            )
+        self._next = 0
+        # Writes seen by this worker (user id -> monotonic expiry); Redis has everyone's
+        self._recent_writes: Dict[str, float] = {}
+
+    def check(self, replica: Replica) -> bool:
+        """Blocking health check"""
+        try:
+            with replica.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                if settings.DB_REPLICA_MAX_LAG_SECONDS and replica.engine.dialect.name == "postgresql":
+                    lag = conn.execute(REPLICA_LAG_SQL).scalar()
+                    if lag is not None and float(lag) > settings.DB_REPLICA_MAX_LAG_SECONDS:
+                        print(f"Replica {replica.name} is {float(lag):.1f}s behind; skipping it")
+                        return False
+            return True
+        except Exception as e:
+            print(f"Replica {replica.name} health check failed: {e}")
+            return False
+
+    async def _refresh(self, replica: Replica) -> None:
+        # Claim the check first so concurrent requests do not repeat it
+        replica.checked_at = time.monotonic()
+        replica.healthy = await asyncio.to_thread(self.check, replica)
+
+    async def pick(self) -> Optional[Replica]:
+        """Next healthy replica in round-robin order, or None"""
+        now = time.monotonic()
+        stale = [
+            r for r in self.replicas
+            if now - r.checked_at >= settings.DB_REPLICA_HEALTH_CHECK_SECONDS
+        ]
+        if stale:
+            await asyncio.gather(*(self._refresh(r) for r in stale))
+
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next % len(self.replicas)]
+            self._next += 1
+            if replica.healthy:
+                return replica
+        return None
+
+    def mark_down(self, replica: Replica, error: Exception) -> None:
+        """Skip a replica that failed a query until its next health check"""
+        print(f"Replica {replica.name} failed a query; skipping it: {error}")
+        replica.healthy = False
+        replica.checked_at = time.monotonic()
+
+    async def mark_write(self, user_id: Optional[str]) -> None:
+        """Keep ``user_id``'s reads on the primary for DB_READ_YOUR_WRITES_SECONDS"""
+        if not user_id:
+            return
+        window = settings.DB_READ_YOUR_WRITES_SECONDS
+        if len(self._recent_writes) > 10000:
+            now = time.monotonic()
+            self._recent_writes = {u: t for u, t in self._recent_writes.items() if t > now}
+        self._recent_writes[user_id] = time.monotonic() + window
+        try:
+            await get_redis().set(
+                RECENT_WRITE_KEY.format(user_id=user_id), "1", px=max(1, int(window * 1000))
+            )
+        except Exception as e:
+            print(f"Error recording recent write: {e}")
+
+    async def recently_wrote(self, user_id: Optional[str]) -> bool:
+        if not user_id:
+            return False
+        if self._recent_writes.get(user_id, 0.0) > time.monotonic():
+            return True
+        try:
+            return bool(await get_redis().exists(RECENT_WRITE_KEY.format(user_id=user_id)))
+        except Exception as e:
+            # Cannot tell: the primary is always consistent
+            print(f"Error checking recent writes: {e}")
+            return True
+
+
+replica_router = ReplicaRouter(settings.DATABASE_REPLICA_URLS)
+
+
+async def get_read_db(connection: HTTPConnection):
+    """Dependency for read-only endpoints: a replica session when one is usable
+
+    Falls back to the primary without replicas, when none is healthy, or
+    right after the requesting user's own write.
+    """
+    replica = None
+    if replica_router.replicas and not await replica_router.recently_wrote(
+        token_subject(connection)
+    ):
+        replica = await replica_router.pick()
+
+    db = replica.sessions() if replica else SessionLocal()
+    try:
+        yield db
+    except OperationalError as e:
+        if replica is not None:
+            replica_router.mark_down(replica, e)
+        raise
+    finally:
+        db.close()
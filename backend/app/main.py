@@ -1,43 +1,87 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.api.endpoints import auth, shifts, meetings, calendar, optimization
-
-app = FastAPI(
-    title=settings.APP_NAME,
-    version=settings.APP_VERSION,
-    docs_url="/docs",
-    redoc_url="/redoc",
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(auth.router, prefix=f"{settings.API_V1_PREFIX}/auth", tags=["auth"])
-app.include_router(shifts.router, prefix=f"{settings.API_V1_PREFIX}/shifts", tags=["shifts"])
-app.include_router(meetings.router, prefix=f"{settings.API_V1_PREFIX}/meetings", tags=["meetings"])
-app.include_router(calendar.router, prefix=f"{settings.API_V1_PREFIX}/calendar", tags=["calendar"])
-app.include_router(optimization.router, prefix=f"{settings.API_V1_PREFIX}/optimization", tags=["optimization"])
-
-
-@app.get("/")
-async def root():
-    """Root endpoint"""
-    return {
-        "message": "SIFUT API",
-        "version": settings.APP_VERSION,
-        "docs": "/docs",
-    }
-
-
-@app.get("/health")
-async def health():
-    """Health check endpoint"""
-    return {"status": "healthy"}
+from app.core.warmup import warm_up
+from app.db.redis import close_redis
+from app.core.http_clients import http_clients
+from app.services.notifications import notification_hub
+from app.services.changes import change_hub
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown"""
+    # Uvicorn accepts connections only after this, so warm-up delays readiness
+    app.state.warmup = await warm_up() if settings.STARTUP_WARMUP else None
+    yield
+    await notification_hub.stop()
+    await change_hub.stop()
+    await close_redis()
+    await http_clients.aclose()
+
+
+def create_app() -> FastAPI:
+    """Build the application (``uvicorn --factory app.main:create_app``)"""
+    from app.api.endpoints import (
+        auth,
+        shifts,
+        meetings,
+        calendar,
+        optimization,
+        availability,
+        conflicts,
+        analytics,
+        notifications,
+        changes,
+        feeds,
+    )
+
+    app = FastAPI(
+        title=settings.APP_NAME,
+        version=settings.APP_VERSION,
+        docs_url="/docs",
+        redoc_url="/redoc",
+        lifespan=lifespan,
+    )
+
+    # Configure CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Include routers
+    app.include_router(auth.router, prefix=f"{settings.API_V1_PREFIX}/auth", tags=["auth"])
+    app.include_router(shifts.router, prefix=f"{settings.API_V1_PREFIX}/shifts", tags=["shifts"])
+    app.include_router(meetings.router, prefix=f"{settings.API_V1_PREFIX}/meetings", tags=["meetings"])
+    app.include_router(calendar.router, prefix=f"{settings.API_V1_PREFIX}/calendar", tags=["calendar"])
+    app.include_router(optimization.router, prefix=f"{settings.API_V1_PREFIX}/optimization", tags=["optimization"])
+    app.include_router(availability.router, prefix=f"{settings.API_V1_PREFIX}/availability", tags=["availability"])
+    app.include_router(conflicts.router, prefix=f"{settings.API_V1_PREFIX}/conflicts", tags=["conflicts"])
+    app.include_router(analytics.router, prefix=f"{settings.API_V1_PREFIX}/analytics", tags=["analytics"])
+    app.include_router(notifications.router, prefix=f"{settings.API_V1_PREFIX}/notifications", tags=["notifications"])
+    app.include_router(changes.router, prefix=f"{settings.API_V1_PREFIX}/changes", tags=["changes"])
+    app.include_router(feeds.router, prefix=f"{settings.API_V1_PREFIX}/feeds", tags=["feeds"])
+
+    @app.get("/")
+    async def root():
+        """Root endpoint"""
+        return {
+            "message": "SIFUT API",
+            "version": settings.APP_VERSION,
+            "docs": "/docs",
+        }
+
+    @app.get("/health")
+    async def health():
+        """Health check endpoint"""
+        return {"status": "healthy"}
+
+    return app
+
+
+app = create_app()
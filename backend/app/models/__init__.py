@@ -7,6 +7,11 @@ from app.models.meeting import Meeting, MeetingParticipant
 from app.models.optimization import OptimizationSuggestion, OptimizationAssignment
 from app.models.template import Template, TemplateShift
 from app.models.notification import Notification
+from app.models.schedule import ScheduleInterval
+from app.models.outbox import CalendarOutbox
+from app.models.llm_usage import LLMUsage
+from app.models.feed import CalendarFeed
+from app.models.workload import MonthlyWorkload
 
 __all__ = [
     "User",
@@ -21,4 +26,9 @@ __all__ = [
     "Template",
     "TemplateShift",
     "Notification",
+    "ScheduleInterval",
+    "CalendarOutbox",
+    "LLMUsage",
+    "CalendarFeed",
+    "MonthlyWorkload",
 ]
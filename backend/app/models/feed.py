@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, TIMESTAMP, ForeignKey
+from sqlalchemy.sql import func
+from app.db.database import Base
+from app.db.types import GUID
+
+
+class CalendarFeed(Base):
+    """iCalendar subscription feed of a user's or a project's schedule"""
+
+    __tablename__ = "calendar_feeds"
+
+    id = Column(GUID, primary_key=True)
+    token = Column(String(64), unique=True, nullable=False, index=True)  # secret part of the feed URL
+    user_id = Column(GUID, ForeignKey("users.id"), nullable=False, index=True)  # owner
+    project_id = Column(GUID, ForeignKey("projects.id"), nullable=True)  # null: the owner's own schedule
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
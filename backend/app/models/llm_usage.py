@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Integer, Numeric, TIMESTAMP, Text, Index
+from sqlalchemy.sql import func
+from app.db.database import Base
+from app.db.types import GUID
+
+
+class LLMUsage(Base):
+    """One LLM provider call made for an optimization"""
+
+    __tablename__ = "llm_usage"
+
+    id = Column(GUID, primary_key=True)
+    suggestion_id = Column(GUID, nullable=True, index=True)  # null if optimization failed
+    month = Column(String(7), nullable=False)  # optimized month, YYYY-MM
+    provider = Column(String(20), nullable=False)
+    model = Column(String(100), nullable=True)
+    status = Column(String(20), nullable=False)  # ok/error/cancelled/timeout
+    input_tokens = Column(Integer, nullable=True)
+    output_tokens = Column(Integer, nullable=True)
+    latency_ms = Column(Integer, nullable=False)
+    retries = Column(Integer, nullable=False, default=0)
+    cost_usd = Column(Numeric(12, 6), nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_llm_usage_month_provider", "month", "provider"),
+    )
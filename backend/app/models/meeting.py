@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, Boolean, TIMESTAMP, Text, CheckConstraint, JSON
+from sqlalchemy import Column, String, Boolean, TIMESTAMP, Text, CheckConstraint, JSON, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
+from app.db.types import GUID
 
 
 class Meeting(Base):
@@ -9,8 +10,8 @@ class Meeting(Base):
 
     __tablename__ = "meetings"
 
-    id = Column(String(36), primary_key=True)
-    project_id = Column(String(36), nullable=False, index=True)
+    id = Column(GUID, primary_key=True)
+    project_id = Column(GUID, ForeignKey("projects.id"), nullable=False, index=True)
     title = Column(String(200), nullable=False)
     description = Column(Text, nullable=True)
     start_datetime = Column(TIMESTAMP, nullable=False, index=True)
@@ -18,9 +19,9 @@ class Meeting(Base):
     meet_link = Column(Text, nullable=True)
     calendar_event_id = Column(String(255), nullable=True, index=True)
     is_recurring = Column(Boolean, nullable=False, default=False)
-    recurring_series_id = Column(String(36), nullable=True, index=True)
+    recurring_series_id = Column(GUID, nullable=True, index=True)
     recurrence_rule = Column(JSON, nullable=True)
-    created_by = Column(String(36), nullable=False)
+    created_by = Column(GUID, ForeignKey("users.id"), nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
 
@@ -39,9 +40,9 @@ class MeetingParticipant(Base):
 
     __tablename__ = "meeting_participants"
 
-    id = Column(String(36), primary_key=True)
-    meeting_id = Column(String(36), nullable=False, index=True)
-    user_id = Column(String(36), nullable=False, index=True)
+    id = Column(GUID, primary_key=True)
+    meeting_id = Column(GUID, ForeignKey("meetings.id"), nullable=False, index=True)
+    user_id = Column(GUID, ForeignKey("users.id"), nullable=False, index=True)
     status = Column(String(20), nullable=False, default="pending", index=True)  # pending/accepted/declined/tentative
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
 
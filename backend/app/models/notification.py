@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, Boolean, TIMESTAMP, Text
+from sqlalchemy import Column, String, Boolean, TIMESTAMP, Text, Index, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
+from app.db.types import GUID
 
 
 class Notification(Base):
@@ -9,8 +10,8 @@ class Notification(Base):
 
     __tablename__ = "notifications"
 
-    id = Column(String(36), primary_key=True)
-    user_id = Column(String(36), nullable=False, index=True)
+    id = Column(GUID, primary_key=True)
+    user_id = Column(GUID, ForeignKey("users.id"), nullable=False, index=True)
     type = Column(String(50), nullable=False)
     title = Column(String(200), nullable=False)
     message = Column(Text, nullable=False)
@@ -20,3 +21,8 @@ class Notification(Base):
 
     # Relationships
     user = relationship("User", back_populates="notifications")
+
+    __table_args__ = (
+        # Serves the inbox listing: per user, optionally unread only, newest first
+        Index("ix_notifications_user_read_created", "user_id", "is_read", "created_at"),
+    )
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, Date, Time, TIMESTAMP, JSON
+from sqlalchemy import Column, String, Integer, Date, Time, TIMESTAMP, JSON, Index, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
+from app.db.types import GUID
 
 
 class OptimizationSuggestion(Base):
@@ -9,12 +10,17 @@ class OptimizationSuggestion(Base):
 
     __tablename__ = "optimization_suggestions"
 
-    id = Column(String(36), primary_key=True)
+    id = Column(GUID, primary_key=True)
     month = Column(String(7), nullable=False, index=True)  # YYYY-MM format
-    status = Column(String(20), nullable=False, default="pending", index=True)  # pending/approved/rejected
+    status = Column(String(20), nullable=False, default="pending", index=True)  # pending/approved/rejected/superseded
     summary = Column(JSON, nullable=False)
-    created_by = Column(String(36), nullable=False)
-    approved_by = Column(String(36), nullable=True)
+    version = Column(Integer, nullable=False, default=1)
+    parent_id = Column(GUID, nullable=True, index=True)  # suggestion this version was re-optimized from
+    request_snapshot = Column(JSON, nullable=True)  # requests/projects the suggestion was built from
+    llm_provider = Column(String(20), nullable=True)  # provider that produced the result
+    llm_timings = Column(JSON, nullable=True)  # total_ms, hedged, per-attempt timings
+    created_by = Column(GUID, ForeignKey("users.id"), nullable=False)
+    approved_by = Column(GUID, ForeignKey("users.id"), nullable=True)
     approved_at = Column(TIMESTAMP, nullable=True)
     created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
 
@@ -29,10 +35,10 @@ class OptimizationAssignment(Base):
 
     __tablename__ = "optimization_assignments"
 
-    id = Column(String(36), primary_key=True)
-    suggestion_id = Column(String(36), nullable=False, index=True)
-    user_id = Column(String(36), nullable=False, index=True)
-    project_id = Column(String(36), nullable=False)
+    id = Column(GUID, primary_key=True)
+    suggestion_id = Column(GUID, ForeignKey("optimization_suggestions.id"), nullable=False)
+    user_id = Column(GUID, ForeignKey("users.id"), nullable=False, index=True)
+    project_id = Column(GUID, ForeignKey("projects.id"), nullable=False)
     date = Column(Date, nullable=False)
     start_time = Column(Time, nullable=False)
     end_time = Column(Time, nullable=False)
@@ -41,3 +47,8 @@ class OptimizationAssignment(Base):
     suggestion = relationship("OptimizationSuggestion", back_populates="assignments")
     user = relationship("User")
     project = relationship("Project", back_populates="optimization_assignments")
+
+    __table_args__ = (
+        # Serves per-suggestion loads and the ordered scans of the suggestion diff
+        Index("ix_optimization_assignments_suggestion_user_date", "suggestion_id", "user_id", "date"),
+    )
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, String, Integer, TIMESTAMP, Text, JSON, Index
+from sqlalchemy.sql import func
+from app.db.database import Base
+from app.db.types import GUID
+
+
+class CalendarOutbox(Base):
+    """Pending Google Calendar write (transactional outbox)
+
+    Rows are written in the same transaction as the shift/meeting change and
+    drained by the calendar outbox worker, so API requests never wait on
+    Google and failed writes are retried.
+    """
+
+    __tablename__ = "calendar_outbox"
+
+    id = Column(GUID, primary_key=True)
+    user_id = Column(GUID, nullable=False, index=True)  # calendar owner
+    entity_type = Column(String(20), nullable=False)  # shift/meeting
+    entity_id = Column(GUID, nullable=False)
+    operation = Column(String(20), nullable=False)  # upsert/delete
+    calendar_event_id = Column(String(255), nullable=True)
+    status = Column(String(20), nullable=False, default="pending")  # pending/processing/done/failed/cancelled
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    last_error = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)
+    completed_at = Column(TIMESTAMP, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_calendar_outbox_status_next", "status", "next_attempt_at"),
+        Index("ix_calendar_outbox_entity", "entity_type", "entity_id", "status"),
+    )
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, Integer, Boolean, TIMESTAMP, Text
+from sqlalchemy import Column, String, Integer, Boolean, TIMESTAMP, Text, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
+from app.db.types import GUID
 
 
 class Project(Base):
@@ -9,7 +10,7 @@ class Project(Base):
 
     __tablename__ = "projects"
 
-    id = Column(String(36), primary_key=True)
+    id = Column(GUID, primary_key=True)
     name = Column(String(100), nullable=False)
     description = Column(Text, nullable=True)
     required_members = Column(Integer, nullable=False, default=1)
@@ -30,9 +31,9 @@ class ProjectMember(Base):
 
     __tablename__ = "project_members"
 
-    id = Column(String(36), primary_key=True)
-    project_id = Column(String(36), nullable=False, index=True)
-    user_id = Column(String(36), nullable=False, index=True)
+    id = Column(GUID, primary_key=True)
+    project_id = Column(GUID, ForeignKey("projects.id"), nullable=False, index=True)
+    user_id = Column(GUID, ForeignKey("users.id"), nullable=False, index=True)
     role = Column(String(20), nullable=False, default="member")
     joined_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
 
@@ -0,0 +1,56 @@
+from sqlalchemy import Column, String, TIMESTAMP, Index, CheckConstraint, DDL, event
+from app.db.database import Base
+from app.db.types import GUID
+
+
+class ScheduleInterval(Base):
+    """Denormalized busy interval per user (confirmed shift or meeting attendance)
+
+    Every confirmed shift and every non-declined meeting participation is
+    mirrored here so overlap checks for a user are a single indexed range
+    query instead of a scan over the user's schedule history.
+    """
+
+    __tablename__ = "schedule_intervals"
+
+    id = Column(GUID, primary_key=True)
+    user_id = Column(GUID, nullable=False)
+    project_id = Column(GUID, nullable=False, index=True)
+    kind = Column(String(20), nullable=False)  # shift/meeting
+    source_id = Column(GUID, nullable=False)
+    start_at = Column(TIMESTAMP, nullable=False)
+    end_at = Column(TIMESTAMP, nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("end_at > start_at", name="chk_schedule_intervals_range"),
+        Index("ix_schedule_intervals_user_end", "user_id", "end_at"),
+        Index("ix_schedule_intervals_project_end", "project_id", "end_at"),
+        Index("ix_schedule_intervals_source", "kind", "source_id"),
+    )
+
+
+# PostgreSQL: GiST range index for O(log n) overlap lookups, and an exclusion
+# constraint so two confirmed shifts of the same user can never overlap even
+# under concurrent writes. Other backends use the btree indexes above.
+# Autogenerate cannot see these, so alembic/env.py applies them after every
+# upgrade; each statement is idempotent.
+SHIFT_OVERLAP_CONSTRAINT = "excl_schedule_intervals_shift_overlap"
+POSTGRES_RANGE_INDEXES = {"ix_schedule_intervals_user_period"}
+POSTGRES_RANGE_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gist",
+    "CREATE INDEX IF NOT EXISTS ix_schedule_intervals_user_period "
+    "ON schedule_intervals USING gist (user_id, tsrange(start_at, end_at))",
+    "DO $$ BEGIN "
+    f"IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = '{SHIFT_OVERLAP_CONSTRAINT}') THEN "
+    f"ALTER TABLE schedule_intervals ADD CONSTRAINT {SHIFT_OVERLAP_CONSTRAINT} "
+    "EXCLUDE USING gist (user_id WITH =, tsrange(start_at, end_at) WITH &&) "
+    "WHERE (kind = 'shift'); "
+    "END IF; END $$",
+]
+
+for _statement in POSTGRES_RANGE_DDL:
+    event.listen(
+        ScheduleInterval.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="postgresql"),
+    )
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, Date, Time, TIMESTAMP, Text, CheckConstraint
+from sqlalchemy import Column, String, Date, Time, TIMESTAMP, Text, CheckConstraint, Index, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
+from app.db.types import GUID
 
 
 class ShiftRequest(Base):
@@ -9,8 +10,8 @@ class ShiftRequest(Base):
 
     __tablename__ = "shift_requests"
 
-    id = Column(String(36), primary_key=True)
-    user_id = Column(String(36), nullable=False, index=True)
+    id = Column(GUID, primary_key=True)
+    user_id = Column(GUID, ForeignKey("users.id"), nullable=False, index=True)
     date = Column(Date, nullable=False, index=True)
     start_time = Column(Time, nullable=False)
     end_time = Column(Time, nullable=False)
@@ -33,15 +34,15 @@ class ConfirmedShift(Base):
 
     __tablename__ = "confirmed_shifts"
 
-    id = Column(String(36), primary_key=True)
-    user_id = Column(String(36), nullable=False, index=True)
-    project_id = Column(String(36), nullable=False, index=True)
+    id = Column(GUID, primary_key=True)
+    user_id = Column(GUID, ForeignKey("users.id"), nullable=False, index=True)
+    project_id = Column(GUID, ForeignKey("projects.id"), nullable=False, index=True)
     date = Column(Date, nullable=False, index=True)
     start_time = Column(Time, nullable=False)
     end_time = Column(Time, nullable=False)
     calendar_event_id = Column(String(255), nullable=True, index=True)
     comment = Column(Text, nullable=True)
-    created_by = Column(String(36), nullable=False)
+    created_by = Column(GUID, ForeignKey("users.id"), nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
 
@@ -52,4 +53,5 @@ class ConfirmedShift(Base):
 
     __table_args__ = (
         CheckConstraint("end_time > start_time", name="chk_confirmed_shifts_time"),
+        Index("ix_confirmed_shifts_project_date", "project_id", "date"),
     )
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, Integer, Time, TIMESTAMP, CheckConstraint
+from sqlalchemy import Column, String, Integer, Time, TIMESTAMP, CheckConstraint, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
+from app.db.types import GUID
 
 
 class Template(Base):
@@ -9,8 +10,8 @@ class Template(Base):
 
     __tablename__ = "templates"
 
-    id = Column(String(36), primary_key=True)
-    user_id = Column(String(36), nullable=False, index=True)
+    id = Column(GUID, primary_key=True)
+    user_id = Column(GUID, ForeignKey("users.id"), nullable=False, index=True)
     name = Column(String(100), nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -25,8 +26,8 @@ class TemplateShift(Base):
 
     __tablename__ = "template_shifts"
 
-    id = Column(String(36), primary_key=True)
-    template_id = Column(String(36), nullable=False, index=True)
+    id = Column(GUID, primary_key=True)
+    template_id = Column(GUID, ForeignKey("templates.id"), nullable=False, index=True)
     day_of_week = Column(Integer, nullable=False)  # 0=Sunday, 1=Monday, ... 6=Saturday
     start_time = Column(Time, nullable=False)
     end_time = Column(Time, nullable=False)
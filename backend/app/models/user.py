@@ -1,7 +1,8 @@
-from sqlalchemy import Column, String, TIMESTAMP, Text
+from sqlalchemy import Boolean, Column, String, TIMESTAMP, Text, false
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
+from app.db.types import GUID
 
 
 class User(Base):
@@ -9,7 +10,7 @@ class User(Base):
 
     __tablename__ = "users"
 
-    id = Column(String(36), primary_key=True)
+    id = Column(GUID, primary_key=True)
     google_id = Column(String(255), unique=True, nullable=False, index=True)
     email = Column(String(255), unique=True, nullable=False, index=True)
     name = Column(String(100), nullable=False)
@@ -18,12 +19,14 @@ class User(Base):
     google_access_token = Column(Text, nullable=True)
     google_refresh_token = Column(Text, nullable=True)
     token_expires_at = Column(TIMESTAMP, nullable=True)
+    # Opt-in: let other users' slot searches read this user's Google free/busy
+    share_google_busy = Column(Boolean, nullable=False, default=False, server_default=false())
     created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
 
     # Relationships
     shift_requests = relationship("ShiftRequest", back_populates="user", cascade="all, delete-orphan")
-    confirmed_shifts = relationship("ConfirmedShift", back_populates="user", cascade="all, delete-orphan")
+    confirmed_shifts = relationship("ConfirmedShift", foreign_keys="ConfirmedShift.user_id", back_populates="user", cascade="all, delete-orphan")
     created_shifts = relationship("ConfirmedShift", foreign_keys="ConfirmedShift.created_by", back_populates="creator")
     project_memberships = relationship("ProjectMember", back_populates="user", cascade="all, delete-orphan")
     created_meetings = relationship("Meeting", foreign_keys="Meeting.created_by", back_populates="creator")
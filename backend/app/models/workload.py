@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Integer, TIMESTAMP, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.database import Base
+from app.db.types import GUID
+
+
+class MonthlyWorkload(Base):
+    """Confirmed shifts of one user in one project and month (summary of confirmed_shifts)"""
+
+    __tablename__ = "monthly_workloads"
+
+    user_id = Column(GUID, ForeignKey("users.id"), primary_key=True)
+    project_id = Column(GUID, ForeignKey("projects.id"), primary_key=True)
+    month = Column(String(7), primary_key=True)  # YYYY-MM
+    shift_count = Column(Integer, nullable=False, default=0)
+    total_minutes = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_monthly_workloads_month_project", "month", "project_id"),
+        Index("ix_monthly_workloads_month_user", "month", "user_id"),
+    )
@@ -0,0 +1,106 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+
+
+class LLMUsageRow(BaseModel):
+    """LLM usage of one provider in one month"""
+
+    month: str
+    provider: str
+    calls: int
+    successful_calls: int
+    failed_calls: int  # errors and timeouts
+    cancelled_calls: int  # hedges that lost
+    input_tokens: int
+    output_tokens: int
+    retries: int
+    cost_usd: float
+    avg_latency_ms: Optional[int] = None  # successful calls only
+
+
+class LLMUsageResponse(BaseModel):
+    """LLM usage by month and provider"""
+
+    start_month: str
+    end_month: str  # exclusive
+    rows: List[LLMUsageRow]
+    total_cost_usd: float
+    total_input_tokens: int
+    total_output_tokens: int
+
+
+class CoverageProject(BaseModel):
+    """Project row of the coverage matrix"""
+
+    id: str
+    name: str
+    color: Optional[str] = None
+    required_members: int
+    understaffed_buckets: int
+    coverage_rate: float  # % of buckets meeting required_members
+
+
+class CoverageResponse(BaseModel):
+    """Project coverage heatmap
+
+    ``headcount[p][d][b]`` is the number of assigned members for
+    ``projects[p]`` on ``dates[d]`` in bucket ``buckets[b]``.
+    """
+
+    start_date: date
+    end_date: date
+    bucket_minutes: int
+    dates: List[date]
+    buckets: List[str]
+    projects: List[CoverageProject]
+    headcount: List[List[List[int]]]
+
+
+class WorkloadProject(BaseModel):
+    """A member's shifts in one project"""
+
+    project_id: str
+    project_name: str
+    shift_count: int
+    total_minutes: int
+
+
+class WorkloadMember(BaseModel):
+    """Confirmed workload of one member"""
+
+    user_id: str
+    name: str
+    email: str
+    shift_count: int
+    total_minutes: int
+    total_hours: float
+    projects: List[WorkloadProject]
+
+
+class WorkloadResponse(BaseModel):
+    """Member workload over a month range"""
+
+    start_month: str
+    end_month: str  # exclusive
+    members: List[WorkloadMember]
+
+
+class StaffingProject(BaseModel):
+    """Confirmed staffing totals of one project"""
+
+    id: str
+    name: str
+    color: Optional[str] = None
+    member_count: int
+    shift_count: int
+    total_minutes: int
+    total_hours: float
+
+
+class StaffingResponse(BaseModel):
+    """Project staffing over a month range"""
+
+    start_month: str
+    end_month: str  # exclusive
+    projects: List[StaffingProject]
@@ -27,6 +27,7 @@ class UserResponse(BaseModel):
     name: str
     avatar_url: Optional[str] = None
     role: str
+    share_google_busy: bool = False
     created_at: datetime
     updated_at: datetime
 
@@ -34,6 +35,12 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+class UserUpdate(BaseModel):
+    """Current user settings update"""
+
+    share_google_busy: Optional[bool] = None
+
+
 class AuthResponse(BaseModel):
     """Authentication response"""
 
@@ -0,0 +1,37 @@
+from pydantic import BaseModel, Field
+from typing import List
+from datetime import date, time, datetime
+import uuid
+
+
+class CommonSlotsRequest(BaseModel):
+    """Common free slot search request"""
+
+    participant_ids: List[uuid.UUID] = Field(..., min_length=1)
+    start_date: date
+    end_date: date
+    duration_minutes: int = Field(60, gt=0)
+    work_start: time = time(9, 0)
+    work_end: time = time(18, 0)
+    exclude_weekends: bool = False
+    include_google_busy: bool = False
+    min_available: int = Field(1, ge=1)
+    limit: int = Field(20, ge=1, le=200)
+
+
+class CandidateSlot(BaseModel):
+    """Candidate meeting slot"""
+
+    start_datetime: datetime
+    end_datetime: datetime
+    available_count: int
+    available_user_ids: List[str]
+    unavailable_user_ids: List[str]
+
+
+class CommonSlotsResponse(BaseModel):
+    """Common free slot search response"""
+
+    participant_count: int
+    slot_minutes: int
+    slots: List[CandidateSlot]
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class ScheduleIntervalResponse(BaseModel):
+    """Busy interval (shift or meeting attendance)"""
+
+    kind: str
+    source_id: str
+    project_id: str
+    start_at: datetime
+    end_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ConflictResponse(BaseModel):
+    """Overlapping pair of intervals for one user"""
+
+    user_id: str
+    first: ScheduleIntervalResponse
+    second: ScheduleIntervalResponse
+    overlap_start: datetime
+    overlap_end: datetime
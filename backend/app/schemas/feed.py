@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+import uuid
+
+
+class CalendarFeedCreate(BaseModel):
+    """Calendar feed creation (no project: the current user's own schedule)"""
+
+    project_id: Optional[uuid.UUID] = None
+
+
+class CalendarFeedResponse(BaseModel):
+    """Calendar feed with its subscription URL"""
+
+    id: str
+    project_id: Optional[str]
+    url: str
+    created_at: datetime
@@ -1,17 +1,18 @@
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
+import uuid
 
 
 class MeetingCreate(BaseModel):
     """Meeting creation"""
 
-    project_id: str
+    project_id: uuid.UUID
     title: str
     description: Optional[str] = None
     start_datetime: datetime
     end_datetime: datetime
-    participant_ids: List[str]
+    participant_ids: List[uuid.UUID]
     is_recurring: bool = False
     recurrence_rule: Optional[dict] = None
 
@@ -0,0 +1,38 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+import uuid
+
+
+class NotificationResponse(BaseModel):
+    """Notification response"""
+
+    id: str
+    user_id: str
+    type: str
+    title: str
+    message: str
+    link: Optional[str] = None
+    is_read: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class NotificationPage(BaseModel):
+    """Page of notifications (keyset pagination)"""
+
+    items: List[NotificationResponse]
+    next_cursor: Optional[str] = None
+
+
+class MarkReadRequest(BaseModel):
+    """Mark notifications as read
+
+    Either ``ids`` or ``all=true`` (optionally bounded by ``before``).
+    """
+
+    ids: Optional[List[uuid.UUID]] = None
+    all: bool = False
+    before: Optional[datetime] = None
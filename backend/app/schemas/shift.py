@@ -1,6 +1,7 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import date, time, datetime
+import uuid
 
 
 class ShiftRequestCreate(BaseModel):
@@ -43,8 +44,8 @@ class ShiftRequestResponse(BaseModel):
 class ConfirmedShiftCreate(BaseModel):
     """Confirmed shift creation"""
 
-    user_id: str
-    project_id: str
+    user_id: uuid.UUID
+    project_id: uuid.UUID
     date: date
     start_time: time
     end_time: time
@@ -68,3 +69,20 @@ class ConfirmedShiftResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ShiftImportRowError(BaseModel):
+    """Errors of one CSV line"""
+
+    line: int
+    errors: List[str]
+
+
+class ShiftImportResponse(BaseModel):
+    """Result of a CSV import (nothing is imported when any row is invalid)"""
+
+    rows: int
+    imported: int
+    error_count: int
+    errors: List[ShiftImportRowError]
+    dry_run: bool
@@ -0,0 +1,167 @@
+"""Production server
+
+Runs a pre-fork pool of uvicorn workers under gunicorn: one worker per CPU
+by default, the app preloaded in the master so workers fork with it
+already imported, per-worker DB pools sized from DB_MAX_CONNECTIONS, and
+each worker recycled after SERVER_MAX_REQUESTS requests (with jitter) to
+bound memory growth.
+
+Usage (from backend/):
+    python -m app.server                  # serve with WEB_CONCURRENCY or CPU-count workers
+    python -m app.server --workers 8 --bind 0.0.0.0:8000
+    python -m app.server restart          # rolling restart, one worker at a time
+    python -m app.server upgrade          # new master with the deployed code, then stop the old one
+"""
+from typing import Any, Dict, Optional
+import argparse
+import os
+import signal
+import sys
+import time
+
+from app.core.config import settings
+
+
+def worker_count(requested: Optional[int] = None) -> int:
+    return requested or settings.WEB_CONCURRENCY or os.cpu_count() or 1
+
+
+def post_fork(server, worker) -> None:
+    """Never reuse DB connections the master may have opened before forking"""
+    from app.db.database import engine
+
+    engine.dispose(close=False)
+
+
+def when_ready(server) -> None:
+    # gunicorn re-executes sys.argv on USR2, which would run this file as a
+    # script (outside the app package); re-run it as a module instead
+    server.START_CTX["args"] = [sys.executable, "-m", "app.server", *sys.argv[1:]]
+
+
+def gunicorn_options(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "bind": args.bind,
+        "workers": args.workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": not args.no_preload,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests_jitter,
+        "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        "timeout": settings.SERVER_TIMEOUT_SECONDS,
+        "keepalive": settings.SERVER_KEEPALIVE_SECONDS,
+        "pidfile": args.pidfile,
+        "post_fork": post_fork,
+        "when_ready": when_ready,
+    }
+
+
+def serve(args: argparse.Namespace) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    # Workers size their DB pools from WEB_CONCURRENCY; set it before the app
+    # (and app.db.database) is imported here or in the workers
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
+    settings.WEB_CONCURRENCY = args.workers
+
+    from app.db.database import pool_limits
+
+    pool_size, max_overflow = pool_limits(args.workers)
+    print(
+        f"Starting {args.workers} workers on {args.bind}; DB pool per worker "
+        f"{pool_size}+{max_overflow} overflow, at most "
+        f"{(args.workers + 1) * (pool_size + max_overflow)} connections per database "
+        f"(including the extra worker of a rolling restart)"
+    )
+
+    class Server(BaseApplication):
+        def __init__(self, options: Dict[str, Any]):
+            self.options = options
+            super().__init__()
+
+        def load_config(self) -> None:
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+
+            return app
+
+    Server(gunicorn_options(args)).run()
+
+
+def read_pid(pidfile: str) -> int:
+    try:
+        with open(pidfile) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        raise SystemExit(f"No running server found ({pidfile})")
+
+
+def rolling_restart(args: argparse.Namespace) -> None:
+    """Replace workers one at a time: add one (TTIN), then retire the oldest (TTOU)
+
+    Capacity never drops below the configured worker count. Workers fork
+    from the master, so this recycles memory and connections but does not
+    load new code (use ``upgrade`` for that).
+    """
+    pid = read_pid(args.pidfile)
+    for n in range(args.workers):
+        os.kill(pid, signal.SIGTTIN)
+        time.sleep(args.settle_seconds)  # new worker boots and warms up
+        os.kill(pid, signal.SIGTTOU)  # oldest worker drains and exits
+        time.sleep(args.settle_seconds)
+        print(f"Replaced worker {n + 1}/{args.workers}")
+
+
+def upgrade(args: argparse.Namespace) -> None:
+    """Zero-downtime code reload: start a new master (USR2), then stop the old one
+
+    Both masters share the listening socket, so the old one keeps serving
+    until the new workers are up. If the new master fails to start, the old
+    one is left running.
+    """
+    old_pid = read_pid(args.pidfile)
+    os.kill(old_pid, signal.SIGUSR2)
+
+    # The new master writes <pidfile>.2 and takes over <pidfile> once the old one exits
+    new_pidfile = f"{args.pidfile}.2"
+    deadline = time.monotonic() + args.timeout
+    while time.monotonic() < deadline:
+        if os.path.exists(new_pidfile):
+            break
+        time.sleep(0.5)
+    else:
+        raise SystemExit("New master did not start; the old master keeps serving")
+
+    new_pid = read_pid(new_pidfile)
+    time.sleep(args.settle_seconds)
+    os.kill(old_pid, signal.SIGTERM)  # graceful: in-flight requests finish
+    print(f"Upgraded: master {old_pid} -> {new_pid}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the production API server")
+    parser.add_argument("command", nargs="?", default="serve", choices=["serve", "restart", "upgrade"])
+    parser.add_argument("--workers", type=int, default=None, help="Default: WEB_CONCURRENCY or the CPU count")
+    parser.add_argument("--bind", default=settings.SERVER_BIND)
+    parser.add_argument("--pidfile", default=settings.SERVER_PIDFILE)
+    parser.add_argument("--max-requests", type=int, default=settings.SERVER_MAX_REQUESTS)
+    parser.add_argument("--max-requests-jitter", type=int, default=settings.SERVER_MAX_REQUESTS_JITTER)
+    parser.add_argument("--no-preload", action="store_true", help="Import the app in each worker instead")
+    parser.add_argument("--settle-seconds", type=float, default=5.0, help="restart/upgrade: wait for new workers")
+    parser.add_argument("--timeout", type=float, default=60.0, help="upgrade: wait for the new master")
+    args = parser.parse_args()
+    args.workers = worker_count(args.workers)
+
+    if args.command == "restart":
+        rolling_restart(args)
+    elif args.command == "upgrade":
+        upgrade(args)
+    else:
+        serve(args)
+
+
+if __name__ == "__main__":
+    main()
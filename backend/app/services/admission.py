@@ -0,0 +1,253 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import math
+import time
+import uuid
+
+from app.core.config import settings
+from app.db.database import engine, pool_usage
+from app.db.redis import get_redis
+
+ADMISSION_KEY_PREFIX = "sifut:admission"
+
+# Limits per route class. Budgets are cost units per minute (each endpoint
+# declares its cost), concurrency counts requests in progress.
+ROUTE_CLASSES: Dict[str, Dict[str, float]] = {
+    # LLM optimization: minutes of provider time and a DB session each
+    "llm": {
+        "user_per_minute": 20,
+        "user_burst": 20,
+        "global_per_minute": 60,
+        "global_burst": 60,
+        "user_concurrency": 1,
+        "global_concurrency": 4,
+    },
+    # Google Calendar calls made within the request, and sync enqueues
+    "google": {
+        "user_per_minute": 60,
+        "user_burst": 30,
+        "global_per_minute": 1200,
+        "global_burst": 300,
+        "user_concurrency": 2,
+        "global_concurrency": 20,
+    },
+    # Large imports, exports and aggregations
+    "bulk": {
+        "user_per_minute": 30,
+        "user_burst": 30,
+        "global_per_minute": 120,
+        "global_burst": 60,
+        "user_concurrency": 1,
+        "global_concurrency": 4,
+    },
+}
+
+# Atomically check every level's token bucket and concurrency set, then
+# take ``cost`` tokens and a slot from all of them, or nothing.
+# KEYS: bucket keys followed by their in-flight set keys
+# ARGV: now_ms, cost, lease, lease_ms, then (rate_per_ms, burst, concurrency) per level
+# Returns 0 if admitted, -1 at a concurrency limit, otherwise the
+# milliseconds until enough tokens are available.
+ADMIT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local lease = ARGV[3]
+local lease_ms = tonumber(ARGV[4])
+local n = #KEYS / 2
+local wait = 0
+local busy = false
+local levels = {}
+for i = 1, n do
+  local rate = tonumber(ARGV[3 * i + 2])
+  local burst = tonumber(ARGV[3 * i + 3])
+  local limit = tonumber(ARGV[3 * i + 4])
+  redis.call('ZREMRANGEBYSCORE', KEYS[n + i], '-inf', now)
+  if redis.call('ZCARD', KEYS[n + i]) >= limit then busy = true end
+  local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+  local tokens = tonumber(state[1]) or burst
+  local ts = tonumber(state[2]) or now
+  tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+  levels[i] = tokens
+  if tokens < cost then
+    wait = math.max(wait, math.ceil((cost - tokens) / rate))
+  end
+end
+if busy then return -1 end
+if wait > 0 then return wait end
+for i = 1, n do
+  local rate = tonumber(ARGV[3 * i + 2])
+  local burst = tonumber(ARGV[3 * i + 3])
+  redis.call('HSET', KEYS[i], 'tokens', levels[i] - cost, 'ts', now)
+  redis.call('PEXPIRE', KEYS[i], math.ceil(burst / rate) + 1000)
+  redis.call('ZADD', KEYS[n + i], now + lease_ms, lease)
+  redis.call('PEXPIRE', KEYS[n + i], lease_ms)
+end
+return 0
+"""
+
+
+class AdmissionRejected(Exception):
+    """Request refused; ``status_code`` is 429 (over a limit) or 503 (shed)"""
+
+    def __init__(self, status_code: int, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+@dataclass
+class Lease:
+    """A granted admission, held until the request finishes"""
+
+    id: str
+    keys: List[str] = field(default_factory=list)
+    local: bool = False
+
+
+class AdmissionController:
+    """Rate and concurrency limits in front of expensive endpoints
+
+    Each admitted request takes ``cost`` tokens from two buckets of its route
+    class (the caller's and the class-wide one) and a slot from two in-flight
+    sets (same levels). State lives in Redis so every worker enforces one
+    budget; without Redis the same checks run on in-process state. Slots are
+    leases that expire after ADMISSION_LEASE_SECONDS, so a crashed worker
+    cannot leak them.
+
+    Before that, each worker sheds expensive requests early (503) when it
+    already runs ADMISSION_MAX_IN_FLIGHT of them or its DB pool is more than
+    ADMISSION_SHED_POOL_RATIO checked out, which keeps connections free for
+    cheap requests (those never pass through here).
+    """
+
+    def __init__(self):
+        self._script = None
+        self.in_flight = 0
+        self._local: Dict[str, Tuple[float, float]] = {}
+        self._local_leases: Dict[str, Dict[str, float]] = {}
+
+    @staticmethod
+    def limits(route_class: str) -> Dict[str, float]:
+        if route_class not in ROUTE_CLASSES:
+            raise ValueError(f"Unknown route class: {route_class}")
+        return {**ROUTE_CLASSES[route_class], **settings.ADMISSION_LIMITS.get(route_class, {})}
+
+    def _levels(self, route_class: str, subject: str) -> List[Tuple[str, float, float, int]]:
+        """(key, rate per ms, burst, concurrency) for the caller's and the class-wide level"""
+        limits = self.limits(route_class)
+        return [
+            (
+                f"{ADMISSION_KEY_PREFIX}:{route_class}:{level}",
+                limits[f"{scope}_per_minute"] / 60000.0,
+                float(limits[f"{scope}_burst"]),
+                int(limits[f"{scope}_concurrency"]),
+            )
+            for scope, level in (("user", f"user:{subject}"), ("global", "global"))
+        ]
+
+    def shed(self) -> Optional[str]:
+        """Reason to shed an expensive request on this worker right now, if any"""
+        if self.in_flight >= settings.ADMISSION_MAX_IN_FLIGHT:
+            return f"{self.in_flight} expensive requests already in progress"
+        checked_out, capacity = pool_usage(engine)
+        if capacity and checked_out >= capacity * settings.ADMISSION_SHED_POOL_RATIO:
+            return f"database pool saturated ({checked_out}/{capacity})"
+        return None
+
+    async def _try_admit(self, levels, cost: float, lease: Lease) -> int:
+        """0 if admitted, -1 at a concurrency limit, else milliseconds until tokens suffice"""
+        now = int(time.time() * 1000)
+        lease_ms = settings.ADMISSION_LEASE_SECONDS * 1000
+        try:
+            redis = get_redis()
+            if self._script is None:
+                self._script = redis.register_script(ADMIT_SCRIPT)
+            args = [now, cost, lease.id, lease_ms]
+            for _, rate, burst, concurrency in levels:
+                args.extend([rate, burst, concurrency])
+            keys = [l[0] for l in levels] + [f"{l[0]}:inflight" for l in levels]
+            result = int(await self._script(keys=keys, args=args, client=redis))
+            if result == 0:
+                lease.keys = keys[len(levels):]
+            return result
+        except Exception as e:
+            print(f"Admission control falling back to local limits: {e}")
+            self._script = None
+            return self._try_admit_local(levels, now, lease_ms, cost, lease)
+
+    def _try_admit_local(self, levels, now: int, lease_ms: int, cost: float, lease: Lease) -> int:
+        wait, busy, tokens_by_key = 0, False, []
+        for key, rate, burst, concurrency in levels:
+            leases = self._local_leases.setdefault(key, {})
+            for expired in [k for k, expiry in leases.items() if expiry <= now]:
+                del leases[expired]
+            busy = busy or len(leases) >= concurrency
+            tokens, ts = self._local.get(key, (burst, now))
+            tokens = min(burst, tokens + max(0, now - ts) * rate)
+            tokens_by_key.append(tokens)
+            if tokens < cost:
+                wait = max(wait, math.ceil((cost - tokens) / rate))
+        if busy:
+            return -1
+        if wait > 0:
+            return wait
+        for (key, _, _, _), tokens in zip(levels, tokens_by_key):
+            self._local[key] = (tokens - cost, now)
+            self._local_leases[key][lease.id] = now + lease_ms
+        lease.keys = [key for key, _, _, _ in levels]
+        lease.local = True
+        return 0
+
+    async def admit(self, route_class: str, cost: float, subject: str) -> Optional[Lease]:
+        """Admit a request of ``route_class`` weighing ``cost`` for ``subject``
+
+        Raises AdmissionRejected; release the returned lease when the
+        request is done.
+        """
+        levels = self._levels(route_class, subject)
+        if not settings.ADMISSION_CONTROL_ENABLED:
+            return None
+
+        reason = self.shed()
+        if reason:
+            raise AdmissionRejected(
+                503, settings.ADMISSION_RETRY_AFTER_SECONDS, f"Server busy: {reason}; retry later"
+            )
+
+        # A cost above a bucket's burst could never be granted
+        cost = min(cost, *(burst for _, _, burst, _ in levels))
+        lease = Lease(id=uuid.uuid4().hex)
+        result = await self._try_admit(levels, cost, lease)
+        if result < 0:
+            raise AdmissionRejected(
+                429,
+                settings.ADMISSION_RETRY_AFTER_SECONDS,
+                f"Too many concurrent {route_class} requests; retry later",
+            )
+        if result > 0:
+            raise AdmissionRejected(
+                429, max(1, math.ceil(result / 1000)), f"Rate limit exceeded for {route_class} requests"
+            )
+        self.in_flight += 1
+        return lease
+
+    async def release(self, lease: Optional[Lease]) -> None:
+        """Give back a lease's concurrency slots"""
+        if lease is None:
+            return
+        self.in_flight -= 1
+        if lease.local:
+            for key in lease.keys:
+                self._local_leases.get(key, {}).pop(lease.id, None)
+            return
+        try:
+            redis = get_redis()
+            for key in lease.keys:
+                await redis.zrem(key, lease.id)
+        except Exception as e:
+            # The slots expire with the lease
+            print(f"Error releasing admission lease: {e}")
+
+
+admission_controller = AdmissionController()
@@ -0,0 +1,57 @@
+from datetime import date, time
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class AnalyticsService:
+    """Aggregations for admin dashboards"""
+
+    @staticmethod
+    def coverage_matrix(
+        project_ids: Sequence[str],
+        start_date: date,
+        days: int,
+        rows: Iterable[Tuple[str, date, time, time]],
+        bucket_minutes: int = 60,
+        day_start_minute: int = 0,
+        day_end_minute: int = MINUTES_PER_DAY,
+    ) -> np.ndarray:
+        """Headcount per (project, day, bucket) from confirmed shift rows
+
+        ``rows`` are (project_id, date, start_time, end_time). A shift counts
+        towards every bucket it overlaps. The whole pass is a difference array
+        plus a cumulative sum, so cost is linear in rows + matrix size.
+        """
+        first = day_start_minute // bucket_minutes
+        buckets = max(-(-day_end_minute // bucket_minutes) - first, 0)
+
+        index = {project_id: i for i, project_id in enumerate(project_ids)}
+        project_idx: List[int] = []
+        day_idx: List[int] = []
+        start_min: List[int] = []
+        end_min: List[int] = []
+        for project_id, day, start, end in rows:
+            i = index.get(project_id)
+            if i is None:
+                continue
+            project_idx.append(i)
+            day_idx.append((day - start_date).days)
+            start_min.append(start.hour * 60 + start.minute)
+            end_min.append(end.hour * 60 + end.minute)
+
+        diff = np.zeros((len(project_ids), days, buckets + 1), dtype=np.int32)
+        if project_idx and buckets:
+            p = np.array(project_idx, dtype=np.int64)
+            d = np.array(day_idx, dtype=np.int64)
+            s = np.clip(np.array(start_min) // bucket_minutes - first, 0, buckets)
+            e = np.clip(-(-np.array(end_min) // bucket_minutes) - first, 0, buckets)
+
+            keep = (d >= 0) & (d < days) & (e > s)
+            p, d, s, e = p[keep], d[keep], s[keep], e[keep]
+            np.add.at(diff, (p, d, s), 1)
+            np.add.at(diff, (p, d, e), -1)
+
+        return np.cumsum(diff[:, :, :-1], axis=2)
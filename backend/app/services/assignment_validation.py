@@ -0,0 +1,336 @@
+from collections import Counter, defaultdict
+from datetime import date, time
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.http_clients import HTTPClients
+from app.services.llm_router import LLMRoutingError
+from app.services.llm_service import LLMService
+
+# (user_id, project_id, date, start_time, end_time)
+Slot = Tuple[str, str, date, time, time]
+
+MAX_REPORTED_VIOLATIONS = 50
+
+
+def _parse_time(value: Any) -> time:
+    # LLMs sometimes drop the leading zero ("9:00")
+    hours, _, rest = str(value).partition(":")
+    return time.fromisoformat(f"{int(hours):02d}:{rest}")
+
+
+def _overlaps(booked: Iterable[Tuple[time, time]], start: time, end: time) -> bool:
+    return any(s < end and start < e for s, e in booked)
+
+
+def _minutes(start: time, end: time) -> int:
+    return (end.hour * 60 + end.minute) - (start.hour * 60 + start.minute)
+
+
+class AssignmentValidator:
+    """Checks LLM assignments against the submitted requests
+
+    Requests are indexed once by (user_id, date) and projects by id, so every
+    per-assignment check is a hash lookup; double-booking is found with one
+    sweep over each user's assignments sorted by start.
+    """
+
+    def __init__(
+        self,
+        shift_requests: List[Dict[str, Any]],
+        projects: List[Dict[str, Any]],
+        month: str,
+    ):
+        self.month = month
+        self.projects = {p["id"]: p for p in projects}
+        self.windows: Dict[Tuple[str, date], List[Tuple[time, time]]] = defaultdict(list)
+        self.requests_by_day: Dict[date, List[Tuple[str, time, time]]] = defaultdict(list)
+        for sr in shift_requests:
+            day = date.fromisoformat(sr["date"])
+            start, end = time.fromisoformat(sr["start_time"]), time.fromisoformat(sr["end_time"])
+            self.windows[(sr["user_id"], day)].append((start, end))
+            self.requests_by_day[day].append((sr["user_id"], start, end))
+        self.user_ids = {user_id for user_id, _ in self.windows}
+
+    @staticmethod
+    def parse(raw: Any) -> Optional[Slot]:
+        """Normalize one assignment dict; None if fields are missing or unparseable"""
+        try:
+            return (
+                str(raw["user_id"]),
+                str(raw["project_id"]),
+                date.fromisoformat(str(raw["date"])),
+                _parse_time(raw["start_time"]),
+                _parse_time(raw["end_time"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def format(slot: Slot) -> Dict[str, str]:
+        user_id, project_id, day, start, end = slot
+        return {
+            "user_id": user_id,
+            "project_id": project_id,
+            "date": day.isoformat(),
+            "start_time": start.strftime("%H:%M"),
+            "end_time": end.strftime("%H:%M"),
+        }
+
+    def check_slot(self, slot: Optional[Slot]) -> Optional[str]:
+        """Violation code of a single assignment, ignoring other assignments"""
+        if slot is None:
+            return "malformed"
+        user_id, project_id, day, start, end = slot
+        if f"{day:%Y-%m}" != self.month:
+            return "outside_month"
+        if end <= start:
+            return "invalid_time"
+        if user_id not in self.user_ids:
+            return "unknown_user"
+        if project_id not in self.projects:
+            return "unknown_project"
+        if not any(s <= start and end <= e for s, e in self.windows.get((user_id, day), ())):
+            return "outside_request"
+        return None
+
+    def validate(
+        self, assignments: List[Any]
+    ) -> Tuple[List[Optional[Slot]], List[Dict[str, Any]]]:
+        """Returns the parsed slots and one violation per invalid assignment
+
+        When two assignments of a user overlap, the later-starting one is
+        reported as ``double_booked`` and the earlier one is kept.
+        """
+        slots = [self.parse(raw) for raw in assignments]
+        violations = []
+        by_user: Dict[str, List[int]] = defaultdict(list)
+
+        for index, slot in enumerate(slots):
+            code = self.check_slot(slot)
+            if code:
+                violations.append(self._violation(index, slot, code))
+            else:
+                by_user[slot[0]].append(index)
+
+        for indexes in by_user.values():
+            indexes.sort(key=lambda i: (slots[i][2], slots[i][3]))
+            last_day, last_end = None, None
+            for i in indexes:
+                _, _, day, start, end = slots[i]
+                if day == last_day and start < last_end:
+                    violations.append(self._violation(i, slots[i], "double_booked"))
+                    continue
+                last_day, last_end = day, end
+
+        violations.sort(key=lambda v: v["index"])
+        return slots, violations
+
+    def repair_targets(
+        self, slots: List[Optional[Slot]], violations: List[Dict[str, Any]]
+    ) -> Dict[date, Set[str]]:
+        """(day -> project ids) whose staffing was damaged by the violations"""
+        targets: Dict[date, Set[str]] = defaultdict(set)
+        for violation in violations:
+            slot = slots[violation["index"]]
+            if slot is None or f"{slot[2]:%Y-%m}" != self.month:
+                continue
+            if slot[1] in self.projects:
+                targets[slot[2]].add(slot[1])
+            else:
+                # The intended project is unknown; any project of that day may be short
+                targets[slot[2]].update(self.projects)
+        return dict(targets)
+
+    def free_requests(
+        self, kept: List[Slot], targets: Dict[date, Set[str]]
+    ) -> List[Dict[str, str]]:
+        """Requests on the target days that do not clash with kept assignments"""
+        booked = self._booked(kept)
+        return [
+            {
+                "user_id": user_id,
+                "date": day.isoformat(),
+                "start_time": start.isoformat(),
+                "end_time": end.isoformat(),
+            }
+            for day in sorted(targets)
+            for user_id, start, end in self.requests_by_day.get(day, ())
+            if not _overlaps(booked[(user_id, day)], start, end)
+        ]
+
+    def fill(
+        self,
+        kept: List[Slot],
+        targets: Dict[date, Set[str]],
+        proposals: Iterable[Optional[Slot]] = (),
+    ) -> List[Slot]:
+        """Re-staff under-filled (day, project) pairs in ``targets``
+
+        ``proposals`` (e.g. from a targeted LLM call) are accepted first if
+        they pass every check; remaining gaps are filled greedily with the
+        requests of that day, least-loaded member first, using the member's
+        whole requested window. Returns only the added slots.
+        """
+        booked = self._booked(kept)
+        staffed: Dict[Tuple[date, str], Set[str]] = defaultdict(set)
+        load: Dict[str, int] = defaultdict(int)
+        for user_id, project_id, day, start, end in kept:
+            staffed[(day, project_id)].add(user_id)
+            load[user_id] += _minutes(start, end)
+
+        def deficit(day: date, project_id: str) -> int:
+            required = self.projects[project_id].get("required_members") or 0
+            return required - len(staffed[(day, project_id)])
+
+        added: List[Slot] = []
+
+        def take(slot: Slot) -> None:
+            user_id, project_id, day, start, end = slot
+            booked[(user_id, day)].append((start, end))
+            staffed[(day, project_id)].add(user_id)
+            load[user_id] += _minutes(start, end)
+            added.append(slot)
+
+        for slot in proposals:
+            if self.check_slot(slot) is not None:
+                continue
+            user_id, project_id, day, start, end = slot
+            if (
+                project_id in targets.get(day, ())
+                and deficit(day, project_id) > 0
+                and user_id not in staffed[(day, project_id)]
+                and not _overlaps(booked[(user_id, day)], start, end)
+            ):
+                take(slot)
+
+        for day in sorted(targets):
+            requests = self.requests_by_day.get(day, ())
+            for project_id in sorted(targets[day], key=lambda p: (-deficit(day, p), p)):
+                while deficit(day, project_id) > 0:
+                    candidates = [
+                        (load[user_id], user_id, start, end)
+                        for user_id, start, end in requests
+                        if user_id not in staffed[(day, project_id)]
+                        and not _overlaps(booked[(user_id, day)], start, end)
+                    ]
+                    if not candidates:
+                        break
+                    _, user_id, start, end = min(candidates)
+                    take((user_id, project_id, day, start, end))
+
+        return added
+
+    @staticmethod
+    def _booked(slots: Iterable[Slot]) -> Dict[Tuple[str, date], List[Tuple[time, time]]]:
+        booked: Dict[Tuple[str, date], List[Tuple[time, time]]] = defaultdict(list)
+        for user_id, _, day, start, end in slots:
+            booked[(user_id, day)].append((start, end))
+        return booked
+
+    @staticmethod
+    def _violation(index: int, slot: Optional[Slot], code: str) -> Dict[str, Any]:
+        violation = {"index": index, "code": code}
+        if slot is not None:
+            violation.update(
+                user_id=slot[0], project_id=slot[1], date=slot[2].isoformat()
+            )
+        return violation
+
+
+class AssignmentRepairService:
+    """Validates an optimization result and repairs only the damaged part"""
+
+    @staticmethod
+    async def validate_and_repair(
+        result: Dict[str, Any],
+        shift_requests: List[Dict[str, Any]],
+        projects: List[Dict[str, Any]],
+        month: str,
+        clients: Optional[HTTPClients] = None,
+        mode: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Returns the cleaned result and the attempts of any repair LLM call
+
+        Invalid assignments are dropped and the (day, project) pairs they
+        belonged to are re-staffed according to ``OPTIMIZATION_REPAIR_MODE``.
+        A report is added as ``summary["validation"]``.
+        """
+        started = perf_counter()
+        mode = mode or settings.OPTIMIZATION_REPAIR_MODE
+        raw = result.get("assignments")
+        if not isinstance(raw, list):
+            raw = []
+
+        validator = AssignmentValidator(shift_requests, projects, month)
+        slots, violations = validator.validate(raw)
+        invalid = {v["index"] for v in violations}
+        kept = [slot for index, slot in enumerate(slots) if index not in invalid]
+
+        report: Dict[str, Any] = {"checked": len(raw), "violations": len(violations)}
+        repair_attempts: List[Dict[str, Any]] = []
+        added: List[Slot] = []
+
+        if violations:
+            targets = validator.repair_targets(slots, violations)
+            proposals: List[Optional[Slot]] = []
+            if mode == "llm" and targets:
+                proposals, repair_attempts = await AssignmentRepairService._llm_proposals(
+                    validator, kept, targets, projects, month, clients
+                )
+            if mode != "off":
+                added = validator.fill(kept, targets, proposals)
+
+            report.update(
+                by_code=dict(Counter(v["code"] for v in violations)),
+                dropped=len(violations),
+                added=len(added),
+                repair_mode=mode,
+                repaired=[
+                    {"date": day.isoformat(), "project_ids": sorted(project_ids)}
+                    for day, project_ids in sorted(targets.items())
+                ],
+                details=violations[:MAX_REPORTED_VIOLATIONS],
+            )
+
+        summary = result.get("summary")
+        summary = dict(summary) if isinstance(summary, dict) else {}
+        if violations:
+            summary["total_shifts"] = len(kept) + len(added)
+        report["elapsed_ms"] = round((perf_counter() - started) * 1000, 2)
+        summary["validation"] = report
+
+        return {
+            **result,
+            "assignments": [validator.format(slot) for slot in kept + added],
+            "summary": summary,
+        }, repair_attempts
+
+    @staticmethod
+    async def _llm_proposals(
+        validator: AssignmentValidator,
+        kept: List[Slot],
+        targets: Dict[date, Set[str]],
+        projects: List[Dict[str, Any]],
+        month: str,
+        clients: Optional[HTTPClients],
+    ) -> Tuple[List[Optional[Slot]], List[Dict[str, Any]]]:
+        """Ask the LLM to staff only the damaged days with the still-free requests"""
+        free = validator.free_requests(kept, targets)
+        if not free:
+            return [], []
+        project_ids = set().union(*targets.values())
+        try:
+            repair, routing = await LLMService.optimize_shifts(
+                shift_requests=free,
+                projects=[p for p in projects if p["id"] in project_ids],
+                month=month,
+                clients=clients,
+            )
+        except LLMRoutingError as e:
+            print(f"Targeted LLM repair failed, falling back to local repair: {e}")
+            return [], e.attempts
+        raw = repair.get("assignments") if isinstance(repair, dict) else None
+        proposals = [validator.parse(a) for a in raw] if isinstance(raw, list) else []
+        return proposals, routing["attempts"]
@@ -0,0 +1,187 @@
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, List, Optional, Sequence, Tuple
+import time as time_module
+
+import numpy as np
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+GOOGLE_BUSY_CACHE_TTL_SECONDS = 300
+GOOGLE_BUSY_CACHE_MAX_ENTRIES = 2000
+
+# (user_id, start_datetime, end_datetime)
+BusyInterval = Tuple[str, datetime, datetime]
+
+
+class AvailabilityService:
+    """Free/busy availability engine
+
+    Schedules are rasterized into per-user bitmaps of 15-minute slots so that
+    finding common free time is a handful of vectorized NumPy operations
+    instead of pairwise interval comparisons.
+    """
+
+    # (user_id, start_date, end_date) -> (expires_at, intervals), oldest first;
+    # the TTL is fixed, so insertion order is also expiry order
+    _google_busy_cache: OrderedDict[Tuple[str, date, date], Tuple[float, List[BusyInterval]]] = OrderedDict()
+
+    @staticmethod
+    def shift_intervals(rows: Iterable[Tuple[str, date, time, time]]) -> List[BusyInterval]:
+        """Convert (user_id, date, start_time, end_time) rows to busy intervals"""
+        return [
+            (user_id, datetime.combine(day, start), datetime.combine(day, end))
+            for user_id, day, start, end in rows
+        ]
+
+    @staticmethod
+    def build_busy_bitmap(
+        user_ids: Sequence[str],
+        start_date: date,
+        days: int,
+        intervals: Iterable[BusyInterval],
+    ) -> np.ndarray:
+        """Build a (users, days * SLOTS_PER_DAY) boolean busy bitmap
+
+        A slot is busy if any interval overlaps it, so partial slots are
+        rounded outwards.
+        """
+        total_slots = days * SLOTS_PER_DAY
+        index = {user_id: i for i, user_id in enumerate(user_ids)}
+
+        origin = datetime.combine(start_date, time.min)
+        minute = timedelta(minutes=1)
+        rows, start_minutes, end_minutes = [], [], []
+        for user_id, start, end in intervals:
+            i = index.get(user_id)
+            if i is None:
+                continue
+            rows.append(i)
+            start_minutes.append((start - origin) // minute)
+            end_minutes.append((end - origin) // minute)
+
+        busy = np.zeros((len(user_ids), total_slots), dtype=bool)
+        if not rows:
+            return busy
+
+        start_minutes = np.array(start_minutes, dtype=np.int64)
+        end_minutes = np.array(end_minutes, dtype=np.int64)
+
+        start_slots = np.clip(start_minutes // SLOT_MINUTES, 0, total_slots)
+        end_slots = np.clip(-(-end_minutes // SLOT_MINUTES), 0, total_slots)
+        rows_arr = np.array(rows, dtype=np.int64)
+
+        keep = end_slots > start_slots
+        rows_arr, start_slots, end_slots = rows_arr[keep], start_slots[keep], end_slots[keep]
+
+        # Difference array: +1 where an interval opens, -1 where it closes
+        diff = np.zeros((len(user_ids), total_slots + 1), dtype=np.int32)
+        np.add.at(diff, (rows_arr, start_slots), 1)
+        np.add.at(diff, (rows_arr, end_slots), -1)
+        busy = np.cumsum(diff[:, :-1], axis=1) > 0
+        return busy
+
+    @staticmethod
+    def find_common_slots(
+        busy: np.ndarray,
+        start_date: date,
+        duration_minutes: int,
+        work_start: time,
+        work_end: time,
+        exclude_weekends: bool = False,
+        min_available: int = 1,
+        limit: int = 20,
+    ) -> List[Tuple[datetime, np.ndarray]]:
+        """Rank candidate slots by the number of free participants
+
+        Returns (start_datetime, free_mask) pairs, best first. Ties are broken
+        chronologically.
+        """
+        n_users = busy.shape[0]
+        days = busy.shape[1] // SLOTS_PER_DAY
+        first = -(-(work_start.hour * 60 + work_start.minute) // SLOT_MINUTES)
+        last = (work_end.hour * 60 + work_end.minute) // SLOT_MINUTES
+        length = -(-duration_minutes // SLOT_MINUTES)
+
+        width = last - first
+        if n_users == 0 or days == 0 or width < length:
+            return []
+
+        window = busy.reshape(n_users, days, SLOTS_PER_DAY)[:, :, first:last]
+
+        # Busy slots inside each candidate window via prefix sums
+        cumulative = np.zeros((n_users, days, width + 1), dtype=np.int32)
+        np.cumsum(window, axis=2, dtype=np.int32, out=cumulative[:, :, 1:])
+        free = (cumulative[:, :, length:] - cumulative[:, :, :-length]) == 0
+
+        counts = free.sum(axis=0)
+        if exclude_weekends:
+            weekdays = np.array(
+                [(start_date + timedelta(days=d)).weekday() for d in range(days)]
+            )
+            counts[weekdays >= 5] = 0
+
+        flat = counts.ravel()
+        candidates = np.flatnonzero(flat >= min_available)
+        if candidates.size == 0:
+            return []
+
+        order = candidates[np.argsort(-flat[candidates], kind="stable")][:limit]
+        positions = counts.shape[1]
+
+        results = []
+        for flat_index in order:
+            day, offset = divmod(int(flat_index), positions)
+            start = datetime.combine(start_date + timedelta(days=day), time.min) + timedelta(
+                minutes=(first + offset) * SLOT_MINUTES
+            )
+            results.append((start, free[:, day, offset]))
+        return results
+
+    @staticmethod
+    async def get_google_busy(
+        user_id: str,
+        access_token: str,
+        refresh_token: str,
+        start_date: date,
+        end_date: date,
+    ) -> List[BusyInterval]:
+        """Get a user's Google Calendar busy intervals, cached briefly"""
+        from app.services.google_calendar import GoogleCalendarService
+
+        key = (user_id, start_date, end_date)
+        cached = AvailabilityService._google_busy_cache.get(key)
+        now = time_module.monotonic()
+        if cached and cached[0] > now:
+            return cached[1]
+
+        busy = await GoogleCalendarService.get_free_busy(
+            user_access_token=access_token,
+            user_refresh_token=refresh_token,
+            start_datetime=datetime.combine(start_date, time.min),
+            end_datetime=datetime.combine(end_date + timedelta(days=1), time.min),
+        )
+        if busy is None:
+            return []
+
+        intervals = [(user_id, start, end) for start, end in busy]
+        cache = AvailabilityService._google_busy_cache
+        cache.pop(key, None)
+        cache[key] = (now + GOOGLE_BUSY_CACHE_TTL_SECONDS, intervals)
+        # Drop expired entries, then the oldest beyond the size limit
+        while cache:
+            oldest_key, (expires_at, _) = next(iter(cache.items()))
+            if expires_at > now and len(cache) <= GOOGLE_BUSY_CACHE_MAX_ENTRIES:
+                break
+            del cache[oldest_key]
+        return intervals
+
+    @staticmethod
+    def clear_google_busy_cache(user_id: Optional[str] = None) -> None:
+        """Drop cached Google busy intervals (all users if none given)"""
+        cache = AvailabilityService._google_busy_cache
+        if user_id is None:
+            cache.clear()
+            return
+        for key in [k for k in cache if k[0] == user_id]:
+            cache.pop(key, None)
@@ -0,0 +1,173 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+import random
+
+from sqlalchemy import and_, insert, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.types import new_id
+from app.models.outbox import CalendarOutbox
+
+BACKOFF_BASE_SECONDS = 5
+BACKOFF_MAX_SECONDS = 3600
+PROCESSING_TIMEOUT = timedelta(minutes=10)
+GOOGLE_BATCH_LIMIT = 50  # Calendar API batch request limit
+
+
+class CalendarOutboxService:
+    """Transactional outbox for Google Calendar writes"""
+
+    @staticmethod
+    def enqueue(
+        db: Session,
+        user_id: str,
+        entity_type: str,
+        entity_id: str,
+        operation: str,
+        calendar_event_id: Optional[str] = None,
+    ) -> Optional[CalendarOutbox]:
+        """Queue a calendar write in the caller's transaction
+
+        A pending write for the same entity and calendar is coalesced: the new
+        operation replaces it, and a delete of an event that was never created
+        cancels the pending upsert outright.
+        """
+        pending = (
+            db.query(CalendarOutbox)
+            .filter(
+                CalendarOutbox.entity_type == entity_type,
+                CalendarOutbox.entity_id == entity_id,
+                CalendarOutbox.status == "pending",
+                CalendarOutbox.user_id == user_id,
+            )
+            .first()
+        )
+
+        if pending:
+            if operation == "delete" and not calendar_event_id:
+                pending.status = "cancelled"
+                pending.completed_at = datetime.utcnow()
+                return None
+            pending.operation = operation
+            pending.calendar_event_id = calendar_event_id or pending.calendar_event_id
+            pending.next_attempt_at = datetime.utcnow()
+            return pending
+
+        if operation == "delete" and not calendar_event_id:
+            return None
+
+        row = CalendarOutbox(
+            id=new_id(),
+            user_id=user_id,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            operation=operation,
+            calendar_event_id=calendar_event_id,
+            status="pending",
+            attempts=0,
+            next_attempt_at=datetime.utcnow(),
+        )
+        db.add(row)
+        return row
+
+    @staticmethod
+    def enqueue_new_upserts(db: Session, items: Sequence[Tuple[str, str, str]]) -> int:
+        """Queue upserts for newly created entities in a single INSERT
+
+        ``items`` are ``(user_id, entity_type, entity_id)``; new entities can
+        have no pending writes, so the coalescing lookup is skipped.
+        """
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": new_id(),
+                "user_id": user_id,
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "operation": "upsert",
+                "status": "pending",
+                "attempts": 0,
+                "next_attempt_at": now,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for user_id, entity_type, entity_id in items
+        ]
+        if rows:
+            db.execute(insert(CalendarOutbox), rows)
+        return len(rows)
+
+    @staticmethod
+    def claim_batch(db: Session, limit: int) -> List[CalendarOutbox]:
+        """Claim due rows (and rows abandoned by a crashed worker)"""
+        now = datetime.utcnow()
+        query = (
+            db.query(CalendarOutbox)
+            .filter(
+                or_(
+                    and_(
+                        CalendarOutbox.status == "pending",
+                        CalendarOutbox.next_attempt_at <= now,
+                    ),
+                    and_(
+                        CalendarOutbox.status == "processing",
+                        CalendarOutbox.updated_at < now - PROCESSING_TIMEOUT,
+                    ),
+                )
+            )
+            .order_by(CalendarOutbox.next_attempt_at)
+            .limit(limit)
+        )
+        if db.get_bind().dialect.name == "postgresql":
+            # Lets several workers drain the outbox without double-sending
+            query = query.with_for_update(skip_locked=True)
+
+        rows = query.all()
+        for row in rows:
+            row.status = "processing"
+            row.updated_at = now
+        db.commit()
+        return rows
+
+    @staticmethod
+    def coalesce(rows: List[CalendarOutbox]) -> Tuple[List[CalendarOutbox], List[CalendarOutbox]]:
+        """Split rows into the latest write per event and superseded writes"""
+        latest: Dict[Tuple[str, str, str], CalendarOutbox] = {}
+        superseded = []
+        for row in sorted(rows, key=lambda r: (r.created_at, r.id)):
+            key = (row.user_id, row.entity_type, row.entity_id)
+            if key in latest:
+                superseded.append(latest[key])
+            latest[key] = row
+        return list(latest.values()), superseded
+
+    @staticmethod
+    def mark_done(row: CalendarOutbox, result: Optional[Dict] = None) -> None:
+        row.status = "done"
+        row.result = result
+        row.last_error = None
+        row.completed_at = datetime.utcnow()
+
+    @staticmethod
+    def mark_failed(row: CalendarOutbox, error: str, retryable: bool = True) -> None:
+        """Record a failure and schedule a retry with exponential backoff"""
+        row.attempts = (row.attempts or 0) + 1
+        row.last_error = error[:2000]
+        if not retryable or row.attempts >= settings.CALENDAR_OUTBOX_MAX_ATTEMPTS:
+            row.status = "failed"
+            row.completed_at = datetime.utcnow()
+            return
+        delay = min(BACKOFF_BASE_SECONDS * 2 ** (row.attempts - 1), BACKOFF_MAX_SECONDS)
+        row.status = "pending"
+        row.next_attempt_at = datetime.utcnow() + timedelta(
+            seconds=delay * random.uniform(0.5, 1.0)
+        )
+
+    @staticmethod
+    def group_by_user(rows: List[CalendarOutbox]) -> Dict[str, List[CalendarOutbox]]:
+        grouped: Dict[str, List[CalendarOutbox]] = defaultdict(list)
+        for row in rows:
+            grouped[row.user_id].append(row)
+        return grouped
@@ -0,0 +1,88 @@
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+import itertools
+
+from app.db.redis import get_redis
+from app.services.pubsub import PubSubHub
+
+CHANGE_CHANNEL = "sifut:changes"
+CHANGE_VERSION_KEY = "sifut:changes:version"
+
+# Routes each change event to clients subscribed to any of its scopes
+change_hub = PubSubHub(CHANGE_CHANNEL, keys_of=lambda event: event["scopes"])
+
+_local_version = itertools.count(1)
+_last_version = 0
+
+
+def user_scope(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def project_scope(project_id: str) -> str:
+    return f"project:{project_id}"
+
+
+def month_scope(day: date) -> str:
+    return f"month:{day:%Y-%m}"
+
+
+class ChangeFeed:
+    """Compact change events for live client updates
+
+    Events carry only what a client needs to decide whether to refetch:
+    ``{"entity", "id", "op", "scopes", "version"}``. ``version`` is a global
+    sequence number so clients can detect missed events and fall back to a
+    full refetch.
+    """
+
+    @staticmethod
+    async def reserve_versions(count: int) -> int:
+        """Reserve ``count`` consecutive versions, returning the first"""
+        try:
+            last = int(await get_redis().incrby(CHANGE_VERSION_KEY, count))
+        except Exception:
+            last = 0
+            for _ in range(count):
+                last = next(_local_version)
+        return last - count + 1
+
+    @staticmethod
+    async def current_version() -> int:
+        """Latest version handed out (0 before the first change)"""
+        try:
+            return int(await get_redis().get(CHANGE_VERSION_KEY) or 0)
+        except Exception:
+            return _last_version
+
+    @staticmethod
+    def event(entity: str, id: str, op: str, scopes: Iterable[Optional[str]]) -> Dict[str, Any]:
+        return {
+            "entity": entity,
+            "id": id,
+            "op": op,
+            "scopes": sorted({scope for scope in scopes if scope}),
+        }
+
+    @staticmethod
+    async def publish(events: List[Dict[str, Any]]) -> None:
+        """Stamp versions and publish events committed in one transaction"""
+        if not events:
+            return
+        global _last_version
+        base = await ChangeFeed.reserve_versions(len(events))
+        _last_version = max(_last_version, base + len(events) - 1)
+        for offset, event in enumerate(events):
+            event["version"] = base + offset
+        await change_hub.publish(events)
+
+        from app.services.feeds import FEED_ENTITIES, FeedService
+
+        await FeedService.touch(
+            scope for event in events if event["entity"] in FEED_ENTITIES for scope in event["scopes"]
+        )
+
+    @staticmethod
+    async def emit(entity: str, id: str, op: str, scopes: Iterable[Optional[str]]) -> None:
+        """Publish a single change event"""
+        await ChangeFeed.publish([ChangeFeed.event(entity, id, op, scopes)])
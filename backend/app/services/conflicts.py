@@ -0,0 +1,316 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+
+from app.db.types import new_id
+from app.models.schedule import SHIFT_OVERLAP_CONSTRAINT, ScheduleInterval
+
+EXCLUSION_VIOLATION = "23P01"  # SQLSTATE
+
+
+class IntervalIndex:
+    """In-memory interval index
+
+    Entries are kept sorted by start together with the longest interval length
+    seen, so an overlap query only inspects entries whose start lies within
+    [start - max_length, end): two bisections plus the candidates in between.
+    """
+
+    def __init__(self):
+        self._starts: List[datetime] = []
+        self._entries: List[Tuple[datetime, datetime, Any]] = []
+        self._max_length = timedelta(0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, start: datetime, end: datetime, item: Any) -> None:
+        """Insert an interval"""
+        position = bisect_right(self._starts, start)
+        self._starts.insert(position, start)
+        self._entries.insert(position, (start, end, item))
+        if end - start > self._max_length:
+            self._max_length = end - start
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Any]:
+        """Items whose interval overlaps [start, end)"""
+        lo = bisect_right(self._starts, start - self._max_length)
+        hi = bisect_left(self._starts, end)
+        return [item for s, e, item in self._entries[lo:hi] if e > start]
+
+
+class ConflictService:
+    """Schedule overlap detection backed by schedule_intervals"""
+
+    @staticmethod
+    def is_postgres(db: Session) -> bool:
+        return db.get_bind().dialect.name == "postgresql"
+
+    @staticmethod
+    def is_overlap_violation(error: IntegrityError) -> bool:
+        """Whether ``error`` comes from the shift overlap exclusion constraint (PostgreSQL)"""
+        orig = error.orig
+        if getattr(orig, "pgcode", None) == EXCLUSION_VIOLATION:
+            return True
+        return SHIFT_OVERLAP_CONSTRAINT in str(orig)
+
+    @staticmethod
+    def overlap_condition(db: Session, table, start: datetime, end: datetime):
+        """SQL condition for rows of ``table`` overlapping [start, end)
+
+        Uses range overlap on PostgreSQL so the GiST index is chosen; other
+        backends fall back to the (user_id, end_at) btree index.
+        """
+        if ConflictService.is_postgres(db):
+            return func.tsrange(table.start_at, table.end_at).op("&&")(
+                func.tsrange(start, end)
+            )
+        return and_(table.end_at > start, table.start_at < end)
+
+    @staticmethod
+    def find_overlaps(
+        db: Session,
+        user_ids: Sequence[str],
+        start: datetime,
+        end: datetime,
+        kinds: Optional[Sequence[str]] = None,
+        exclude_source_id: Optional[str] = None,
+    ) -> List[ScheduleInterval]:
+        """Intervals of the given users overlapping [start, end)"""
+        if not user_ids:
+            return []
+        query = (
+            db.query(ScheduleInterval)
+            .filter(ScheduleInterval.user_id.in_(list(user_ids)))
+            .filter(ConflictService.overlap_condition(db, ScheduleInterval, start, end))
+        )
+        if kinds:
+            query = query.filter(ScheduleInterval.kind.in_(list(kinds)))
+        if exclude_source_id:
+            query = query.filter(ScheduleInterval.source_id != exclude_source_id)
+        return query.order_by(ScheduleInterval.start_at).all()
+
+    @staticmethod
+    def add_interval(
+        db: Session,
+        kind: str,
+        source_id: str,
+        user_id: str,
+        project_id: str,
+        start: datetime,
+        end: datetime,
+    ) -> ScheduleInterval:
+        """Mirror a shift or meeting attendance into schedule_intervals"""
+        interval = ScheduleInterval(
+            id=new_id(),
+            user_id=user_id,
+            project_id=project_id,
+            kind=kind,
+            source_id=source_id,
+            start_at=start,
+            end_at=end,
+        )
+        db.add(interval)
+        return interval
+
+    @staticmethod
+    def add_shift(db: Session, shift) -> ScheduleInterval:
+        """Mirror a confirmed shift"""
+        return ConflictService.add_interval(
+            db,
+            "shift",
+            shift.id,
+            shift.user_id,
+            shift.project_id,
+            datetime.combine(shift.date, shift.start_time),
+            datetime.combine(shift.date, shift.end_time),
+        )
+
+    @staticmethod
+    def add_meeting(db: Session, meeting, user_ids: Iterable[str]) -> None:
+        """Mirror a meeting for each attending user"""
+        for user_id in user_ids:
+            ConflictService.add_interval(
+                db,
+                "meeting",
+                meeting.id,
+                user_id,
+                meeting.project_id,
+                meeting.start_datetime,
+                meeting.end_datetime,
+            )
+
+    @staticmethod
+    def remove_source(
+        db: Session, kind: str, source_id: str, user_id: Optional[str] = None
+    ) -> None:
+        """Remove mirrored intervals of a shift or meeting"""
+        query = db.query(ScheduleInterval).filter(
+            ScheduleInterval.kind == kind,
+            ScheduleInterval.source_id == source_id,
+        )
+        if user_id:
+            query = query.filter(ScheduleInterval.user_id == user_id)
+        query.delete(synchronize_session=False)
+
+    @staticmethod
+    def check_batch(
+        db: Session,
+        intervals: Sequence[Dict[str, Any]],
+        kinds: Optional[Sequence[str]] = None,
+    ) -> List[Tuple[Dict[str, Any], Any]]:
+        """Find conflicts for a batch of new intervals
+
+        Each interval is a dict with ``user_id``, ``start`` and ``end``. Returns
+        (new_interval, conflicting) pairs where the conflicting side is either
+        an existing ScheduleInterval or another interval of the batch.
+        """
+        if not intervals:
+            return []
+
+        indexes: Dict[str, IntervalIndex] = defaultdict(IntervalIndex)
+        conflicts = []
+
+        # Within the batch
+        for interval in sorted(intervals, key=lambda i: i["start"]):
+            index = indexes[interval["user_id"]]
+            for other in index.overlapping(interval["start"], interval["end"]):
+                conflicts.append((interval, other))
+            index.add(interval["start"], interval["end"], interval)
+
+        # Against stored intervals: one indexed range query for the batch span
+        existing = ConflictService.find_overlaps(
+            db,
+            list(indexes.keys()),
+            min(i["start"] for i in intervals),
+            max(i["end"] for i in intervals),
+            kinds=kinds,
+        )
+        stored: Dict[str, IntervalIndex] = defaultdict(IntervalIndex)
+        for row in existing:
+            stored[row.user_id].add(row.start_at, row.end_at, row)
+        for interval in intervals:
+            index = stored.get(interval["user_id"])
+            if index is None:
+                continue
+            for row in index.overlapping(interval["start"], interval["end"]):
+                conflicts.append((interval, row))
+
+        return conflicts
+
+    @staticmethod
+    def find_conflicts(
+        db: Session,
+        start: datetime,
+        end: datetime,
+        user_id: Optional[str] = None,
+        project_id: Optional[str] = None,
+        limit: int = 500,
+    ) -> List[Tuple[ScheduleInterval, ScheduleInterval]]:
+        """All overlapping interval pairs in [start, end) for a user or project
+
+        For a project, pairs where at least one side belongs to the project are
+        returned (e.g. a project shift overlapping another project's meeting).
+        """
+        if ConflictService.is_postgres(db):
+            return ConflictService._find_conflicts_sql(
+                db, start, end, user_id, project_id, limit
+            )
+        return ConflictService._find_conflicts_sweep(
+            db, start, end, user_id, project_id, limit
+        )
+
+    @staticmethod
+    def _find_conflicts_sql(db, start, end, user_id, project_id, limit):
+        """Self-join on range overlap, driven by the GiST index"""
+        a = aliased(ScheduleInterval)
+        b = aliased(ScheduleInterval)
+        query = (
+            db.query(a, b)
+            .join(
+                b,
+                and_(
+                    b.user_id == a.user_id,
+                    b.id != a.id,
+                    func.tsrange(a.start_at, a.end_at).op("&&")(
+                        func.tsrange(b.start_at, b.end_at)
+                    ),
+                ),
+            )
+            .filter(ConflictService.overlap_condition(db, a, start, end))
+        )
+        if user_id:
+            query = query.filter(a.user_id == user_id, a.id < b.id)
+        if project_id:
+            query = query.filter(
+                a.project_id == project_id,
+                or_(b.project_id != project_id, a.id < b.id),
+            )
+        return query.order_by(a.start_at).limit(limit).all()
+
+    @staticmethod
+    def _find_conflicts_sweep(db, start, end, user_id, project_id, limit):
+        """Load the scope's intervals by index range and sweep per user"""
+        query = db.query(ScheduleInterval).filter(
+            ConflictService.overlap_condition(db, ScheduleInterval, start, end)
+        )
+        if user_id:
+            query = query.filter(ScheduleInterval.user_id == user_id)
+        if project_id:
+            members = (
+                db.query(ScheduleInterval.user_id)
+                .filter(ScheduleInterval.project_id == project_id)
+                .filter(ConflictService.overlap_condition(db, ScheduleInterval, start, end))
+                .distinct()
+            )
+            query = query.filter(ScheduleInterval.user_id.in_(members))
+
+        by_user: Dict[str, List[ScheduleInterval]] = defaultdict(list)
+        for row in query.all():
+            by_user[row.user_id].append(row)
+
+        pairs = []
+        for rows in by_user.values():
+            rows.sort(key=lambda r: (r.start_at, r.end_at))
+            active: List[ScheduleInterval] = []
+            for row in rows:
+                active = [other for other in active if other.end_at > row.start_at]
+                for other in active:
+                    if project_id and project_id not in (other.project_id, row.project_id):
+                        continue
+                    pairs.append((other, row))
+                active.append(row)
+
+        pairs.sort(key=lambda pair: pair[0].start_at)
+        return pairs[:limit]
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        """Rebuild schedule_intervals from confirmed shifts and meetings (backfill)"""
+        from app.models.shift import ConfirmedShift
+        from app.models.meeting import Meeting, MeetingParticipant
+
+        db.query(ScheduleInterval).delete(synchronize_session=False)
+
+        count = 0
+        for shift in db.query(ConfirmedShift).yield_per(1000):
+            ConflictService.add_shift(db, shift)
+            count += 1
+
+        rows = (
+            db.query(Meeting, MeetingParticipant.user_id)
+            .join(MeetingParticipant, MeetingParticipant.meeting_id == Meeting.id)
+            .filter(MeetingParticipant.status != "declined")
+            .yield_per(1000)
+        )
+        for meeting, participant_id in rows:
+            ConflictService.add_meeting(db, meeting, [participant_id])
+            count += 1
+
+        db.commit()
+        return count
@@ -0,0 +1,371 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional
+import json
+import time
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import iterate_in_threadpool
+
+from app.core.config import settings
+from app.db.redis import get_redis
+from app.models.feed import CalendarFeed
+from app.models.meeting import Meeting, MeetingParticipant
+from app.models.project import Project
+from app.models.shift import ConfirmedShift
+from app.models.user import User
+from app.services.changes import project_scope, user_scope
+
+FEED_META_KEY = "feed:meta:{token}"
+FEED_MODIFIED_KEY = "feed:modified:{scope}"
+FEED_BODY_KEY = "feed:ics:{feed_id}"
+FEED_META_TTL_SECONDS = 3600
+
+# Change events that alter what a feed shows
+FEED_ENTITIES = {"confirmed_shift", "meeting", "meeting_participant"}
+
+TIMEZONE = "Asia/Tokyo"
+EVENTS_PER_CHUNK = 200
+
+VTIMEZONE = (
+    "BEGIN:VTIMEZONE",
+    f"TZID:{TIMEZONE}",
+    "BEGIN:STANDARD",
+    "DTSTART:19700101T000000",
+    "TZOFFSETFROM:+0900",
+    "TZOFFSETTO:+0900",
+    "TZNAME:JST",
+    "END:STANDARD",
+    "END:VTIMEZONE",
+)
+
+
+def _escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Fold a content line at 75 octets (RFC 5545 3.1) without splitting a character"""
+    if len(line.encode()) <= 75:
+        return line
+    parts, current, size = [], "", 0
+    for char in line:
+        width = len(char.encode())
+        if size + width > (75 if not parts else 74):
+            parts.append(current)
+            current, size = "", 0
+        current += char
+        size += width
+    parts.append(current)
+    return "\r\n ".join(parts)
+
+
+def _local(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def _vevent(
+    uid: str,
+    stamp: str,
+    start: datetime,
+    end: datetime,
+    summary: str,
+    description: Optional[str] = None,
+    url: Optional[str] = None,
+) -> str:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART;TZID={TIMEZONE}:{_local(start)}",
+        f"DTEND;TZID={TIMEZONE}:{_local(end)}",
+        f"SUMMARY:{_escape(summary)}",
+    ]
+    if description:
+        lines.append(f"DESCRIPTION:{_escape(description)}")
+    if url:
+        lines.append(f"URL:{url}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) + "\r\n" for line in lines)
+
+
+class FeedService:
+    """iCalendar subscription feeds
+
+    Every feed follows one change scope (``user:<id>`` or
+    ``project:<id>``) whose last-modified stamp lives in Redis and is bumped
+    whenever a change event touches that scope. The stamp alone answers
+    conditional requests, and the rendered feed is cached per stamp, so
+    polling clients only cause a query after something changed.
+    """
+
+    @staticmethod
+    def scope(meta: Dict[str, Any]) -> str:
+        if meta["project_id"]:
+            return project_scope(meta["project_id"])
+        return user_scope(meta["user_id"])
+
+    @staticmethod
+    async def touch(scopes: Iterable[str]) -> None:
+        """Mark the feeds following ``scopes`` as modified now"""
+        scopes = {scope for scope in scopes if scope.startswith(("user:", "project:"))}
+        if not scopes:
+            return
+        now_ms = int(time.time() * 1000)
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                for scope in scopes:
+                    pipe.set(FEED_MODIFIED_KEY.format(scope=scope), now_ms)
+                await pipe.execute()
+        except Exception as e:
+            print(f"Error touching calendar feeds: {e}")
+
+    @staticmethod
+    async def touch_meetings(db: Session, meeting_ids: Iterable[str]) -> None:
+        """Mark the feeds showing these meetings as modified (for changes made outside the API)"""
+        meeting_ids = list(meeting_ids)
+        if not meeting_ids:
+            return
+        scopes = {
+            project_scope(project_id)
+            for (project_id,) in db.query(Meeting.project_id).filter(Meeting.id.in_(meeting_ids))
+        }
+        scopes.update(
+            user_scope(user_id)
+            for (user_id,) in db.query(MeetingParticipant.user_id).filter(
+                MeetingParticipant.meeting_id.in_(meeting_ids)
+            )
+        )
+        await FeedService.touch(scopes)
+
+    @staticmethod
+    async def modified(scope: str) -> int:
+        """Last-modified stamp of a scope (epoch milliseconds)
+
+        A scope with no stamp yet (or a flushed Redis) starts now, so
+        clients refetch once. Without Redis every call is "now", which
+        disables 304s and caching instead of serving stale data.
+        """
+        now_ms = int(time.time() * 1000)
+        key = FEED_MODIFIED_KEY.format(scope=scope)
+        try:
+            redis = get_redis()
+            stamp = await redis.get(key)
+            if stamp is None:
+                await redis.set(key, now_ms, nx=True)
+                stamp = await redis.get(key)
+            return int(stamp)
+        except Exception as e:
+            print(f"Error reading calendar feed stamp: {e}")
+            return now_ms
+
+    @staticmethod
+    def load_meta(db: Session, token: str) -> Optional[Dict[str, Any]]:
+        row = (
+            db.query(CalendarFeed, User.name, Project.name)
+            .join(User, User.id == CalendarFeed.user_id)
+            .outerjoin(Project, Project.id == CalendarFeed.project_id)
+            .filter(CalendarFeed.token == token)
+            .first()
+        )
+        if row is None:
+            return None
+        feed, user_name, project_name = row
+        return {
+            "id": feed.id,
+            "user_id": feed.user_id,
+            "project_id": feed.project_id,
+            "name": f"SIFUT: {project_name if feed.project_id else user_name}",
+        }
+
+    @staticmethod
+    async def meta(sessions: Callable[[], Session], token: str) -> Optional[Dict[str, Any]]:
+        """Feed owner/scope by token, from Redis when possible"""
+        key = FEED_META_KEY.format(token=token)
+        try:
+            cached = await get_redis().get(key)
+            if cached is not None:
+                return json.loads(cached)
+        except Exception as e:
+            print(f"Error reading calendar feed: {e}")
+
+        db = sessions()
+        try:
+            meta = FeedService.load_meta(db, token)
+        finally:
+            db.close()
+        if meta is not None:
+            try:
+                await get_redis().set(key, json.dumps(meta), ex=FEED_META_TTL_SECONDS)
+            except Exception:
+                pass
+        return meta
+
+    @staticmethod
+    async def forget(feed: CalendarFeed) -> None:
+        """Drop a revoked feed from the caches"""
+        try:
+            await get_redis().delete(
+                FEED_META_KEY.format(token=feed.token), FEED_BODY_KEY.format(feed_id=feed.id)
+            )
+        except Exception as e:
+            print(f"Error forgetting calendar feed: {e}")
+
+    @staticmethod
+    async def cached_body(feed_id: str, stamp: int) -> Optional[bytes]:
+        try:
+            cached_stamp, body = await get_redis().hmget(
+                FEED_BODY_KEY.format(feed_id=feed_id), ["stamp", "body"]
+            )
+        except Exception as e:
+            print(f"Error reading cached calendar feed: {e}")
+            return None
+        if body is None or cached_stamp != str(stamp):
+            return None
+        return body.encode()
+
+    @staticmethod
+    async def store_body(feed_id: str, stamp: int, body: str) -> None:
+        key = FEED_BODY_KEY.format(feed_id=feed_id)
+        try:
+            async with get_redis().pipeline(transaction=True) as pipe:
+                pipe.hset(key, mapping={"stamp": stamp, "body": body})
+                pipe.expire(key, settings.FEED_CACHE_TTL_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            print(f"Error caching calendar feed: {e}")
+
+    @staticmethod
+    def events(db: Session, meta: Dict[str, Any], stamp: int) -> Iterator[str]:
+        """VEVENTs of a feed, read through server-side cursors"""
+        since = datetime.now() - timedelta(days=settings.FEED_PAST_DAYS)
+        dtstamp = datetime.fromtimestamp(stamp / 1000, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        streamed = {"stream_results": True, "yield_per": 500}
+
+        if meta["project_id"]:
+            shifts = (
+                db.query(
+                    ConfirmedShift.id,
+                    ConfirmedShift.date,
+                    ConfirmedShift.start_time,
+                    ConfirmedShift.end_time,
+                    ConfirmedShift.comment,
+                    User.name,
+                )
+                .join(User, User.id == ConfirmedShift.user_id)
+                .filter(ConfirmedShift.project_id == meta["project_id"])
+            )
+        else:
+            shifts = (
+                db.query(
+                    ConfirmedShift.id,
+                    ConfirmedShift.date,
+                    ConfirmedShift.start_time,
+                    ConfirmedShift.end_time,
+                    ConfirmedShift.comment,
+                    Project.name,
+                )
+                .join(Project, Project.id == ConfirmedShift.project_id)
+                .filter(ConfirmedShift.user_id == meta["user_id"])
+            )
+        shifts = (
+            shifts.filter(ConfirmedShift.date >= since.date())
+            .order_by(ConfirmedShift.date, ConfirmedShift.start_time)
+            .execution_options(**streamed)
+        )
+        for shift_id, day, start, end, comment, name in shifts:
+            yield _vevent(
+                f"shift-{shift_id}@sifut",
+                dtstamp,
+                datetime.combine(day, start),
+                datetime.combine(day, end),
+                f"シフト: {name}",
+                comment,
+            )
+
+        meetings = db.query(
+            Meeting.id,
+            Meeting.title,
+            Meeting.description,
+            Meeting.start_datetime,
+            Meeting.end_datetime,
+            Meeting.meet_link,
+        )
+        if meta["project_id"]:
+            meetings = meetings.filter(Meeting.project_id == meta["project_id"])
+        else:
+            meetings = meetings.join(
+                MeetingParticipant, MeetingParticipant.meeting_id == Meeting.id
+            ).filter(
+                MeetingParticipant.user_id == meta["user_id"],
+                MeetingParticipant.status != "declined",
+            )
+        meetings = (
+            meetings.filter(Meeting.end_datetime >= since)
+            .order_by(Meeting.start_datetime)
+            .execution_options(**streamed)
+        )
+        for meeting_id, title, description, start, end, meet_link in meetings:
+            yield _vevent(
+                f"meeting-{meeting_id}@sifut",
+                dtstamp,
+                start,
+                end,
+                title,
+                "\n".join(part for part in (description, meet_link) if part),
+                meet_link,
+            )
+
+    @staticmethod
+    def render(sessions: Callable[[], Session], meta: Dict[str, Any], stamp: int) -> Iterator[str]:
+        """The whole calendar in chunks (blocking; runs in the threadpool)"""
+        header = [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            "PRODID:-//SIFUT//Calendar Feed//JA",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            f"X-WR-CALNAME:{_escape(meta['name'])}",
+            f"X-WR-TIMEZONE:{TIMEZONE}",
+            *VTIMEZONE,
+        ]
+        yield "".join(_fold(line) + "\r\n" for line in header)
+
+        db = sessions()
+        try:
+            chunk: List[str] = []
+            for event in FeedService.events(db, meta, stamp):
+                chunk.append(event)
+                if len(chunk) >= EVENTS_PER_CHUNK:
+                    yield "".join(chunk)
+                    chunk = []
+            if chunk:
+                yield "".join(chunk)
+        finally:
+            db.close()
+
+        yield "END:VCALENDAR\r\n"
+
+    @staticmethod
+    async def stream(
+        sessions: Callable[[], Session], meta: Dict[str, Any], stamp: int
+    ) -> AsyncIterator[bytes]:
+        """Stream the feed and cache it under ``stamp`` once complete (if small enough)"""
+        parts: Optional[List[str]] = []
+        size = 0
+        async for part in iterate_in_threadpool(FeedService.render(sessions, meta, stamp)):
+            data = part.encode()
+            if parts is not None:
+                size += len(data)
+                if size > settings.FEED_CACHE_MAX_BYTES:
+                    parts = None
+                else:
+                    parts.append(part)
+            yield data
+        if parts is not None:
+            await FeedService.store_body(meta["id"], stamp, "".join(parts))
@@ -1,15 +1,36 @@
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from datetime import datetime, timedelta
-from typing import Optional, Dict
+from datetime import datetime
+from typing import Optional, Dict, List, Tuple
+from zoneinfo import ZoneInfo
+import json
+
+from app.services.google_quota import GoogleQuotaScheduler, google_quota
+
+TOKYO = ZoneInfo("Asia/Tokyo")
 
 
 class GoogleCalendarService:
     """Google Calendar service"""
 
+    # Calendar v3 discovery document, parsed once per process
+    _discovery: Optional[Dict] = None
+
+    @staticmethod
+    def discovery_document() -> Optional[Dict]:
+        """Bundled discovery document (None if the client library has none)"""
+        if GoogleCalendarService._discovery is None:
+            from googleapiclient.discovery_cache import get_static_doc
+
+            document = get_static_doc("calendar", "v3")
+            if document is not None:
+                GoogleCalendarService._discovery = json.loads(document)
+        return GoogleCalendarService._discovery
+
     @staticmethod
     def get_calendar_service(access_token: str, refresh_token: str):
         """Get Google Calendar service"""
+        # googleapiclient is slow to import; keep it off the app import path
+        from google.oauth2.credentials import Credentials
+        from googleapiclient.discovery import build, build_from_document
         from app.core.config import settings
 
         credentials = Credentials(
@@ -20,172 +41,88 @@ class GoogleCalendarService:
             client_secret=settings.GOOGLE_CLIENT_SECRET,
         )
 
+        # Building from the parsed document skips re-reading and re-parsing it
+        document = GoogleCalendarService.discovery_document()
+        if document is not None:
+            return build_from_document(document, credentials=credentials)
         service = build("calendar", "v3", credentials=credentials)
         return service
 
     @staticmethod
-    async def create_shift_event(
-        user_access_token: str,
-        user_refresh_token: str,
+    def build_event_body(
         title: str,
         description: str,
         start_datetime: datetime,
         end_datetime: datetime,
         attendees: list = None,
-    ) -> Optional[Dict]:
-        """Create a shift event in Google Calendar"""
-        try:
-            service = GoogleCalendarService.get_calendar_service(
-                user_access_token, user_refresh_token
-            )
-
-            event = {
-                "summary": title,
-                "description": description,
-                "start": {
-                    "dateTime": start_datetime.isoformat(),
-                    "timeZone": "Asia/Tokyo",
-                },
-                "end": {
-                    "dateTime": end_datetime.isoformat(),
-                    "timeZone": "Asia/Tokyo",
-                },
+        create_meet_link: bool = False,
+    ) -> Dict:
+        """Build a Calendar API event resource"""
+        event = {
+            "summary": title,
+            "description": description,
+            "start": {
+                "dateTime": start_datetime.isoformat(),
+                "timeZone": "Asia/Tokyo",
+            },
+            "end": {
+                "dateTime": end_datetime.isoformat(),
+                "timeZone": "Asia/Tokyo",
+            },
+        }
+
+        if attendees:
+            event["attendees"] = [{"email": email} for email in attendees]
+
+        if create_meet_link:
+            event["conferenceData"] = {
+                "createRequest": {
+                    "requestId": f"meet-{datetime.now().timestamp()}",
+                    "conferenceSolutionKey": {"type": "hangoutsMeet"},
+                }
             }
 
-            if attendees:
-                event["attendees"] = [{"email": email} for email in attendees]
-
-            created_event = service.events().insert(calendarId="primary", body=event).execute()
+        return event
 
-            return {
-                "event_id": created_event["id"],
-                "html_link": created_event.get("htmlLink"),
-            }
-        except Exception as e:
-            print(f"Error creating calendar event: {e}")
+    @staticmethod
+    def extract_meet_link(event: Dict) -> Optional[str]:
+        """Get the Google Meet URL from an event resource"""
+        if "conferenceData" not in event:
             return None
+        return event["conferenceData"].get("entryPoints", [{}])[0].get("uri")
 
     @staticmethod
-    async def create_meeting_event(
+    async def get_free_busy(
         user_access_token: str,
         user_refresh_token: str,
-        title: str,
-        description: str,
         start_datetime: datetime,
         end_datetime: datetime,
-        attendees: list = None,
-        create_meet_link: bool = True,
-    ) -> Optional[Dict]:
-        """Create a meeting event with Google Meet link"""
+    ) -> Optional[List[Tuple[datetime, datetime]]]:
+        """Get busy intervals of the primary calendar (Asia/Tokyo, naive)"""
         try:
             service = GoogleCalendarService.get_calendar_service(
                 user_access_token, user_refresh_token
             )
 
-            event = {
-                "summary": title,
-                "description": description,
-                "start": {
-                    "dateTime": start_datetime.isoformat(),
-                    "timeZone": "Asia/Tokyo",
-                },
-                "end": {
-                    "dateTime": end_datetime.isoformat(),
-                    "timeZone": "Asia/Tokyo",
-                },
+            body = {
+                "timeMin": start_datetime.replace(tzinfo=TOKYO).isoformat(),
+                "timeMax": end_datetime.replace(tzinfo=TOKYO).isoformat(),
+                "timeZone": "Asia/Tokyo",
+                "items": [{"id": "primary"}],
             }
-
-            if attendees:
-                event["attendees"] = [{"email": email} for email in attendees]
-
-            if create_meet_link:
-                event["conferenceData"] = {
-                    "createRequest": {
-                        "requestId": f"meet-{datetime.now().timestamp()}",
-                        "conferenceSolutionKey": {"type": "hangoutsMeet"},
-                    }
-                }
-
-            created_event = (
-                service.events()
-                .insert(
-                    calendarId="primary",
-                    body=event,
-                    conferenceDataVersion=1 if create_meet_link else 0,
-                )
-                .execute()
+            result = await google_quota.execute(
+                GoogleQuotaScheduler.user_key(user_refresh_token),
+                service.freebusy().query(body=body),
             )
 
-            meet_link = None
-            if create_meet_link and "conferenceData" in created_event:
-                meet_link = created_event["conferenceData"].get("entryPoints", [{}])[
-                    0
-                ].get("uri")
-
-            return {
-                "event_id": created_event["id"],
-                "html_link": created_event.get("htmlLink"),
-                "meet_link": meet_link,
-            }
+            busy = result.get("calendars", {}).get("primary", {}).get("busy", [])
+            return [
+                (
+                    datetime.fromisoformat(b["start"]).astimezone(TOKYO).replace(tzinfo=None),
+                    datetime.fromisoformat(b["end"]).astimezone(TOKYO).replace(tzinfo=None),
+                )
+                for b in busy
+            ]
         except Exception as e:
-            print(f"Error creating meeting event: {e}")
+            print(f"Error fetching free/busy: {e}")
             return None
-
-    @staticmethod
-    async def update_event(
-        user_access_token: str,
-        user_refresh_token: str,
-        event_id: str,
-        title: Optional[str] = None,
-        description: Optional[str] = None,
-        start_datetime: Optional[datetime] = None,
-        end_datetime: Optional[datetime] = None,
-    ) -> bool:
-        """Update a calendar event"""
-        try:
-            service = GoogleCalendarService.get_calendar_service(
-                user_access_token, user_refresh_token
-            )
-
-            # Get existing event
-            event = service.events().get(calendarId="primary", eventId=event_id).execute()
-
-            # Update fields
-            if title:
-                event["summary"] = title
-            if description:
-                event["description"] = description
-            if start_datetime:
-                event["start"] = {
-                    "dateTime": start_datetime.isoformat(),
-                    "timeZone": "Asia/Tokyo",
-                }
-            if end_datetime:
-                event["end"] = {
-                    "dateTime": end_datetime.isoformat(),
-                    "timeZone": "Asia/Tokyo",
-                }
-
-            service.events().update(calendarId="primary", eventId=event_id, body=event).execute()
-
-            return True
-        except Exception as e:
-            print(f"Error updating calendar event: {e}")
-            return False
-
-    @staticmethod
-    async def delete_event(
-        user_access_token: str, user_refresh_token: str, event_id: str
-    ) -> bool:
-        """Delete a calendar event"""
-        try:
-            service = GoogleCalendarService.get_calendar_service(
-                user_access_token, user_refresh_token
-            )
-
-            service.events().delete(calendarId="primary", eventId=event_id).execute()
-
-            return True
-        except Exception as e:
-            print(f"Error deleting calendar event: {e}")
-            return False
@@ -1,14 +1,28 @@
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
 from app.core.config import settings
+from app.core.http_clients import http_clients
+from datetime import datetime, timedelta
+from jose import jwt
+import asyncio
 import httpx
-from typing import Optional, Dict
+import re
+import time
+from typing import Optional, Dict, Tuple
+
+GOOGLE_TOKEN_URI = "https://oauth2.googleapis.com/token"
+GOOGLE_CERTS_URI = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_ISSUERS = ["accounts.google.com", "https://accounts.google.com"]
+CERTS_DEFAULT_MAX_AGE_SECONDS = 3600
+# Unknown kids force a refetch, but at most this often
+CERTS_MIN_REFETCH_SECONDS = 60
 
 
 class GoogleOAuthService:
     """Google OAuth service"""
 
+    # (expires_at, keys by kid, fetched_at) on the monotonic clock
+    _certs_cache: Optional[Tuple[float, Dict[str, Dict], float]] = None
+    _certs_lock: Optional[asyncio.Lock] = None
+
     SCOPES = [
         "https://www.googleapis.com/auth/userinfo.email",
         "https://www.googleapis.com/auth/userinfo.profile",
@@ -19,6 +33,8 @@ class GoogleOAuthService:
     @staticmethod
     def get_authorization_url(redirect_uri: str) -> str:
         """Get Google OAuth authorization URL"""
+        from google_auth_oauthlib.flow import Flow
+
         flow = Flow.from_client_config(
             {
                 "web": {
@@ -41,54 +57,133 @@ class GoogleOAuthService:
         return authorization_url
 
     @staticmethod
-    async def exchange_code_for_tokens(code: str, redirect_uri: str) -> Dict:
-        """Exchange authorization code for access and refresh tokens"""
-        flow = Flow.from_client_config(
-            {
-                "web": {
-                    "client_id": settings.GOOGLE_CLIENT_ID,
-                    "client_secret": settings.GOOGLE_CLIENT_SECRET,
-                    "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                    "token_uri": "https://oauth2.googleapis.com/token",
-                    "redirect_uris": [redirect_uri],
-                }
+    async def exchange_code_for_tokens(
+        code: str, redirect_uri: str, client: Optional[httpx.AsyncClient] = None
+    ) -> Dict:
+        """Exchange authorization code for access, refresh and ID tokens"""
+        client = client or http_clients.http
+        response = await client.post(
+            GOOGLE_TOKEN_URI,
+            data={
+                "grant_type": "authorization_code",
+                "code": code,
+                "redirect_uri": redirect_uri,
+                "client_id": settings.GOOGLE_CLIENT_ID,
+                "client_secret": settings.GOOGLE_CLIENT_SECRET,
             },
-            scopes=GoogleOAuthService.SCOPES,
         )
-        flow.redirect_uri = redirect_uri
-
-        # Exchange code for tokens
-        flow.fetch_token(code=code)
-
-        credentials = flow.credentials
+        if response.status_code != 200:
+            raise ValueError(f"Token exchange failed: {response.text}")
+        data = response.json()
 
+        expires_in = data.get("expires_in")
         return {
-            "access_token": credentials.token,
-            "refresh_token": credentials.refresh_token,
-            "token_uri": credentials.token_uri,
-            "client_id": credentials.client_id,
-            "client_secret": credentials.client_secret,
-            "scopes": credentials.scopes,
-            "expiry": credentials.expiry,
+            "access_token": data["access_token"],
+            "refresh_token": data.get("refresh_token"),
+            "id_token": data.get("id_token"),
+            "scopes": data.get("scope", "").split(),
+            "expiry": datetime.utcnow() + timedelta(seconds=int(expires_in))
+            if expires_in
+            else None,
         }
 
     @staticmethod
-    async def get_user_info(access_token: str) -> Optional[Dict]:
+    async def get_signing_keys(
+        client: httpx.AsyncClient, refresh: bool = False
+    ) -> Dict[str, Dict]:
+        """Google's ID token signing keys by kid, cached for their max-age"""
+        cached = GoogleOAuthService._certs_cache
+        if not refresh and cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        if GoogleOAuthService._certs_lock is None:
+            GoogleOAuthService._certs_lock = asyncio.Lock()
+        async with GoogleOAuthService._certs_lock:
+            # Another request may have fetched them while we waited
+            cached = GoogleOAuthService._certs_cache
+            if cached and cached[0] > time.monotonic() and (
+                not refresh or cached[2] > time.monotonic() - CERTS_MIN_REFETCH_SECONDS
+            ):
+                return cached[1]
+
+            response = await client.get(GOOGLE_CERTS_URI)
+            response.raise_for_status()
+            keys = {key["kid"]: key for key in response.json().get("keys", [])}
+
+            match = re.search(r"max-age=(\d+)", response.headers.get("cache-control", ""))
+            max_age = int(match.group(1)) if match else CERTS_DEFAULT_MAX_AGE_SECONDS
+            now = time.monotonic()
+            GoogleOAuthService._certs_cache = (now + max_age, keys, now)
+            return keys
+
+    @staticmethod
+    async def verify_id_token(
+        id_token: str,
+        access_token: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> Dict:
+        """Verify a Google ID token locally and return its claims"""
+        client = client or http_clients.http
+        kid = jwt.get_unverified_header(id_token).get("kid")
+
+        keys = await GoogleOAuthService.get_signing_keys(client)
+        if kid not in keys:
+            # Google rotated its keys since they were cached
+            keys = await GoogleOAuthService.get_signing_keys(client, refresh=True)
+        if kid not in keys:
+            raise ValueError("Unknown ID token signing key")
+
+        return jwt.decode(
+            id_token,
+            keys[kid],
+            algorithms=["RS256"],
+            audience=settings.GOOGLE_CLIENT_ID,
+            issuer=GOOGLE_ISSUERS,
+            access_token=access_token,
+        )
+
+    @staticmethod
+    async def get_identity(tokens: Dict, client: Optional[httpx.AsyncClient] = None) -> Optional[Dict]:
+        """Google account identity in userinfo format
+
+        Read from the verified ID token; the userinfo endpoint is only called
+        when there is no ID token or it lacks the profile claims.
+        """
+        client = client or http_clients.http
+        if tokens.get("id_token"):
+            claims = await GoogleOAuthService.verify_id_token(
+                tokens["id_token"], tokens["access_token"], client
+            )
+            if claims.get("email") and "name" in claims:
+                return {
+                    "id": claims["sub"],
+                    "email": claims["email"],
+                    "name": claims.get("name"),
+                    "picture": claims.get("picture"),
+                }
+        return await GoogleOAuthService.get_user_info(tokens["access_token"], client)
+
+    @staticmethod
+    async def get_user_info(
+        access_token: str, client: Optional[httpx.AsyncClient] = None
+    ) -> Optional[Dict]:
         """Get user info from Google"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    "https://www.googleapis.com/oauth2/v2/userinfo",
-                    headers={"Authorization": f"Bearer {access_token}"},
-                )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPError:
-                return None
+        client = client or http_clients.http
+        try:
+            response = await client.get(
+                "https://www.googleapis.com/oauth2/v2/userinfo",
+                headers={"Authorization": f"Bearer {access_token}"},
+            )
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError:
+            return None
 
     @staticmethod
     def refresh_access_token(refresh_token: str) -> Optional[Dict]:
         """Refresh access token using refresh token"""
+        from google.oauth2.credentials import Credentials
+
         credentials = Credentials(
             token=None,
             refresh_token=refresh_token,
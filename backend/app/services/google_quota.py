@@ -0,0 +1,245 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import math
+import random
+import time
+
+from googleapiclient.errors import HttpError
+from httplib2 import HttpLib2Error
+
+from app.core.config import settings
+from app.db.redis import get_redis
+
+QUOTA_KEY_PREFIX = "sifut:gquota"
+PRIORITIES = ("interactive", "bulk")
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "quotaExceeded"}
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 32.0
+MAX_WAIT_SLICE_SECONDS = 1.0
+
+# Atomically take ``cost`` tokens from every bucket, or none of them.
+# KEYS: bucket keys followed by their cooldown keys
+# ARGV: now_ms, cost, then (rate_per_ms, burst, reserve) per bucket
+# Returns 0 if acquired, otherwise the milliseconds to wait before retrying.
+ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local n = #KEYS / 2
+local wait = 0
+local levels = {}
+for i = 1, n do
+  local cooldown = redis.call('PTTL', KEYS[n + i])
+  if cooldown > wait then wait = cooldown end
+  local rate = tonumber(ARGV[3 * i])
+  local burst = tonumber(ARGV[3 * i + 1])
+  local reserve = tonumber(ARGV[3 * i + 2])
+  local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+  local tokens = tonumber(state[1]) or burst
+  local ts = tonumber(state[2]) or now
+  tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+  levels[i] = tokens
+  local missing = cost + reserve - tokens
+  if missing > 0 then
+    wait = math.max(wait, math.ceil(missing / rate))
+  end
+end
+if wait > 0 then return wait end
+for i = 1, n do
+  local rate = tonumber(ARGV[3 * i])
+  local burst = tonumber(ARGV[3 * i + 1])
+  redis.call('HSET', KEYS[i], 'tokens', levels[i] - cost, 'ts', now)
+  redis.call('PEXPIRE', KEYS[i], math.ceil(burst / rate) + 1000)
+end
+return 0
+"""
+
+
+class QuotaTimeout(Exception):
+    """Quota could not be acquired before the deadline"""
+
+
+class GoogleQuotaScheduler:
+    """Token-bucket scheduler in front of Google API calls
+
+    Every call takes tokens from the project-wide bucket and the calling
+    user's bucket. Buckets live in Redis so all API and worker processes
+    share one budget; if Redis is unreachable the same algorithm runs on
+    in-process buckets.
+
+    Priority lanes: ``bulk`` calls may not dip into the last
+    ``GOOGLE_QUOTA_INTERACTIVE_RESERVE`` of a bucket, so background syncs
+    saturate the quota without starving interactive requests.
+
+    Rate-limit responses put the affected bucket into a shared cooldown, and
+    ``execute`` retries 403 rate-limit / 429 / 5xx with full-jitter backoff.
+    """
+
+    def __init__(self):
+        self._script = None
+        self._local: Dict[str, Tuple[float, float]] = {}
+        self._local_cooldowns: Dict[str, float] = {}
+
+    @staticmethod
+    def user_key(refresh_token: Optional[str]) -> str:
+        """Bucket id for a Google account (hash of its refresh token)"""
+        return hashlib.sha256((refresh_token or "").encode()).hexdigest()[:16]
+
+    @staticmethod
+    def max_cost(priority: str = "bulk") -> int:
+        """Largest cost a single acquire can ever be granted"""
+        burst = min(settings.GOOGLE_QUOTA_PROJECT_BURST, settings.GOOGLE_QUOTA_USER_BURST)
+        if priority == "bulk":
+            burst -= math.ceil(burst * settings.GOOGLE_QUOTA_INTERACTIVE_RESERVE)
+        return max(1, int(burst))
+
+    def _buckets(self, user: str, priority: str) -> List[Tuple[str, float, float, float]]:
+        """(key, rate per ms, burst, reserve) for the project and user buckets"""
+        share = settings.GOOGLE_QUOTA_INTERACTIVE_RESERVE if priority == "bulk" else 0.0
+        buckets = []
+        for key, rate, burst in (
+            (
+                f"{QUOTA_KEY_PREFIX}:project",
+                settings.GOOGLE_QUOTA_PROJECT_PER_SECOND,
+                settings.GOOGLE_QUOTA_PROJECT_BURST,
+            ),
+            (
+                f"{QUOTA_KEY_PREFIX}:user:{user}",
+                settings.GOOGLE_QUOTA_USER_PER_SECOND,
+                settings.GOOGLE_QUOTA_USER_BURST,
+            ),
+        ):
+            buckets.append((key, rate / 1000.0, float(burst), math.ceil(burst * share)))
+        return buckets
+
+    async def _try_acquire(self, user: str, cost: int, priority: str) -> int:
+        """Take tokens if available; returns milliseconds to wait otherwise"""
+        buckets = self._buckets(user, priority)
+        now = int(time.time() * 1000)
+        try:
+            redis = get_redis()
+            if self._script is None:
+                self._script = redis.register_script(ACQUIRE_SCRIPT)
+            args = [now, cost]
+            for _, rate, burst, reserve in buckets:
+                args.extend([rate, burst, reserve])
+            keys = [b[0] for b in buckets] + [f"{b[0]}:cooldown" for b in buckets]
+            return int(await self._script(keys=keys, args=args, client=redis))
+        except Exception as e:
+            print(f"Google quota falling back to local buckets: {e}")
+            self._script = None
+            return self._try_acquire_local(buckets, now, cost)
+
+    def _try_acquire_local(self, buckets, now: int, cost: int) -> int:
+        wait = 0
+        levels = []
+        for key, rate, burst, reserve in buckets:
+            wait = max(wait, int(self._local_cooldowns.get(key, 0) - now))
+            tokens, ts = self._local.get(key, (burst, now))
+            tokens = min(burst, tokens + max(0, now - ts) * rate)
+            levels.append(tokens)
+            missing = cost + reserve - tokens
+            if missing > 0:
+                wait = max(wait, math.ceil(missing / rate))
+        if wait > 0:
+            return wait
+        for (key, _, _, _), tokens in zip(buckets, levels):
+            self._local[key] = (tokens - cost, now)
+        return 0
+
+    async def acquire(
+        self,
+        user: str,
+        cost: int = 1,
+        priority: str = "interactive",
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Wait until ``cost`` calls may be made for ``user``"""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        cost = min(cost, self.max_cost(priority))
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            wait_ms = await self._try_acquire(user, cost, priority)
+            if wait_ms <= 0:
+                return
+            delay = min(wait_ms / 1000.0, MAX_WAIT_SLICE_SECONDS)
+            # Bulk callers re-poll a little later so waiting interactive calls win ties
+            delay *= random.uniform(1.0, 1.5 if priority == "bulk" else 1.1)
+            if deadline is not None and time.monotonic() + delay > deadline:
+                raise QuotaTimeout(f"Google API quota not available for {user}")
+            await asyncio.sleep(delay)
+
+    async def cool_down(self, user: str, seconds: float, project_wide: bool = False) -> None:
+        """Pause every process's calls for a bucket after a rate-limit response"""
+        key = f"{QUOTA_KEY_PREFIX}:project" if project_wide else f"{QUOTA_KEY_PREFIX}:user:{user}"
+        ms = max(1, int(seconds * 1000))
+        self._local_cooldowns[key] = time.time() * 1000 + ms
+        try:
+            await get_redis().set(f"{key}:cooldown", 1, px=ms)
+        except Exception as e:
+            print(f"Error setting Google quota cooldown: {e}")
+
+    @staticmethod
+    def error_reasons(error: HttpError) -> List[str]:
+        details = getattr(error, "error_details", None)
+        if not isinstance(details, list):
+            return []
+        return [d.get("reason") for d in details if isinstance(d, dict) and d.get("reason")]
+
+    @staticmethod
+    def classify(error: Exception) -> Tuple[bool, bool, bool]:
+        """(retryable, rate_limited, project_wide) for an API error"""
+        if not isinstance(error, HttpError):
+            # Network-level failures are worth retrying; anything else is a bug
+            return isinstance(error, (OSError, HttpLib2Error)), False, False
+        status_code = int(error.resp.status)
+        reasons = set(GoogleQuotaScheduler.error_reasons(error))
+        rate_limited = status_code == 429 or (
+            status_code == 403 and bool(reasons & RATE_LIMIT_REASONS)
+        )
+        project_wide = "rateLimitExceeded" in reasons or "quotaExceeded" in reasons
+        return rate_limited or status_code in RETRYABLE_STATUSES, rate_limited, project_wide
+
+    @staticmethod
+    def backoff(attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt (0-based)"""
+        return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+    async def note_error(self, user: str, error: Exception, attempt: int = 0) -> float:
+        """Apply a shared cooldown for rate-limit errors; returns the backoff delay"""
+        _, rate_limited, project_wide = self.classify(error)
+        delay = self.backoff(attempt)
+        if rate_limited:
+            await self.cool_down(user, delay, project_wide=project_wide)
+        return delay
+
+    async def execute(
+        self,
+        user: str,
+        request: Any,
+        priority: str = "interactive",
+        cost: int = 1,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Run a googleapiclient request (or callable) within quota, with retries
+
+        ``request`` is executed in a thread so the event loop is not blocked.
+        """
+        call: Callable[[], Any] = request.execute if hasattr(request, "execute") else request
+        attempt = 0
+        while True:
+            await self.acquire(user, cost=cost, priority=priority, timeout=timeout)
+            try:
+                return await asyncio.to_thread(call)
+            except Exception as e:
+                retryable, _, _ = self.classify(e)
+                if not retryable or attempt >= settings.GOOGLE_API_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(await self.note_error(user, e, attempt))
+                attempt += 1
+
+
+google_quota = GoogleQuotaScheduler()
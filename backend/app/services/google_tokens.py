@@ -0,0 +1,172 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import uuid
+
+from app.db.database import SessionLocal
+from app.db.redis import get_redis
+from app.models.user import User
+from app.services.google_oauth import GoogleOAuthService
+
+TOKEN_LOCK_PREFIX = "sifut:gtoken:lock"
+LOCK_TTL_SECONDS = 30
+PEER_POLL_SECONDS = 0.2
+# Tokens this close to expiry are refreshed before use
+REFRESH_MARGIN = timedelta(seconds=60)
+# Tokens this close to expiry are still used, with a refresh started in the background
+PROACTIVE_WINDOW = timedelta(minutes=10)
+
+# Deletes the lock only if this process still owns it
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+AccessToken = Tuple[str, Optional[datetime]]
+
+
+class GoogleTokenManager:
+    """Google access tokens with persisted, single-flight refresh
+
+    Refreshed tokens and ``token_expires_at`` are written back to the user so
+    later calls (in any process) reuse them instead of refreshing again.
+    Concurrent refreshes for a user share one in-flight task per process and
+    one Redis lock across processes; lock losers wait for the winner to
+    release the lock and then read its token from the database once.
+    Database access runs in a thread, off the event loop.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def is_fresh(expires_at: Optional[datetime], margin: timedelta = REFRESH_MARGIN) -> bool:
+        # Tokens from before expiry tracking are used until Google rejects them
+        return expires_at is None or expires_at > datetime.utcnow() + margin
+
+    async def get_access_token(self, user: Any) -> Optional[str]:
+        """Valid access token for a user (or user row with the token columns)
+
+        Returns None if the user has no Google connection or refresh failed.
+        """
+        if not user.google_refresh_token:
+            return None
+
+        token = user.google_access_token
+        expires_at = user.token_expires_at
+        if token and self.is_fresh(expires_at):
+            if not self.is_fresh(expires_at, PROACTIVE_WINDOW):
+                self._start_refresh(user.id, user.google_refresh_token)
+            return token
+
+        refreshed = await self.refresh(user.id, user.google_refresh_token)
+        return refreshed[0] if refreshed else None
+
+    def _start_refresh(self, user_id: str, refresh_token: str) -> asyncio.Task:
+        task = self._inflight.get(user_id)
+        if task is None or task.done():
+            task = asyncio.create_task(self._refresh(user_id, refresh_token))
+            self._inflight[user_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(user_id, None))
+        return task
+
+    async def refresh(self, user_id: str, refresh_token: str) -> Optional[AccessToken]:
+        """Refresh a user's token, joining any refresh already in flight"""
+        return await asyncio.shield(self._start_refresh(user_id, refresh_token))
+
+    async def _refresh(self, user_id: str, refresh_token: str) -> Optional[AccessToken]:
+        lock_key = f"{TOKEN_LOCK_PREFIX}:{user_id}"
+        owner = uuid.uuid4().hex
+        try:
+            acquired = await get_redis().set(lock_key, owner, nx=True, ex=LOCK_TTL_SECONDS)
+        except Exception as e:
+            # Redis unavailable: still de-duplicated within this process
+            print(f"Error acquiring token refresh lock: {e}")
+            acquired, lock_key = True, None
+
+        if not acquired:
+            return await self._wait_for_peer(user_id, lock_key)
+
+        try:
+            # Another process may have finished a refresh just before we got the lock
+            current = await asyncio.to_thread(self._load, user_id)
+            if current and self.is_fresh(current[1], PROACTIVE_WINDOW):
+                return current
+
+            tokens = await asyncio.to_thread(
+                GoogleOAuthService.refresh_access_token, refresh_token
+            )
+            await asyncio.to_thread(self._store, user_id, refresh_token, tokens)
+            return tokens["access_token"], tokens.get("expiry")
+        except Exception as e:
+            print(f"Error refreshing Google token for {user_id}: {e}")
+            return None
+        finally:
+            if lock_key:
+                try:
+                    await get_redis().eval(RELEASE_SCRIPT, 1, lock_key, owner)
+                except Exception as e:
+                    print(f"Error releasing token refresh lock: {e}")
+
+    async def _wait_for_peer(self, user_id: str, lock_key: str) -> Optional[AccessToken]:
+        """Wait for the process holding the lock to store a fresh token
+
+        Polls the lock in Redis, which the holder releases after storing
+        the token, then reads the token once.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + LOCK_TTL_SECONDS
+        while loop.time() < deadline:
+            await asyncio.sleep(PEER_POLL_SECONDS)
+            try:
+                if await get_redis().exists(lock_key):
+                    continue
+                released = True
+            except Exception as e:
+                # Cannot see the lock: check the database instead
+                print(f"Error checking token refresh lock: {e}")
+                released = False
+            current = await asyncio.to_thread(self._load, user_id)
+            if current and self.is_fresh(current[1]):
+                return current
+            if released:
+                # Released without a fresh token: the refresh failed
+                return None
+        return None
+
+    @staticmethod
+    def _load(user_id: str) -> Optional[AccessToken]:
+        db = SessionLocal()
+        try:
+            row = (
+                db.query(User.google_access_token, User.token_expires_at)
+                .filter(User.id == user_id)
+                .first()
+            )
+            if not row or not row.google_access_token:
+                return None
+            return row.google_access_token, row.token_expires_at
+        finally:
+            db.close()
+
+    @staticmethod
+    def _store(user_id: str, refresh_token: str, tokens: Dict) -> None:
+        """Persist a refreshed token in its own transaction"""
+        values = {
+            User.google_access_token: tokens["access_token"],
+            User.token_expires_at: tokens.get("expiry"),
+        }
+        if tokens.get("refresh_token") and tokens["refresh_token"] != refresh_token:
+            values[User.google_refresh_token] = tokens["refresh_token"]
+
+        db = SessionLocal()
+        try:
+            db.query(User).filter(User.id == user_id).update(values, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+token_manager = GoogleTokenManager()
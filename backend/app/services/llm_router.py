@@ -0,0 +1,254 @@
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+import asyncio
+import time
+
+from app.core.config import settings
+
+# Providers return (parsed result, usage) where usage may carry model,
+# input_tokens, output_tokens and retries
+ProviderCall = Callable[[str, Any], Awaitable[Tuple[Dict[str, Any], Dict[str, Any]]]]
+
+STATS_WINDOW = 50
+MIN_SAMPLES = 5
+
+
+class ProviderStats:
+    """Rolling latency and error-rate window for one provider (per process)"""
+
+    def __init__(self):
+        self.latencies: Deque[float] = deque(maxlen=STATS_WINDOW)
+        self.outcomes: Deque[bool] = deque(maxlen=STATS_WINDOW)
+
+    def record(self, latency: Optional[float], ok: bool) -> None:
+        self.outcomes.append(ok)
+        if ok and latency is not None:
+            self.latencies.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self.latencies) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    @property
+    def healthy(self) -> bool:
+        return (
+            len(self.outcomes) < MIN_SAMPLES
+            or self.error_rate < settings.LLM_UNHEALTHY_ERROR_RATE
+        )
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on this provider before starting a hedge"""
+        p90 = self.percentile(0.9)
+        return p90 if p90 is not None else settings.LLM_HEDGE_DEFAULT_SECONDS
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50, p90 = self.percentile(0.5), self.percentile(0.9)
+        return {
+            "samples": len(self.outcomes),
+            "error_rate": round(self.error_rate, 3),
+            "p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "p90_ms": round(p90 * 1000) if p90 is not None else None,
+            "healthy": self.healthy,
+        }
+
+
+class LLMRoutingError(Exception):
+    """No provider produced a result; ``attempts`` has the per-call details"""
+
+    def __init__(self, message: str, attempts: List[Dict[str, Any]]):
+        super().__init__(message)
+        self.attempts = attempts
+
+
+class StubProvider:
+    """Local provider for tests and benchmarks
+
+    ``response`` is a dict or a callable taking the prompt; ``latency`` is
+    seconds (or a callable returning seconds); ``error`` is raised if set.
+    """
+
+    def __init__(
+        self,
+        response: Any = None,
+        latency: Any = 0.0,
+        error: Optional[Exception] = None,
+        model: str = "stub",
+    ):
+        self.response = response if response is not None else {"assignments": [], "summary": {}}
+        self.latency = latency
+        self.error = error
+        self.model = model
+        self.calls = 0
+
+    async def __call__(self, prompt: str, clients: Any = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        self.calls += 1
+        await asyncio.sleep(self.latency() if callable(self.latency) else self.latency)
+        if self.error is not None:
+            raise self.error
+        result = self.response(prompt) if callable(self.response) else self.response
+        # Rough token estimate so usage accounting has something to add up
+        usage = {
+            "model": self.model,
+            "input_tokens": len(prompt) // 4,
+            "output_tokens": len(str(result)) // 4,
+            "retries": 0,
+        }
+        return result, usage
+
+
+class LLMRouter:
+    """Routes a prompt across LLM providers with hedging and fallback
+
+    The configured ``AI_PROVIDER`` goes first unless it is unhealthy, then
+    the other available providers by median latency. If the running attempt
+    exceeds its provider's p90 latency a hedge is started on the next
+    provider (up to ``LLM_MAX_PARALLEL`` at once); a failed attempt starts
+    the next provider immediately. The first success wins, the rest are
+    cancelled, and everything must finish within ``LLM_TIMEOUT_SECONDS``.
+    """
+
+    def __init__(self):
+        self.providers: Dict[str, ProviderCall] = {}
+        self.available: Dict[str, Callable[[], bool]] = {}
+        self.stats: Dict[str, ProviderStats] = {}
+
+    def register(
+        self,
+        name: str,
+        call: ProviderCall,
+        available: Callable[[], bool] = lambda: True,
+    ) -> None:
+        """Add or replace a provider"""
+        self.providers[name] = call
+        self.available[name] = available
+        self.stats.setdefault(name, ProviderStats())
+
+    def unregister(self, name: str) -> None:
+        self.providers.pop(name, None)
+        self.available.pop(name, None)
+        self.stats.pop(name, None)
+
+    def ranked(self) -> List[str]:
+        """Providers in the order they should be tried"""
+        primary = settings.AI_PROVIDER
+        if primary not in self.providers:
+            raise ValueError(f"Unsupported AI provider: {primary}")
+
+        others = [
+            name
+            for name in self.providers
+            if name != primary and self.available[name]()
+        ]
+
+        def latency_key(name: str) -> Tuple[bool, float]:
+            p50 = self.stats[name].percentile(0.5)
+            return (not self.stats[name].healthy, p50 if p50 is not None else float("inf"))
+
+        others.sort(key=latency_key)
+        if not settings.LLM_FALLBACK_ENABLED:
+            return [primary]
+        if not self.stats[primary].healthy and others and self.stats[others[0]].healthy:
+            return others + [primary]
+        return [primary] + others
+
+    async def route(self, prompt: str, clients: Any = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Run the prompt; returns the winning result and routing details"""
+        queue = self.ranked()
+        started = time.perf_counter()
+        deadline = started + settings.LLM_TIMEOUT_SECONDS
+        pending: Dict[asyncio.Task, Tuple[str, float]] = {}
+        attempts: List[Dict[str, Any]] = []
+        last_error: Optional[BaseException] = None
+        hedged = False
+        timed_out = False
+
+        def launch() -> None:
+            name = queue.pop(0)
+            task = asyncio.create_task(self.providers[name](prompt, clients))
+            pending[task] = (name, time.perf_counter())
+
+        def attempt(name: str, t0: float, status: str, error: Any = None) -> Dict[str, Any]:
+            entry = {
+                "provider": name,
+                "status": status,
+                "started_ms": round((t0 - started) * 1000),
+                "latency_ms": round((time.perf_counter() - t0) * 1000),
+            }
+            if error is not None:
+                entry["error"] = str(error)[:500]
+            attempts.append(entry)
+            return entry
+
+        launch()
+        try:
+            while pending:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                timeout = deadline - now
+
+                # Hedge once the newest attempt passes its provider's p90
+                hedge_at = None
+                if queue and settings.LLM_HEDGING_ENABLED and len(pending) < settings.LLM_MAX_PARALLEL:
+                    newest, newest_t0 = max(pending.values(), key=lambda v: v[1])
+                    hedge_at = newest_t0 + self.stats[newest].hedge_delay()
+                    timeout = min(timeout, max(0.0, hedge_at - now))
+
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    name, t0 = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        result, usage = task.result()
+                        entry = attempt(name, t0, "ok")
+                        entry.update(usage or {})
+                        self.stats[name].record(entry["latency_ms"] / 1000, True)
+                        return result, {
+                            "provider": name,
+                            "hedged": hedged,
+                            "total_ms": round((time.perf_counter() - started) * 1000),
+                            "attempts": attempts,
+                        }
+                    attempt(name, t0, "error", error)
+                    self.stats[name].record(None, False)
+                    last_error = error
+                    if queue:
+                        launch()
+
+                if not done and hedge_at is not None and time.perf_counter() >= hedge_at:
+                    hedged = True
+                    launch()
+        finally:
+            timed_out = bool(pending) and time.perf_counter() >= deadline
+            for task, (name, t0) in pending.items():
+                task.cancel()
+                if timed_out:
+                    attempt(name, t0, "timeout")
+                    self.stats[name].record(None, False)
+                else:
+                    attempt(name, t0, "cancelled")
+
+        if last_error is not None and not timed_out:
+            raise LLMRoutingError(str(last_error), attempts) from last_error
+        raise LLMRoutingError(
+            f"No LLM provider answered within {settings.LLM_TIMEOUT_SECONDS}s "
+            f"({', '.join(a['provider'] + ':' + a['status'] for a in attempts)})",
+            attempts,
+        )
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stats.snapshot() for name, stats in self.stats.items()}
+
+
+llm_router = LLMRouter()
@@ -1,6 +1,13 @@
 from app.core.config import settings
-from typing import Dict, List, Any
+from app.core.http_clients import HTTPClients, http_clients
+from app.services.llm_router import llm_router
+from typing import Dict, List, Any, Awaitable, Callable, Optional, Tuple
+import asyncio
 import json
+import random
+
+# Status codes worth retrying on the same provider (529: Anthropic overloaded)
+RETRYABLE_LLM_STATUSES = {408, 409, 429, 500, 502, 503, 504, 529}
 
 
 class LLMService:
@@ -11,8 +18,13 @@ class LLMService:
         shift_requests: List[Dict[str, Any]],
         projects: List[Dict[str, Any]],
         month: str,
-    ) -> Dict[str, Any]:
-        """Optimize shifts using LLM"""
+        clients: Optional[HTTPClients] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Optimize shifts using LLM
+
+        Returns the parsed result and the routing details (provider, timings).
+        """
+        clients = clients or http_clients
 
         # Prepare prompt
         prompt = f"""
@@ -55,28 +67,44 @@ class LLMService:
         }}
         """
 
-        # Call LLM based on provider
-        if settings.AI_PROVIDER == "claude":
-            return await LLMService._call_claude(prompt)
-        elif settings.AI_PROVIDER == "openai":
-            return await LLMService._call_openai(prompt)
-        elif settings.AI_PROVIDER == "gemini":
-            return await LLMService._call_gemini(prompt)
-        else:
-            raise ValueError(f"Unsupported AI provider: {settings.AI_PROVIDER}")
+        # AI_PROVIDER first, with hedging/fallback across configured providers
+        return await llm_router.route(prompt, clients)
 
     @staticmethod
-    async def _call_claude(prompt: str) -> Dict[str, Any]:
-        """Call Anthropic Claude API"""
-        from anthropic import AsyncAnthropic
-
-        client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+    async def _with_retries(create: Callable[[], Awaitable[Any]]) -> Tuple[Any, int]:
+        """Run an SDK call, retrying transient failures; returns (response, retries)"""
+        retries = 0
+        while True:
+            try:
+                return await create(), retries
+            except Exception as e:
+                status_code = getattr(e, "status_code", None) or getattr(e, "code", None)
+                connection_error = any(
+                    cls.__name__ == "APIConnectionError" for cls in type(e).__mro__
+                )
+                if retries >= settings.LLM_MAX_RETRIES or not (
+                    connection_error or status_code in RETRYABLE_LLM_STATUSES
+                ):
+                    raise
+                await asyncio.sleep(min(8.0, 0.5 * 2 ** retries) * random.uniform(0.5, 1.0))
+                retries += 1
 
-        message = await client.messages.create(
-            model=settings.ANTHROPIC_MODEL,
-            max_tokens=4096,
-            messages=[{"role": "user", "content": prompt}],
+    @staticmethod
+    async def _call_claude(prompt: str, clients: HTTPClients) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Call Anthropic Claude API; returns (result, usage)"""
+        message, retries = await LLMService._with_retries(
+            lambda: clients.anthropic.messages.create(
+                model=settings.ANTHROPIC_MODEL,
+                max_tokens=4096,
+                messages=[{"role": "user", "content": prompt}],
+            )
         )
+        usage = {
+            "model": message.model,
+            "input_tokens": message.usage.input_tokens,
+            "output_tokens": message.usage.output_tokens,
+            "retries": retries,
+        }
 
         # Extract JSON from response
         content = message.content[0].text
@@ -85,38 +113,59 @@ class LLMService:
         end_idx = content.rfind("}") + 1
         if start_idx != -1 and end_idx != 0:
             json_str = content[start_idx:end_idx]
-            return json.loads(json_str)
+            return json.loads(json_str), usage
         else:
             raise ValueError("Failed to extract JSON from Claude response")
 
     @staticmethod
-    async def _call_openai(prompt: str) -> Dict[str, Any]:
-        """Call OpenAI API"""
-        from openai import AsyncOpenAI
-
-        client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-
-        response = await client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"},
-            temperature=0.3,
+    async def _call_openai(prompt: str, clients: HTTPClients) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Call OpenAI API; returns (result, usage)"""
+        response, retries = await LLMService._with_retries(
+            lambda: clients.openai.chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                response_format={"type": "json_object"},
+                temperature=0.3,
+            )
         )
+        usage = {
+            "model": response.model,
+            "input_tokens": response.usage.prompt_tokens if response.usage else None,
+            "output_tokens": response.usage.completion_tokens if response.usage else None,
+            "retries": retries,
+        }
 
         content = response.choices[0].message.content
-        return json.loads(content)
+        return json.loads(content), usage
 
     @staticmethod
-    async def _call_gemini(prompt: str) -> Dict[str, Any]:
-        """Call Google Gemini API"""
-        import google.generativeai as genai
-
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        model = genai.GenerativeModel(settings.GEMINI_MODEL)
-
-        response = await model.generate_content_async(
-            prompt,
-            generation_config={"response_mime_type": "application/json"},
+    async def _call_gemini(prompt: str, clients: HTTPClients) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Call Google Gemini API; returns (result, usage)"""
+        model = clients.gemini_model(settings.GEMINI_MODEL)
+
+        response, retries = await LLMService._with_retries(
+            lambda: model.generate_content_async(
+                prompt,
+                generation_config={"response_mime_type": "application/json"},
+            )
         )
-
-        return json.loads(response.text)
+        metadata = getattr(response, "usage_metadata", None)
+        usage = {
+            "model": settings.GEMINI_MODEL,
+            "input_tokens": getattr(metadata, "prompt_token_count", None),
+            "output_tokens": getattr(metadata, "candidates_token_count", None),
+            "retries": retries,
+        }
+
+        return json.loads(response.text), usage
+
+
+llm_router.register(
+    "claude", LLMService._call_claude, available=lambda: bool(settings.ANTHROPIC_API_KEY)
+)
+llm_router.register(
+    "openai", LLMService._call_openai, available=lambda: bool(settings.OPENAI_API_KEY)
+)
+llm_router.register(
+    "gemini", LLMService._call_gemini, available=lambda: bool(settings.GEMINI_API_KEY)
+)
@@ -0,0 +1,136 @@
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, func, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.types import new_id
+from app.models.llm_usage import LLMUsage
+
+# USD per million (input, output) tokens, matched by longest model-name prefix.
+# LLM_PRICING overrides or extends these without a deploy.
+DEFAULT_PRICING: Dict[str, Tuple[float, float]] = {
+    "claude-3-5-sonnet": (3.0, 15.0),
+    "claude-3-5-haiku": (0.8, 4.0),
+    "claude-3-opus": (15.0, 75.0),
+    "gpt-4o-mini": (0.15, 0.6),
+    "gpt-4o": (2.5, 10.0),
+    "gemini-1.5-flash": (0.075, 0.3),
+    "gemini-1.5-pro": (1.25, 5.0),
+    "stub": (0.0, 0.0),
+}
+
+
+class LLMUsageService:
+    """Per-call LLM usage and cost accounting"""
+
+    @staticmethod
+    def price_for(model: Optional[str]) -> Optional[Tuple[float, float]]:
+        if not model:
+            return None
+        pricing = {**DEFAULT_PRICING, **{k: tuple(v) for k, v in settings.LLM_PRICING.items()}}
+        matches = [prefix for prefix in pricing if model.startswith(prefix)]
+        if not matches:
+            return None
+        return pricing[max(matches, key=len)]
+
+    @staticmethod
+    def estimate_cost(
+        model: Optional[str], input_tokens: Optional[int], output_tokens: Optional[int]
+    ) -> Optional[Decimal]:
+        price = LLMUsageService.price_for(model)
+        if price is None or input_tokens is None or output_tokens is None:
+            return None
+        cost = (input_tokens * price[0] + output_tokens * price[1]) / 1_000_000
+        return Decimal(str(round(cost, 6)))
+
+    @staticmethod
+    def record(
+        db: Session,
+        attempts: Sequence[Dict[str, Any]],
+        month: str,
+        suggestion_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Insert one row per routed provider attempt in a single INSERT
+
+        Does not commit.
+        """
+        rows = [
+            {
+                "id": new_id(),
+                "suggestion_id": suggestion_id,
+                "month": month,
+                "provider": a["provider"],
+                "model": a.get("model"),
+                "status": a["status"],
+                "input_tokens": a.get("input_tokens"),
+                "output_tokens": a.get("output_tokens"),
+                "latency_ms": a["latency_ms"],
+                "retries": a.get("retries", 0),
+                "cost_usd": LLMUsageService.estimate_cost(
+                    a.get("model"), a.get("input_tokens"), a.get("output_tokens")
+                ),
+                "error": a.get("error"),
+            }
+            for a in attempts
+        ]
+        if rows:
+            db.execute(insert(LLMUsage), rows)
+        return rows
+
+    @staticmethod
+    def aggregate(
+        db: Session, start_month: str, end_month: str, provider: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Usage per (month, provider) for months in [start_month, end_month)"""
+        query = (
+            db.query(
+                LLMUsage.month,
+                LLMUsage.provider,
+                func.count(LLMUsage.id),
+                func.sum(case((LLMUsage.status == "ok", 1), else_=0)),
+                func.sum(case((LLMUsage.status.in_(["error", "timeout"]), 1), else_=0)),
+                func.sum(case((LLMUsage.status == "cancelled", 1), else_=0)),
+                func.coalesce(func.sum(LLMUsage.input_tokens), 0),
+                func.coalesce(func.sum(LLMUsage.output_tokens), 0),
+                func.coalesce(func.sum(LLMUsage.retries), 0),
+                func.coalesce(func.sum(LLMUsage.cost_usd), 0),
+                func.avg(case((LLMUsage.status == "ok", LLMUsage.latency_ms))),
+            )
+            .filter(LLMUsage.month >= start_month)
+            .filter(LLMUsage.month < end_month)
+        )
+        if provider:
+            query = query.filter(LLMUsage.provider == provider)
+
+        return [
+            {
+                "month": month,
+                "provider": provider_name,
+                "calls": calls,
+                "successful_calls": int(ok or 0),
+                "failed_calls": int(failed or 0),
+                "cancelled_calls": int(cancelled or 0),
+                "input_tokens": int(input_tokens),
+                "output_tokens": int(output_tokens),
+                "retries": int(retries),
+                "cost_usd": round(float(cost), 6),
+                "avg_latency_ms": round(float(avg_latency)) if avg_latency is not None else None,
+            }
+            for (
+                month,
+                provider_name,
+                calls,
+                ok,
+                failed,
+                cancelled,
+                input_tokens,
+                output_tokens,
+                retries,
+                cost,
+                avg_latency,
+            ) in query.group_by(LLMUsage.month, LLMUsage.provider)
+            .order_by(LLMUsage.month, LLMUsage.provider)
+            .all()
+        ]
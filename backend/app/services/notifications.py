@@ -0,0 +1,58 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.db.types import new_id
+from app.models.notification import Notification
+from app.services.pubsub import PubSubHub
+
+NOTIFICATION_CHANNEL = "sifut:notifications"
+
+
+# Routes each notification to the streams of its recipient
+notification_hub = PubSubHub(NOTIFICATION_CHANNEL, keys_of=lambda item: [item["user_id"]])
+
+
+class NotificationService:
+    """Notification creation and delivery"""
+
+    @staticmethod
+    def create_bulk(
+        db: Session,
+        user_ids: Sequence[str],
+        type: str,
+        title: str,
+        message: str,
+        link: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Insert one notification per recipient in a single INSERT
+
+        Does not commit; call ``publish`` with the returned rows after the
+        surrounding transaction commits.
+        """
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": new_id(),
+                "user_id": user_id,
+                "type": type,
+                "title": title,
+                "message": message,
+                "link": link,
+                "is_read": False,
+                "created_at": now,
+            }
+            for user_id in dict.fromkeys(user_ids)
+        ]
+        if rows:
+            db.execute(insert(Notification), rows)
+        return rows
+
+    @staticmethod
+    async def publish(rows: Sequence[Dict[str, Any]]) -> None:
+        """Publish committed notifications to every worker with one PUBLISH"""
+        await notification_hub.publish(
+            [{**row, "created_at": row["created_at"].isoformat()} for row in rows]
+        )
@@ -0,0 +1,120 @@
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+import asyncio
+import json
+
+from app.db.redis import get_redis
+
+
+class OverflowQueue(asyncio.Queue):
+    """Subscriber queue that drops items when full and remembers having done so
+
+    The consumer checks ``overflowed`` and tells its client to re-fetch
+    instead of silently missing events.
+    """
+
+    def __init__(self, maxsize: int = 100):
+        super().__init__(maxsize=maxsize)
+        self.overflowed = False
+
+    def put_nowait(self, item: Any) -> None:
+        try:
+            super().put_nowait(item)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def reset(self) -> None:
+        """Drop everything queued and clear ``overflowed``"""
+        while not self.empty():
+            self.get_nowait()
+        self.overflowed = False
+
+
+class PubSubHub:
+    """Per-worker fan-out of a Redis pub/sub channel to local subscribers
+
+    Each worker holds a single subscription to ``channel`` and routes every
+    message to the local queues registered under the keys returned by
+    ``keys_of(item)``. Publishing is one PUBLISH regardless of how many
+    workers or clients are listening.
+    """
+
+    def __init__(self, channel: str, keys_of: Callable[[Dict[str, Any]], Iterable[str]]):
+        self.channel = channel
+        self.keys_of = keys_of
+        self._queues: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self, keys: Iterable[str], queue: Optional[asyncio.Queue] = None) -> asyncio.Queue:
+        """Register a queue under ``keys`` (a new one unless given)"""
+        if queue is None:
+            queue = asyncio.Queue(maxsize=100)
+        for key in keys:
+            self._queues[key].add(queue)
+        self.ensure_listener()
+        return queue
+
+    def unsubscribe(self, keys: Iterable[str], queue: asyncio.Queue) -> None:
+        for key in keys:
+            queues = self._queues.get(key)
+            if queues is None:
+                continue
+            queues.discard(queue)
+            if not queues:
+                self._queues.pop(key, None)
+
+    def deliver(self, items: Iterable[Dict[str, Any]]) -> None:
+        """Push items to local subscribers, dropping on slow consumers"""
+        for item in items:
+            targets = set()
+            for key in self.keys_of(item):
+                targets.update(self._queues.get(key, ()))
+            for queue in targets:
+                try:
+                    queue.put_nowait(item)
+                except asyncio.QueueFull:
+                    pass
+
+    async def publish(self, items: List[Dict[str, Any]]) -> None:
+        """Publish items to every worker"""
+        if not items:
+            return
+        try:
+            await get_redis().publish(self.channel, json.dumps(items, default=str))
+        except Exception as e:
+            # Redis unavailable: still deliver to clients on this worker
+            print(f"Error publishing to {self.channel}: {e}")
+            self.deliver(items)
+
+    def ensure_listener(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        """Relay the Redis channel to local subscribers, reconnecting on errors"""
+        while self._queues:
+            try:
+                pubsub = get_redis().pubsub()
+                await pubsub.subscribe(self.channel)
+                try:
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            self.deliver(json.loads(message["data"]))
+                        if not self._queues:
+                            break
+                finally:
+                    await pubsub.aclose()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error listening on {self.channel}: {e}")
+                await asyncio.sleep(1)
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
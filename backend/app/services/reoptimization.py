@@ -0,0 +1,55 @@
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Set
+
+
+class ReoptimizationService:
+    """Diffs optimization inputs so only changed days are re-solved"""
+
+    @staticmethod
+    def snapshot(
+        shift_requests: List[Dict[str, Any]], projects: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Inputs stored with a suggestion for later diffing"""
+        return {
+            "requests": shift_requests,
+            "projects": [
+                {"id": p["id"], "required_members": p["required_members"]} for p in projects
+            ],
+        }
+
+    @staticmethod
+    def _requests_by_day(shift_requests: List[Dict[str, Any]]) -> Dict[str, Counter]:
+        days: Dict[str, Counter] = defaultdict(Counter)
+        for sr in shift_requests:
+            days[sr["date"]][
+                (sr["user_id"], sr["start_time"], sr["end_time"], sr.get("comment"))
+            ] += 1
+        return days
+
+    @staticmethod
+    def changed_days(
+        snapshot: Dict[str, Any],
+        shift_requests: List[Dict[str, Any]],
+        projects: List[Dict[str, Any]],
+    ) -> Set[str]:
+        """ISO dates whose submitted requests differ from the snapshot
+
+        Requests are compared per day as multisets, so reordering or
+        re-submitting an identical request is not a change. A change to the
+        active projects or their ``required_members`` affects every day.
+        """
+        before = ReoptimizationService._requests_by_day(snapshot.get("requests", []))
+        after = ReoptimizationService._requests_by_day(shift_requests)
+
+        current_projects = ReoptimizationService.snapshot([], projects)["projects"]
+        if sorted(snapshot.get("projects", []), key=lambda p: p["id"]) != sorted(
+            current_projects, key=lambda p: p["id"]
+        ):
+            return set(before) | set(after)
+
+        return {day for day in set(before) | set(after) if before.get(day) != after.get(day)}
+
+    @staticmethod
+    def carry_over(assignments: List[Dict[str, Any]], changed: Set[str]) -> List[Dict[str, Any]]:
+        """Assignments of the base suggestion kept as they are (days not in ``changed``)"""
+        return [a for a in assignments if a["date"] not in changed]
@@ -0,0 +1,554 @@
+"""CSV import/export of confirmed shifts
+
+Imports are read in batches of SHIFT_IMPORT_BATCH_SIZE rows, so memory does
+not grow with the file. Each batch is validated with array operations
+(dates, times, ranges and double-booking against both the batch and stored
+shifts) and written with ``COPY ... FROM STDIN`` on PostgreSQL or a batched
+INSERT elsewhere, together with its monthly_workloads deltas. The whole
+file is one transaction: any invalid row rolls it back and the per-line
+errors are returned instead.
+
+Exports stream ``COPY (SELECT ...) TO STDOUT`` on PostgreSQL (or a
+server-side cursor elsewhere) without building the file in memory.
+"""
+from collections import defaultdict
+from datetime import date
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+import csv
+import io
+import queue
+import threading
+
+import numpy as np
+from sqlalchemy import Numeric, cast, extract, func, insert, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.types import new_id
+from app.models.project import Project
+from app.models.schedule import ScheduleInterval
+from app.models.shift import ConfirmedShift
+from app.models.user import User
+from app.services.changes import month_scope, project_scope, user_scope
+from app.services.conflicts import ConflictService
+from app.services.workload import WorkloadService
+
+REQUIRED_COLUMNS = ("date", "start_time", "end_time")
+EXPORT_COLUMNS = (
+    "shift_id",
+    "date",
+    "start_time",
+    "end_time",
+    "hours",
+    "user_id",
+    "user_email",
+    "user_name",
+    "project_id",
+    "project_name",
+    "comment",
+)
+SHIFT_COPY_COLUMNS = ("id", "user_id", "project_id", "date", "start_time", "end_time", "comment", "created_by")
+INTERVAL_COPY_COLUMNS = ("id", "user_id", "project_id", "kind", "source_id", "start_at", "end_at")
+
+MAX_REPORTED_ERRORS = 1000
+EXPORT_ROWS_PER_CHUNK = 1000
+EXPORT_QUEUE_CHUNKS = 64
+
+# Per-user offset (in seconds) that keeps users apart in one sorted array
+USER_SPAN = np.int64(2**34)
+EPOCH = np.datetime64("1970-01-01T00:00:00", "s")
+
+
+class ShiftImportError(ValueError):
+    """The file cannot be imported at all (e.g. missing columns)"""
+
+
+class ExportCancelled(Exception):
+    """The client went away while COPY was still producing rows"""
+
+
+def _parse_datetimes(values: Sequence[str]) -> np.ndarray:
+    """ISO datetimes as datetime64[s]; unparseable values become NaT
+
+    The whole batch is converted at once and only a batch containing bad
+    values is retried value by value.
+    """
+    try:
+        return np.array(values, dtype="datetime64[s]")
+    except ValueError:
+        parsed = np.empty(len(values), dtype="datetime64[s]")
+        for i, value in enumerate(values):
+            try:
+                parsed[i] = np.datetime64(value, "s")
+            except ValueError:
+                parsed[i] = np.datetime64("NaT")
+        return parsed
+
+
+def _normalize_time(value: str) -> str:
+    """Accept H:MM as well as HH:MM[:SS]"""
+    hours, sep, rest = value.strip().partition(":")
+    return hours.zfill(2) + sep + rest
+
+
+class ShiftCSVService:
+    """Bulk import and payroll export of confirmed shifts"""
+
+    @staticmethod
+    def lookups(db: Session) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """User and project ids by id, email or name (loaded once per import)"""
+        users: Dict[str, str] = {}
+        for user_id, email in db.query(User.id, User.email):
+            users[user_id] = user_id
+            users[email.lower()] = user_id
+        projects: Dict[str, str] = {}
+        for project_id, name in db.query(Project.id, Project.name):
+            projects[project_id] = project_id
+            projects.setdefault(name, project_id)
+        return users, projects
+
+    @staticmethod
+    def validate_batch(
+        db: Session,
+        rows: List[Dict[str, str]],
+        users: Dict[str, str],
+        projects: Dict[str, str],
+    ) -> Tuple[np.ndarray, Dict[int, List[str]], Dict[str, np.ndarray]]:
+        """Validate a batch; returns (valid mask, errors by row index, parsed columns)"""
+        count = len(rows)
+        errors: Dict[int, List[str]] = defaultdict(list)
+
+        days = np.array([(row.get("date") or "").strip() for row in rows], dtype=object)
+        starts = [_normalize_time(row.get("start_time") or "") for row in rows]
+        ends = [_normalize_time(row.get("end_time") or "") for row in rows]
+        start_at = _parse_datetimes([f"{d}T{t}" for d, t in zip(days, starts)])
+        end_at = _parse_datetimes([f"{d}T{t}" for d, t in zip(days, ends)])
+
+        day_lengths = np.fromiter((len(d) for d in days), dtype=np.int64, count=count)
+        day_ok = (day_lengths == 10) & ~np.isnat(_parse_datetimes([f"{d}T00:00" for d in days]))
+        start_ok = day_ok & ~np.isnat(start_at)
+        end_ok = day_ok & ~np.isnat(end_at)
+        range_ok = start_ok & end_ok & (end_at > start_at)
+
+        user_ids = np.array(
+            [
+                users.get((row.get("user_id") or "").strip())
+                or users.get((row.get("user_email") or "").strip().lower())
+                for row in rows
+            ],
+            dtype=object,
+        )
+        project_ids = np.array(
+            [
+                projects.get((row.get("project_id") or "").strip())
+                or projects.get((row.get("project_name") or "").strip())
+                for row in rows
+            ],
+            dtype=object,
+        )
+        user_ok = user_ids != None  # noqa: E711 (elementwise)
+        project_ok = project_ids != None  # noqa: E711
+
+        for i in np.flatnonzero(~day_ok):
+            errors[i].append("date must be YYYY-MM-DD")
+        for i in np.flatnonzero(day_ok & ~start_ok):
+            errors[i].append("start_time must be HH:MM")
+        for i in np.flatnonzero(day_ok & ~end_ok):
+            errors[i].append("end_time must be HH:MM")
+        for i in np.flatnonzero(start_ok & end_ok & ~range_ok):
+            errors[i].append("end_time must be after start_time")
+        for i in np.flatnonzero(~user_ok):
+            errors[i].append("unknown user")
+        for i in np.flatnonzero(~project_ok):
+            errors[i].append("unknown project")
+
+        valid = range_ok & user_ok & project_ok
+        overlapping = ShiftCSVService.overlaps(
+            db, user_ids[valid], start_at[valid], end_at[valid]
+        )
+        clashing = np.flatnonzero(valid)[overlapping]
+        for i in clashing:
+            errors[i].append("overlaps another shift of this user")
+        valid[clashing] = False
+
+        columns = {
+            "user_id": user_ids,
+            "project_id": project_ids,
+            "start_at": start_at,
+            "end_at": end_at,
+        }
+        return valid, errors, columns
+
+    @staticmethod
+    def overlaps(
+        db: Session, user_ids: np.ndarray, start_at: np.ndarray, end_at: np.ndarray
+    ) -> np.ndarray:
+        """Mask of new intervals overlapping each other or a stored shift of the same user
+
+        All intervals (new and stored) are keyed by user and start and
+        sorted once; an interval overlaps an earlier one when it starts
+        before the running maximum of earlier ends, and a later one when it
+        ends after the next interval starts.
+        """
+        count = len(user_ids)
+        if count == 0:
+            return np.zeros(0, dtype=bool)
+
+        codes: Dict[str, int] = {}
+        new_codes = np.fromiter(
+            (codes.setdefault(u, len(codes)) for u in user_ids), dtype=np.int64, count=count
+        )
+        stored = (
+            db.query(ScheduleInterval.user_id, ScheduleInterval.start_at, ScheduleInterval.end_at)
+            .filter(
+                ScheduleInterval.kind == "shift",
+                ScheduleInterval.user_id.in_(list(codes)),
+                ConflictService.overlap_condition(
+                    db, ScheduleInterval, start_at.min().item(), end_at.max().item()
+                ),
+            )
+            .all()
+        )
+        stored_codes = np.array([codes[u] for u, _, _ in stored], dtype=np.int64)
+        stored_start = np.array([s for _, s, _ in stored], dtype="datetime64[s]")
+        stored_end = np.array([e for _, _, e in stored], dtype="datetime64[s]")
+
+        user_codes = np.concatenate([new_codes, stored_codes])
+        offsets = user_codes * USER_SPAN
+        starts = offsets + (np.concatenate([start_at, stored_start]) - EPOCH).astype(np.int64)
+        ends = offsets + (np.concatenate([end_at, stored_end]) - EPOCH).astype(np.int64)
+
+        order = np.argsort(starts, kind="stable")
+        starts, ends = starts[order], ends[order]
+        previous_end = np.maximum.accumulate(ends)
+        hit = np.zeros(len(order), dtype=bool)
+        hit[1:] |= starts[1:] < previous_end[:-1]
+        hit[:-1] |= ends[:-1] > starts[1:]
+
+        overlapping = np.zeros(len(order), dtype=bool)
+        overlapping[order] = hit
+        return overlapping[:count]
+
+    @staticmethod
+    def copy_rows(db: Session, table: str, columns: Sequence[str], rows: List[Sequence[Any]]) -> None:
+        """COPY rows into a table over the session's connection (PostgreSQL)"""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        dbapi = db.get_bind().dialect.dbapi
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(sql, buffer)
+        except dbapi.IntegrityError as e:
+            raise IntegrityError(sql, None, e) from e
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def write_batch(
+        db: Session,
+        rows: List[Dict[str, str]],
+        valid: np.ndarray,
+        columns: Dict[str, np.ndarray],
+        created_by: str,
+    ) -> None:
+        """Insert the valid rows of a batch with their schedule intervals"""
+        indexes = np.flatnonzero(valid)
+        if len(indexes) == 0:
+            return
+        start_at = columns["start_at"][indexes].tolist()
+        end_at = columns["end_at"][indexes].tolist()
+        shifts, intervals = [], []
+        for i, start, end in zip(indexes, start_at, end_at):
+            shift_id = new_id()
+            user_id = columns["user_id"][i]
+            project_id = columns["project_id"][i]
+            shifts.append(
+                {
+                    "id": shift_id,
+                    "user_id": user_id,
+                    "project_id": project_id,
+                    "date": start.date(),
+                    "start_time": start.time(),
+                    "end_time": end.time(),
+                    "comment": (rows[i].get("comment") or "").strip() or None,
+                    "created_by": created_by,
+                }
+            )
+            intervals.append(
+                {
+                    "id": new_id(),
+                    "user_id": user_id,
+                    "project_id": project_id,
+                    "kind": "shift",
+                    "source_id": shift_id,
+                    "start_at": start,
+                    "end_at": end,
+                }
+            )
+
+        if ConflictService.is_postgres(db):
+            ShiftCSVService.copy_rows(
+                db,
+                ConfirmedShift.__tablename__,
+                SHIFT_COPY_COLUMNS,
+                [[shift[c] for c in SHIFT_COPY_COLUMNS] for shift in shifts],
+            )
+            ShiftCSVService.copy_rows(
+                db,
+                ScheduleInterval.__tablename__,
+                INTERVAL_COPY_COLUMNS,
+                [[interval[c] for c in INTERVAL_COPY_COLUMNS] for interval in intervals],
+            )
+        else:
+            db.execute(insert(ConfirmedShift), shifts)
+            db.execute(insert(ScheduleInterval), intervals)
+        WorkloadService.add_shifts(
+            db,
+            (
+                (shift["user_id"], shift["project_id"], shift["date"], shift["start_time"], shift["end_time"])
+                for shift in shifts
+            ),
+        )
+
+    @staticmethod
+    def import_csv(
+        db: Session, file: BinaryIO, created_by: str, dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """Import a CSV of confirmed shifts (blocking; run it off the event loop)
+
+        Columns: ``date``, ``start_time``, ``end_time``, ``user_id`` or
+        ``user_email``, ``project_id`` or ``project_name`` and an optional
+        ``comment``. Nothing is committed when a row is invalid or on a dry
+        run. Returns the report plus the change scopes of a committed import.
+        """
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        try:
+            reader = csv.DictReader(text)
+            header = set(reader.fieldnames or [])
+            missing = [c for c in REQUIRED_COLUMNS if c not in header]
+            if "user_id" not in header and "user_email" not in header:
+                missing.append("user_id or user_email")
+            if "project_id" not in header and "project_name" not in header:
+                missing.append("project_id or project_name")
+            if missing:
+                raise ShiftImportError(f"Missing column(s): {', '.join(missing)}")
+
+            users, projects = ShiftCSVService.lookups(db)
+            total = imported = error_count = 0
+            reported: List[Dict[str, Any]] = []
+            scopes: Set[str] = set()
+            batch: List[Dict[str, str]] = []
+            lines: List[int] = []
+
+            def flush() -> None:
+                nonlocal imported, error_count
+                valid, errors, columns = ShiftCSVService.validate_batch(db, batch, users, projects)
+                for i in sorted(errors):
+                    error_count += 1
+                    if len(reported) < MAX_REPORTED_ERRORS:
+                        reported.append({"line": lines[i], "errors": errors[i]})
+                ShiftCSVService.write_batch(db, batch, valid, columns, created_by)
+                imported += int(valid.sum())
+                scopes.update(user_scope(u) for u in set(columns["user_id"][valid]))
+                scopes.update(project_scope(p) for p in set(columns["project_id"][valid]))
+                scopes.update(
+                    month_scope(date.fromisoformat(m + "-01"))
+                    for m in np.unique(columns["start_at"][valid].astype("datetime64[M]").astype(str))
+                )
+
+            for row in reader:
+                total += 1
+                batch.append(row)
+                lines.append(reader.line_num)
+                if len(batch) >= settings.SHIFT_IMPORT_BATCH_SIZE:
+                    flush()
+                    batch, lines = [], []
+            if batch:
+                flush()
+        except UnicodeDecodeError:
+            db.rollback()
+            raise ShiftImportError("File must be UTF-8 encoded CSV")
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            # Leave the upload for the framework to close
+            text.detach()
+
+        if error_count or dry_run:
+            db.rollback()
+        else:
+            db.commit()
+        committed = not error_count and not dry_run
+        return {
+            "rows": total,
+            "imported": imported if committed else 0,
+            "error_count": error_count,
+            "errors": reported,
+            "dry_run": dry_run,
+            "scopes": sorted(scopes) if committed else [],
+        }
+
+    @staticmethod
+    def export_query(
+        start_date: Optional[date],
+        end_date: Optional[date],
+        project_id: Optional[str],
+        user_id: Optional[str],
+    ):
+        """Payroll rows ordered by day and start (same columns as EXPORT_COLUMNS)"""
+        hours = func.round(
+            cast(extract("epoch", ConfirmedShift.end_time - ConfirmedShift.start_time) / 3600, Numeric),
+            2,
+        )
+        query = (
+            select(
+                ConfirmedShift.id.label("shift_id"),
+                ConfirmedShift.date,
+                ConfirmedShift.start_time,
+                ConfirmedShift.end_time,
+                hours.label("hours"),
+                User.id.label("user_id"),
+                User.email.label("user_email"),
+                User.name.label("user_name"),
+                Project.id.label("project_id"),
+                Project.name.label("project_name"),
+                ConfirmedShift.comment,
+            )
+            .join(User, User.id == ConfirmedShift.user_id)
+            .join(Project, Project.id == ConfirmedShift.project_id)
+        )
+        if start_date:
+            query = query.where(ConfirmedShift.date >= start_date)
+        if end_date:
+            query = query.where(ConfirmedShift.date <= end_date)
+        if project_id:
+            query = query.where(ConfirmedShift.project_id == project_id)
+        if user_id:
+            query = query.where(ConfirmedShift.user_id == user_id)
+        return query.order_by(ConfirmedShift.date, ConfirmedShift.start_time, User.name)
+
+    @staticmethod
+    def copy_out(sessions: Callable[[], Session], sql: str) -> Iterator[str]:
+        """Stream ``COPY ... TO STDOUT`` (blocking; runs in the threadpool)
+
+        psycopg2 pushes rows into a file object, so COPY runs in its own
+        thread and hands chunks over through a bounded queue; a slow client
+        therefore pauses COPY instead of buffering the export.
+        """
+        chunks: queue.Queue = queue.Queue(maxsize=EXPORT_QUEUE_CHUNKS)
+        cancelled = threading.Event()
+        done = object()
+
+        def put(item: Any) -> None:
+            while not cancelled.is_set():
+                try:
+                    chunks.put(item, timeout=1)
+                    return
+                except queue.Full:
+                    continue
+            raise ExportCancelled()
+
+        class Writer:
+            def write(self, data: str) -> None:
+                put(data)
+
+        def produce() -> None:
+            db = sessions()
+            try:
+                cursor = db.connection().connection.cursor()
+                try:
+                    cursor.copy_expert(sql, Writer())
+                finally:
+                    cursor.close()
+                put(done)
+            except ExportCancelled:
+                pass
+            except Exception as e:
+                try:
+                    put(e)
+                except ExportCancelled:
+                    pass
+            finally:
+                db.close()
+
+        producer = threading.Thread(target=produce, name="shift-export", daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = chunks.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                parts = [item]
+                # Coalesce COPY's per-row writes into larger chunks
+                while len(parts) < EXPORT_ROWS_PER_CHUNK:
+                    try:
+                        item = chunks.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is done or isinstance(item, Exception):
+                        yield "".join(parts)
+                        if isinstance(item, Exception):
+                            raise item
+                        return
+                    parts.append(item)
+                yield "".join(parts)
+        finally:
+            cancelled.set()
+
+    @staticmethod
+    def export_csv(
+        sessions: Callable[[], Session],
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        project_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> Iterator[str]:
+        """The export in chunks (blocking; runs in the threadpool)"""
+        query = ShiftCSVService.export_query(start_date, end_date, project_id, user_id)
+
+        db = sessions()
+        try:
+            is_postgres = ConflictService.is_postgres(db)
+        finally:
+            db.close()
+        if is_postgres:
+            compiled = query.compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+            yield from ShiftCSVService.copy_out(
+                sessions, f"COPY ({compiled}) TO STDOUT WITH (FORMAT csv, HEADER)"
+            )
+            return
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(EXPORT_COLUMNS)
+        db = sessions()
+        try:
+            rows = db.execute(
+                query.with_only_columns(*query.selected_columns[:4], *query.selected_columns[5:]),
+                execution_options={"stream_results": True, "yield_per": EXPORT_ROWS_PER_CHUNK},
+            )
+            for count, row in enumerate(rows, 1):
+                shift_id, day, start, end, *rest = row
+                seconds = (
+                    (end.hour - start.hour) * 3600
+                    + (end.minute - start.minute) * 60
+                    + end.second
+                    - start.second
+                )
+                writer.writerow([shift_id, day, start, end, f"{seconds / 3600:.2f}", *rest])
+                if count % EXPORT_ROWS_PER_CHUNK == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+        finally:
+            db.close()
+        yield buffer.getvalue()
@@ -0,0 +1,177 @@
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.redis import get_redis
+from app.services.changes import ChangeFeed
+from app.services.google_tokens import RELEASE_SCRIPT
+
+FLIGHT_KEY_PREFIX = "sifut:flight"
+POLL_SECONDS = 0.02
+# How long a finished body stays readable for waiters in other workers
+RESULT_GRACE_MS = 5000
+
+
+class SingleFlight:
+    """Share one execution among identical concurrent reads
+
+    Requests for the same view (same normalized parameters, authorization
+    scope, change version and database) that overlap in a worker await the first
+    one's ``compute`` instead of running it again; with
+    SINGLE_FLIGHT_REDIS the first worker also takes a Redis lock, and the
+    other workers wait for the body it publishes. Nothing outlives the
+    flight beyond a short grace period for those waiters: every committed
+    change bumps the version (ChangeFeed), so a read issued after a write
+    always starts a new flight.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, asyncio.Future] = {}
+        self.stats = {"executed": 0, "shared": 0, "remote": 0}
+
+    @staticmethod
+    async def key(view: str, scope: str, params: Dict[str, Any], session: Optional[Session] = None) -> str:
+        """Flight key; ``session`` is the one ``compute`` reads from
+
+        Its database (primary or which replica) is part of the key, so a
+        read kept on the primary for read-your-writes never joins a flight
+        running on a lagging replica.
+        """
+        version = await ChangeFeed.current_version()
+        source = (
+            session.get_bind().url.render_as_string(hide_password=True)
+            if session is not None
+            else None
+        )
+        normalized = json.dumps(
+            {"view": view, "scope": scope, "params": params, "version": version, "source": source},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(normalized.encode()).hexdigest()
+
+    async def do(self, key: str, compute: Callable[[], bytes], session: Optional[Session] = None) -> bytes:
+        """Body of the view ``key``: ``compute`` runs (in a thread) at most once per flight
+
+        ``session``, the request's own, is closed before waiting and again
+        right after ``compute`` (which may use it) in its thread, so neither
+        waiting nor finished requests hold pooled connections while the
+        event loop is busy.
+        """
+        if session is not None:
+            session.close()
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            return await self._execute(compute, session)
+        while True:
+            flight = self._flights.get(key)
+            if flight is None:
+                break
+            try:
+                body = await asyncio.shield(flight)
+                self.stats["shared"] += 1
+                return body
+            except asyncio.CancelledError:
+                if not flight.cancelled():
+                    raise
+                # The request running it went away; take over
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        try:
+            if settings.SINGLE_FLIGHT_REDIS:
+                body = await self._across_workers(key, compute, session)
+            else:
+                body = await self._execute(compute, session)
+            flight.set_result(body)
+            return body
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            flight.exception()  # waiters re-raise it; none is fine too
+            raise
+        finally:
+            del self._flights[key]
+
+    async def _execute(self, compute: Callable[[], bytes], session: Optional[Session]) -> bytes:
+        def run() -> bytes:
+            try:
+                return compute()
+            finally:
+                if session is not None:
+                    session.close()
+
+        self.stats["executed"] += 1
+        return await asyncio.to_thread(run)
+
+    async def _across_workers(
+        self, key: str, compute: Callable[[], bytes], session: Optional[Session]
+    ) -> bytes:
+        lock_key, body_key = f"{FLIGHT_KEY_PREFIX}:{key}:lock", f"{FLIGHT_KEY_PREFIX}:{key}:body"
+        wait_ms = max(1, int(settings.SINGLE_FLIGHT_WAIT_SECONDS * 1000))
+        owner = uuid.uuid4().hex
+        try:
+            redis = get_redis()
+            leader = await redis.set(lock_key, owner, nx=True, px=wait_ms)
+        except Exception as e:
+            print(f"Single-flight running without Redis: {e}")
+            return await self._execute(compute, session)
+
+        if leader:
+            try:
+                body = await self._execute(compute, session)
+                if len(body) <= settings.SINGLE_FLIGHT_MAX_BYTES:
+                    await self._publish(body_key, body)
+            finally:
+                await self._unlock(lock_key, owner)
+            return body
+
+        body = await self._wait_remote(redis, lock_key, body_key)
+        if body is not None:
+            self.stats["remote"] += 1
+            return body
+        # The other worker failed, gave up or its body was too large
+        return await self._execute(compute, session)
+
+    @staticmethod
+    async def _publish(body_key: str, body: bytes) -> None:
+        try:
+            await get_redis().set(body_key, body.decode(), px=RESULT_GRACE_MS)
+        except Exception as e:
+            print(f"Error publishing single-flight result: {e}")
+
+    @staticmethod
+    async def _unlock(lock_key: str, owner: str) -> None:
+        # Only our own lock: past its TTL it may belong to the next leader
+        try:
+            await get_redis().eval(RELEASE_SCRIPT, 1, lock_key, owner)
+        except Exception as e:
+            print(f"Error releasing single-flight lock: {e}")
+
+    @staticmethod
+    async def _wait_remote(redis, lock_key: str, body_key: str) -> Optional[bytes]:
+        """Body published by the worker holding ``lock_key``, or None when it has none"""
+        deadline = time.monotonic() + settings.SINGLE_FLIGHT_WAIT_SECONDS
+        try:
+            while time.monotonic() < deadline:
+                body = await redis.get(body_key)
+                if body is not None:
+                    return body.encode()
+                if not await redis.exists(lock_key):
+                    # Finished between the two reads, or failed
+                    body = await redis.get(body_key)
+                    return body.encode() if body is not None else None
+                await asyncio.sleep(POLL_SECONDS)
+        except Exception as e:
+            print(f"Error waiting for single-flight result: {e}")
+        return None
+
+
+single_flight = SingleFlight()
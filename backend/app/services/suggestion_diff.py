@@ -0,0 +1,146 @@
+from collections import defaultdict
+from datetime import date, time
+from itertools import groupby
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.optimization import OptimizationAssignment
+
+# (user_id, date, start_time, end_time, project_id), the diff sort order
+Row = Tuple[str, date, time, time, str]
+
+
+def _hours(row: Row) -> float:
+    _, _, start, end, _ = row
+    return ((end.hour * 60 + end.minute) - (start.hour * 60 + start.minute)) / 60
+
+
+def _item(row: Row) -> Dict[str, Any]:
+    user_id, day, start, end, project_id = row
+    return {
+        "user_id": user_id,
+        "project_id": project_id,
+        "date": day,
+        "start_time": start,
+        "end_time": end,
+    }
+
+
+def _groups(rows: Iterable[Row]) -> Iterator[Tuple[Tuple[str, date], List[Row]]]:
+    for key, group in groupby(rows, key=lambda r: (r[0], r[1])):
+        yield key, list(group)
+
+
+class SuggestionDiffService:
+    """Compares the assignments of two optimization suggestions"""
+
+    @staticmethod
+    def load_rows(db: Session, suggestion_id: str) -> List[Row]:
+        """Assignments of a suggestion in diff order (served by the composite index)"""
+        return [
+            tuple(row)
+            for row in db.query(
+                OptimizationAssignment.user_id,
+                OptimizationAssignment.date,
+                OptimizationAssignment.start_time,
+                OptimizationAssignment.end_time,
+                OptimizationAssignment.project_id,
+            )
+            .filter(OptimizationAssignment.suggestion_id == suggestion_id)
+            .order_by(
+                OptimizationAssignment.user_id,
+                OptimizationAssignment.date,
+                OptimizationAssignment.start_time,
+                OptimizationAssignment.end_time,
+                OptimizationAssignment.project_id,
+            )
+        ]
+
+    @staticmethod
+    def diff_rows(rows_a: List[Row], rows_b: List[Row]) -> Dict[str, Any]:
+        """Sorted-merge diff of two row lists ordered by (user_id, date, ...)
+
+        Within one (user, date) group, identical rows are unchanged; a row
+        left over on both sides is paired as ``moved`` (project or time
+        changed, same-time pairs first); the rest are ``removed`` (only in
+        ``a``) or ``added`` (only in ``b``).
+        """
+        added: List[Dict[str, Any]] = []
+        removed: List[Dict[str, Any]] = []
+        moved: List[Dict[str, Any]] = []
+        unchanged = 0
+        hours_a: Dict[str, float] = defaultdict(float)
+        hours_b: Dict[str, float] = defaultdict(float)
+        changed_users = set()
+
+        groups_a, groups_b = _groups(rows_a), _groups(rows_b)
+        head_a, head_b = next(groups_a, None), next(groups_b, None)
+        while head_a is not None or head_b is not None:
+            if head_b is None or (head_a is not None and head_a[0] < head_b[0]):
+                key, left, right = head_a[0], head_a[1], []
+                head_a = next(groups_a, None)
+            elif head_a is None or head_b[0] < head_a[0]:
+                key, left, right = head_b[0], [], head_b[1]
+                head_b = next(groups_b, None)
+            else:
+                key, left, right = head_a[0], head_a[1], head_b[1]
+                head_a, head_b = next(groups_a, None), next(groups_b, None)
+
+            for row in left:
+                hours_a[key[0]] += _hours(row)
+            for row in right:
+                hours_b[key[0]] += _hours(row)
+
+            if left == right:
+                unchanged += len(left)
+                continue
+
+            # Groups are tiny (a member's assignments on one day)
+            only_left = list(left)
+            only_right = []
+            for row in right:
+                if row in only_left:
+                    only_left.remove(row)
+                    unchanged += 1
+                else:
+                    only_right.append(row)
+            if not only_left and not only_right:
+                continue
+            changed_users.add(key[0])
+
+            for row in list(only_left):
+                match = next((r for r in only_right if r[2:4] == row[2:4]), None)
+                if match is not None:
+                    moved.append({"before": _item(row), "after": _item(match)})
+                    only_left.remove(row)
+                    only_right.remove(match)
+            for before, after in zip(only_left, only_right):
+                moved.append({"before": _item(before), "after": _item(after)})
+            removed.extend(_item(row) for row in only_left[len(only_right):])
+            added.extend(_item(row) for row in only_right[len(only_left):])
+
+        members = [
+            {
+                "user_id": user_id,
+                "hours_a": round(hours_a.get(user_id, 0.0), 2),
+                "hours_b": round(hours_b.get(user_id, 0.0), 2),
+                "delta_hours": round(hours_b.get(user_id, 0.0) - hours_a.get(user_id, 0.0), 2),
+            }
+            for user_id in sorted(changed_users)
+        ]
+
+        return {
+            "added": added,
+            "removed": removed,
+            "moved": moved,
+            "unchanged": unchanged,
+            "members": members,
+        }
+
+    @staticmethod
+    def diff(db: Session, suggestion_a: str, suggestion_b: str) -> Dict[str, Any]:
+        return SuggestionDiffService.diff_rows(
+            SuggestionDiffService.load_rows(db, suggestion_a),
+            SuggestionDiffService.load_rows(db, suggestion_b),
+        )
@@ -0,0 +1,204 @@
+from collections import defaultdict
+from datetime import date, time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Integer, cast, delete, extract, func, insert, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.shift import ConfirmedShift
+from app.models.workload import MonthlyWorkload
+
+# (user_id, project_id, date, start_time, end_time)
+ShiftRow = Tuple[str, str, date, time, time]
+
+REBUILD_CHUNK = 5000
+
+
+def shift_minutes(start: time, end: time) -> int:
+    return (end.hour * 60 + end.minute) - (start.hour * 60 + start.minute)
+
+
+def month_bounds(month: str) -> Tuple[date, date]:
+    """First day of ``month`` (YYYY-MM) and of the month after"""
+    year, number = map(int, month.split("-"))
+    return date(year, number, 1), date(year + number // 12, number % 12 + 1, 1)
+
+
+class WorkloadService:
+    """monthly_workloads: shift count and minutes per user, project and month
+
+    Every write path of confirmed_shifts applies its delta here in the same
+    transaction (an atomic upsert-increment), so dashboards read a row per
+    member and project instead of aggregating the shift history. ``rebuild``
+    recomputes the table from confirmed_shifts for backfills.
+    """
+
+    @staticmethod
+    def _upsert(db: Session):
+        """INSERT ... ON CONFLICT statement, or None if the dialect has none"""
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return postgresql.insert(MonthlyWorkload)
+        if dialect == "sqlite":
+            return sqlite.insert(MonthlyWorkload)
+        return None
+
+    @staticmethod
+    def _increment(db: Session, rows: List[Dict]) -> None:
+        """Generic fallback of the upsert: select each summary row, then update or insert it"""
+        for row in rows:
+            key = (
+                MonthlyWorkload.user_id == row["user_id"],
+                MonthlyWorkload.project_id == row["project_id"],
+                MonthlyWorkload.month == row["month"],
+            )
+            existing = db.execute(
+                select(MonthlyWorkload.month).where(*key).with_for_update()
+            ).first()
+            if existing is None:
+                db.execute(insert(MonthlyWorkload), [row])
+                continue
+            # Incremented in SQL, not from the selected values
+            db.execute(
+                update(MonthlyWorkload)
+                .where(*key)
+                .values(
+                    shift_count=MonthlyWorkload.shift_count + row["shift_count"],
+                    total_minutes=MonthlyWorkload.total_minutes + row["total_minutes"],
+                    updated_at=func.now(),
+                )
+            )
+
+    @staticmethod
+    def apply(db: Session, shifts: Iterable[ShiftRow], sign: int = 1) -> None:
+        """Add (sign=1) or subtract (sign=-1) shifts from the summary"""
+        deltas: Dict[Tuple[str, str, str], List[int]] = defaultdict(lambda: [0, 0])
+        for user_id, project_id, day, start, end in shifts:
+            delta = deltas[(user_id, project_id, f"{day:%Y-%m}")]
+            delta[0] += sign
+            delta[1] += sign * shift_minutes(start, end)
+        if not deltas:
+            return
+
+        # Sorted so concurrent writers lock summary rows in the same order
+        rows = [
+            {
+                "user_id": user_id,
+                "project_id": project_id,
+                "month": month,
+                "shift_count": count,
+                "total_minutes": minutes,
+            }
+            for (user_id, project_id, month), (count, minutes) in sorted(deltas.items())
+        ]
+        stmt = WorkloadService._upsert(db)
+        if stmt is None:
+            WorkloadService._increment(db, rows)
+        else:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_id", "project_id", "month"],
+                set_={
+                    "shift_count": MonthlyWorkload.shift_count + stmt.excluded.shift_count,
+                    "total_minutes": MonthlyWorkload.total_minutes + stmt.excluded.total_minutes,
+                    "updated_at": func.now(),
+                },
+            )
+            db.execute(stmt, rows)
+
+        if sign < 0:
+            db.query(MonthlyWorkload).filter(
+                MonthlyWorkload.user_id.in_({key[0] for key in deltas}),
+                MonthlyWorkload.month.in_({key[2] for key in deltas}),
+                MonthlyWorkload.shift_count <= 0,
+            ).delete(synchronize_session=False)
+
+    @staticmethod
+    def add_shifts(db: Session, shifts: Iterable[ShiftRow]) -> None:
+        WorkloadService.apply(db, shifts, 1)
+
+    @staticmethod
+    def remove_shifts(db: Session, shifts: Iterable[ShiftRow]) -> None:
+        WorkloadService.apply(db, shifts, -1)
+
+    @staticmethod
+    def row(shift) -> ShiftRow:
+        """ShiftRow of a ConfirmedShift"""
+        return (shift.user_id, shift.project_id, shift.date, shift.start_time, shift.end_time)
+
+    @staticmethod
+    def rebuild(db: Session, month: Optional[str] = None) -> int:
+        """Recompute the summary (of one month, or all) from confirmed_shifts
+
+        Does not commit. On PostgreSQL the table is locked against writers
+        first, so shifts committed meanwhile are neither lost nor counted
+        twice. Returns the number of summary rows written.
+        """
+        is_postgres = db.get_bind().dialect.name == "postgresql"
+        if is_postgres:
+            db.execute(text("LOCK TABLE monthly_workloads IN EXCLUSIVE MODE"))
+
+        filters = []
+        clear = delete(MonthlyWorkload)
+        if month:
+            first, following = month_bounds(month)
+            filters = [ConfirmedShift.date >= first, ConfirmedShift.date < following]
+            clear = clear.where(MonthlyWorkload.month == month)
+        db.execute(clear)
+
+        if is_postgres:
+            def minute_of_day(column):
+                return extract("hour", column) * 60 + extract("minute", column)
+
+            summary_month = func.to_char(ConfirmedShift.date, "YYYY-MM")
+            summary = (
+                select(
+                    ConfirmedShift.user_id,
+                    ConfirmedShift.project_id,
+                    summary_month,
+                    func.count(),
+                    cast(
+                        func.sum(
+                            minute_of_day(ConfirmedShift.end_time)
+                            - minute_of_day(ConfirmedShift.start_time)
+                        ),
+                        Integer,
+                    ),
+                )
+                .where(*filters)
+                .group_by(ConfirmedShift.user_id, ConfirmedShift.project_id, summary_month)
+            )
+            result = db.execute(
+                insert(MonthlyWorkload).from_select(
+                    ["user_id", "project_id", "month", "shift_count", "total_minutes"], summary
+                )
+            )
+            return result.rowcount
+
+        # Other backends: one streamed pass, grouped in memory
+        totals: Dict[Tuple[str, str, str], List[int]] = defaultdict(lambda: [0, 0])
+        shifts = select(
+            ConfirmedShift.user_id,
+            ConfirmedShift.project_id,
+            ConfirmedShift.date,
+            ConfirmedShift.start_time,
+            ConfirmedShift.end_time,
+        ).where(*filters)
+        rows = db.execute(shifts, execution_options={"stream_results": True, "yield_per": REBUILD_CHUNK})
+        for user_id, project_id, day, start, end in rows:
+            total = totals[(user_id, project_id, f"{day:%Y-%m}")]
+            total[0] += 1
+            total[1] += shift_minutes(start, end)
+        summary_rows = [
+            {
+                "user_id": user_id,
+                "project_id": project_id,
+                "month": key_month,
+                "shift_count": count,
+                "total_minutes": minutes,
+            }
+            for (user_id, project_id, key_month), (count, minutes) in totals.items()
+        ]
+        for i in range(0, len(summary_rows), REBUILD_CHUNK):
+            db.execute(insert(MonthlyWorkload), summary_rows[i : i + REBUILD_CHUNK])
+        return len(summary_rows)
@@ -0,0 +1,275 @@
+"""Calendar outbox worker
+
+Drains calendar_outbox: claims due rows, coalesces writes to the same event,
+sends each user's operations as Google Calendar batch requests, and records
+outcomes with exponential-backoff retries. Calls are paced by the shared
+Google quota scheduler in the bulk lane, so interactive requests keep
+their share of the quota.
+
+Usage (from backend/):
+    python -m app.workers.calendar_outbox          # run forever
+    python -m app.workers.calendar_outbox --once   # drain one batch and exit
+"""
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import argparse
+import asyncio
+
+from googleapiclient.errors import HttpError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.meeting import Meeting, MeetingParticipant
+from app.models.outbox import CalendarOutbox
+from app.models.project import Project
+from app.models.shift import ConfirmedShift
+from app.models.user import User
+from app.db.redis import close_redis
+from app.services.calendar_outbox import CalendarOutboxService, GOOGLE_BATCH_LIMIT
+from app.services.feeds import FeedService
+from app.services.google_calendar import GoogleCalendarService
+from app.services.google_quota import GoogleQuotaScheduler, google_quota
+from app.services.google_tokens import token_manager
+
+# (Google API request, callback applied to the API response on success)
+PreparedRequest = Tuple[object, Callable[[Optional[Dict]], Optional[Dict]]]
+
+
+class CalendarOutboxWorker:
+    """Outbox drain loop"""
+
+    def __init__(self, batch_size: int, poll_seconds: float):
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        # Meetings that got a Meet link; their iCalendar feeds are refreshed after commit
+        self.meet_link_meetings: Set[str] = set()
+
+    async def run_forever(self) -> None:
+        while True:
+            processed = await self.run_once()
+            if processed < self.batch_size:
+                await asyncio.sleep(self.poll_seconds)
+
+    async def run_once(self) -> int:
+        """Process one batch; returns the number of claimed rows"""
+        db = SessionLocal()
+        try:
+            rows = CalendarOutboxService.claim_batch(db, self.batch_size)
+            if not rows:
+                return 0
+
+            effective, superseded = CalendarOutboxService.coalesce(rows)
+            for row in superseded:
+                row.status = "cancelled"
+                row.result = {"coalesced": True}
+                row.completed_at = datetime.utcnow()
+
+            for user_id, user_rows in CalendarOutboxService.group_by_user(effective).items():
+                await self.process_user(db, user_id, user_rows)
+                db.commit()
+                await FeedService.touch_meetings(db, self.meet_link_meetings)
+                self.meet_link_meetings.clear()
+
+            return len(rows)
+        finally:
+            db.close()
+
+    async def process_user(self, db: Session, user_id: str, rows: List[CalendarOutbox]) -> None:
+        """Send one user's operations as batched Calendar API calls"""
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user or not user.google_refresh_token:
+            for row in rows:
+                CalendarOutboxService.mark_failed(
+                    row, "Google Calendar not connected", retryable=False
+                )
+            return
+
+        access_token = await token_manager.get_access_token(user)
+        if not access_token:
+            for row in rows:
+                CalendarOutboxService.mark_failed(row, "Google token refresh failed")
+            return
+
+        service = GoogleCalendarService.get_calendar_service(
+            access_token, user.google_refresh_token
+        )
+        quota_user = GoogleQuotaScheduler.user_key(user.google_refresh_token)
+        # Each request inside a batch counts against the quota separately
+        chunk_size = min(GOOGLE_BATCH_LIMIT, google_quota.max_cost("bulk"))
+
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            prepared: Dict[str, Tuple[CalendarOutbox, Callable]] = {}
+            rate_limited: List[Exception] = []
+            batch = service.new_batch_http_request()
+
+            for row in chunk:
+                try:
+                    request = self.prepare(db, service, row)
+                except Exception as e:
+                    CalendarOutboxService.mark_failed(row, f"Prepare failed: {e}", retryable=False)
+                    continue
+                if request is None:
+                    continue
+                api_request, on_success = request
+                prepared[row.id] = (row, on_success)
+                batch.add(
+                    api_request,
+                    request_id=row.id,
+                    callback=self._callback(prepared, rate_limited),
+                )
+
+            if not prepared:
+                continue
+
+            await google_quota.acquire(quota_user, cost=len(prepared), priority="bulk")
+            try:
+                # Blocking HTTP call; the callbacks run in the worker thread while
+                # this coroutine waits, so the session is never used concurrently
+                await asyncio.to_thread(batch.execute)
+            except Exception as e:
+                # Transport-level failure: nothing in the batch is known to have applied
+                for row, _ in prepared.values():
+                    if row.status == "processing":
+                        CalendarOutboxService.mark_failed(row, f"Batch failed: {e}")
+                rate_limited.append(e)
+
+            if rate_limited:
+                # Pause this user's (or the project's) calls in every process
+                await google_quota.note_error(
+                    quota_user, rate_limited[0], attempt=max(r.attempts for r in chunk)
+                )
+
+    @staticmethod
+    def _callback(prepared: Dict[str, Tuple[CalendarOutbox, Callable]], rate_limited: List):
+        def callback(request_id, response, exception):
+            row, on_success = prepared[request_id]
+            if exception is None:
+                CalendarOutboxService.mark_done(row, on_success(response))
+                return
+
+            status_code = (
+                int(exception.resp.status) if isinstance(exception, HttpError) else None
+            )
+            if row.operation == "delete" and status_code in (404, 410):
+                # Already gone
+                CalendarOutboxService.mark_done(row, on_success(None))
+                return
+            retryable, is_rate_limit, _ = GoogleQuotaScheduler.classify(exception)
+            if is_rate_limit:
+                rate_limited.append(exception)
+            CalendarOutboxService.mark_failed(row, str(exception), retryable=retryable)
+
+        return callback
+
+    def prepare(self, db: Session, service, row: CalendarOutbox) -> Optional[PreparedRequest]:
+        """Build the API request for a row from the entity's current state
+
+        Returns None if the row needs no API call (it is marked accordingly).
+        """
+        if row.entity_type == "shift":
+            entity = db.query(ConfirmedShift).filter(ConfirmedShift.id == row.entity_id).first()
+        elif row.entity_type == "meeting":
+            entity = db.query(Meeting).filter(Meeting.id == row.entity_id).first()
+        else:
+            CalendarOutboxService.mark_failed(
+                row, f"Unknown entity type: {row.entity_type}", retryable=False
+            )
+            return None
+
+        events = service.events()
+
+        if row.operation == "delete":
+            event_id = row.calendar_event_id or (entity.calendar_event_id if entity else None)
+            if not event_id:
+                CalendarOutboxService.mark_done(row, {"skipped": "no event"})
+                return None
+
+            def on_deleted(response):
+                if entity is not None and entity.calendar_event_id == event_id:
+                    entity.calendar_event_id = None
+                return {"deleted_event_id": event_id}
+
+            return events.delete(calendarId="primary", eventId=event_id), on_deleted
+
+        if entity is None:
+            row.status = "cancelled"
+            row.result = {"skipped": "entity deleted"}
+            row.completed_at = datetime.utcnow()
+            return None
+
+        if row.entity_type == "shift":
+            project = db.query(Project).filter(Project.id == entity.project_id).first()
+            body = GoogleCalendarService.build_event_body(
+                title=f"シフト: {project.name if project else 'プロジェクト'}",
+                description=entity.comment or "",
+                start_datetime=datetime.combine(entity.date, entity.start_time),
+                end_datetime=datetime.combine(entity.date, entity.end_time),
+            )
+            create_meet_link = False
+        else:
+            emails = [
+                email
+                for (email,) in db.query(User.email)
+                .join(MeetingParticipant, MeetingParticipant.user_id == User.id)
+                .filter(MeetingParticipant.meeting_id == entity.id)
+                .all()
+            ]
+            create_meet_link = not entity.calendar_event_id
+            body = GoogleCalendarService.build_event_body(
+                title=entity.title,
+                description=entity.description or "",
+                start_datetime=entity.start_datetime,
+                end_datetime=entity.end_datetime,
+                attendees=emails,
+                create_meet_link=create_meet_link,
+            )
+
+        if entity.calendar_event_id:
+            request = events.patch(
+                calendarId="primary", eventId=entity.calendar_event_id, body=body
+            )
+        else:
+            request = events.insert(
+                calendarId="primary",
+                body=body,
+                conferenceDataVersion=1 if create_meet_link else 0,
+            )
+
+        def on_upserted(response):
+            entity.calendar_event_id = response["id"]
+            result = {"event_id": response["id"], "html_link": response.get("htmlLink")}
+            if row.entity_type == "meeting":
+                meet_link = GoogleCalendarService.extract_meet_link(response)
+                if meet_link and meet_link != entity.meet_link:
+                    entity.meet_link = meet_link
+                    self.meet_link_meetings.add(entity.id)
+                result["meet_link"] = entity.meet_link
+            return result
+
+        return request, on_upserted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drain the Google Calendar outbox")
+    parser.add_argument("--once", action="store_true", help="Process one batch and exit")
+    parser.add_argument("--batch-size", type=int, default=settings.CALENDAR_OUTBOX_BATCH_SIZE)
+    parser.add_argument("--poll-seconds", type=float, default=settings.CALENDAR_OUTBOX_POLL_SECONDS)
+    args = parser.parse_args()
+
+    asyncio.run(run(CalendarOutboxWorker(args.batch_size, args.poll_seconds), args.once))
+
+
+async def run(worker: CalendarOutboxWorker, once: bool) -> None:
+    try:
+        if once:
+            print(f"Processed {await worker.run_once()} outbox row(s)")
+        else:
+            await worker.run_forever()
+    finally:
+        await close_redis()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Convert varchar(36) ids to native uuid columns (PostgreSQL)
+
+Databases created before the models switched to GUID columns store every
+id and foreign key as varchar(36). This converts all GUID columns of the
+models in place, in one transaction: foreign keys touching them are
+dropped, each table is rewritten once with ``ALTER COLUMN ... TYPE uuid
+USING col::uuid`` (PostgreSQL rebuilds the indexes and the GiST exclusion
+constraint on the new type), and the foreign keys are recreated. Existing
+ids keep their values; new rows get time-ordered UUIDv7 ids. Columns that
+are already uuid are skipped, so the command can be re-run.
+
+SQLite databases (local benchmarks) are throwaway; recreate them instead.
+
+Usage (from backend/):
+    python -m app.workers.migrate_uuid_keys --dry-run   # print the statements
+    python -m app.workers.migrate_uuid_keys
+"""
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+import argparse
+import time
+
+from sqlalchemy import inspect, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Connection
+
+import app.models  # noqa: F401  (register every table on Base.metadata)
+from app.db.database import Base, engine
+from app.db.types import GUID
+
+UUID_PATTERN = "^[0-9a-fA-F]{8}-?([0-9a-fA-F]{4}-?){3}[0-9a-fA-F]{12}$"
+
+INDEX_SIZES_SQL = text(
+    "SELECT t.relname, SUM(pg_relation_size(i.indexrelid)) "
+    "FROM pg_index i JOIN pg_class t ON t.oid = i.indrelid "
+    "WHERE t.relname = ANY(:tables) GROUP BY t.relname"
+)
+
+
+def guid_columns() -> List[Tuple[str, str]]:
+    return [
+        (table.name, column.name)
+        for table in Base.metadata.sorted_tables
+        for column in table.columns
+        if isinstance(column.type, GUID)
+    ]
+
+
+def pending_columns(conn: Connection) -> List[Tuple[str, str]]:
+    """GUID columns still stored as text"""
+    inspector = inspect(conn)
+    pending = []
+    types: Dict[str, Dict[str, object]] = {}
+    for table, column in guid_columns():
+        if table not in types:
+            types[table] = (
+                {c["name"]: c["type"] for c in inspector.get_columns(table)}
+                if inspector.has_table(table)
+                else {}
+            )
+        current = types[table].get(column)
+        if current is not None and not isinstance(current, postgresql.UUID):
+            pending.append((table, column))
+    return pending
+
+
+def index_sizes(conn: Connection, tables: List[str]) -> Dict[str, int]:
+    return {name: int(size) for name, size in conn.execute(INDEX_SIZES_SQL, {"tables": tables})}
+
+
+def plan(conn: Connection, pending: List[Tuple[str, str]]) -> List[str]:
+    """DDL converting ``pending`` (drop FKs, alter each table once, recreate FKs)"""
+    quote = conn.dialect.identifier_preparer.quote
+    inspector = inspect(conn)
+    converting: Set[Tuple[str, str]] = set(pending)
+    tables = sorted({table for table, _ in pending} | {t.name for t in Base.metadata.sorted_tables})
+
+    drops, creates = [], []
+    for table in tables:
+        if not inspector.has_table(table):
+            continue
+        for fk in inspector.get_foreign_keys(table):
+            touched = any((table, c) in converting for c in fk["constrained_columns"]) or any(
+                (fk["referred_table"], c) in converting for c in fk["referred_columns"]
+            )
+            if not touched:
+                continue
+            drops.append(f"ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(fk['name'])}")
+            ondelete = fk.get("options", {}).get("ondelete")
+            creates.append(
+                f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(fk['name'])} "
+                f"FOREIGN KEY ({', '.join(quote(c) for c in fk['constrained_columns'])}) "
+                f"REFERENCES {quote(fk['referred_table'])} "
+                f"({', '.join(quote(c) for c in fk['referred_columns'])})"
+                + (f" ON DELETE {ondelete}" if ondelete else "")
+            )
+
+    by_table: Dict[str, List[str]] = defaultdict(list)
+    for table, column in pending:
+        by_table[table].append(column)
+    alters = [
+        f"ALTER TABLE {quote(table)} "
+        + ", ".join(
+            f"ALTER COLUMN {quote(column)} TYPE uuid USING {quote(column)}::uuid" for column in columns
+        )
+        for table, columns in by_table.items()
+    ]
+    return drops + alters + creates
+
+
+def invalid_ids(conn: Connection, pending: List[Tuple[str, str]]) -> List[str]:
+    """Columns holding values that cannot be cast to uuid"""
+    quote = conn.dialect.identifier_preparer.quote
+    problems = []
+    for table, column in pending:
+        count = conn.execute(
+            text(
+                f"SELECT COUNT(*) FROM {quote(table)} "
+                f"WHERE {quote(column)} IS NOT NULL AND {quote(column)} !~ :pattern"
+            ),
+            {"pattern": UUID_PATTERN},
+        ).scalar()
+        if count:
+            problems.append(f"{table}.{column}: {count} non-UUID value(s)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert varchar(36) ids to native uuid (PostgreSQL)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the statements without running them")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print(f"Nothing to migrate on {engine.dialect.name}: recreate the database instead")
+        return
+
+    with engine.begin() as conn:
+        pending = pending_columns(conn)
+        if not pending:
+            print("All id columns are already uuid")
+            return
+
+        problems = invalid_ids(conn, pending)
+        if problems:
+            print("Cannot convert; fix these values first:")
+            for problem in problems:
+                print(f"  {problem}")
+            raise SystemExit(1)
+
+        statements = plan(conn, pending)
+        if args.dry_run:
+            for statement in statements:
+                print(f"{statement};")
+            return
+
+        tables = sorted({table for table, _ in pending})
+        before = index_sizes(conn, tables)
+        started = time.perf_counter()
+        for statement in statements:
+            conn.execute(text(statement))
+        for table in tables:
+            conn.execute(text(f"ANALYZE {conn.dialect.identifier_preparer.quote(table)}"))
+        after = index_sizes(conn, tables)
+
+    print(f"Converted {len(pending)} column(s) in {len(tables)} table(s) in {time.perf_counter() - started:.1f}s")
+    print(f"  {'table':<28} {'indexes before':>15} {'after':>12}")
+    for table in tables:
+        print(f"  {table:<28} {before.get(table, 0) / 2**20:12.1f} MiB {after.get(table, 0) / 2**20:8.1f} MiB")
+    print(
+        f"  {'total':<28} {sum(before.values()) / 2**20:12.1f} MiB "
+        f"{sum(after.values()) / 2**20:8.1f} MiB"
+    )
+
+
+if __name__ == "__main__":
+    main()
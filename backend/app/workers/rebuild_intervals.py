@@ -0,0 +1,86 @@
+"""Rebuild schedule_intervals from confirmed shifts and meetings
+
+Every write through the API mirrors confirmed shifts and non-declined
+meeting participations into schedule_intervals; run this once to backfill
+the table for existing data, or after changing shifts or meetings outside
+the API. The table is rebuilt in one transaction.
+
+On PostgreSQL the exclusion constraint rejects overlapping shifts of a
+user, so existing data has to be free of them: ``--check`` lists them
+without changing anything. Resolve them before ``alembic upgrade head``
+adds the constraint (the upgrade fails otherwise) and before rebuilding.
+
+Usage (from backend/):
+    python -m app.workers.rebuild_intervals --check   # list overlapping shifts
+    python -m app.workers.rebuild_intervals
+"""
+from typing import List, Tuple
+import argparse
+import sys
+import time
+
+from sqlalchemy.exc import IntegrityError
+
+from app.db.database import SessionLocal
+from app.models.shift import ConfirmedShift
+from app.services.conflicts import ConflictService
+
+
+def overlapping_shifts(db) -> List[Tuple[str, str, str, str]]:
+    """(shift id, overlapping shift id, user id, date) for every overlapping pair"""
+    rows = (
+        db.query(
+            ConfirmedShift.id,
+            ConfirmedShift.user_id,
+            ConfirmedShift.date,
+            ConfirmedShift.start_time,
+            ConfirmedShift.end_time,
+        )
+        .order_by(ConfirmedShift.user_id, ConfirmedShift.date, ConfirmedShift.start_time)
+        .yield_per(1000)
+    )
+    pairs = []
+    day, active = None, []
+    for shift_id, user_id, date, start, end in rows:
+        if (user_id, date) != day:
+            day, active = (user_id, date), []
+        active = [other for other in active if other[1] > start]
+        pairs.extend((other_id, shift_id, user_id, date.isoformat()) for other_id, _ in active)
+        active.append((shift_id, end))
+    return pairs
+
+
+def print_overlaps(pairs) -> None:
+    for first, second, user_id, date in pairs:
+        print(f"{date} user {user_id}: shift {first} overlaps {second}")
+    print(f"{len(pairs)} overlapping pair(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild schedule_intervals")
+    parser.add_argument("--check", action="store_true", help="Only list overlapping confirmed shifts")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.check:
+            pairs = overlapping_shifts(db)
+            print_overlaps(pairs)
+            sys.exit(1 if pairs else 0)
+
+        started = time.perf_counter()
+        try:
+            count = ConflictService.rebuild(db)
+        except IntegrityError:
+            # Rejected by the exclusion constraint
+            db.rollback()
+            print("Overlapping shifts; nothing was changed")
+            print_overlaps(overlapping_shifts(db))
+            sys.exit(1)
+        print(f"Rebuilt {count} interval(s) in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
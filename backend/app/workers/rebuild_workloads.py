@@ -0,0 +1,53 @@
+"""Rebuild monthly_workloads from confirmed_shifts
+
+The summary is maintained incrementally by every write of confirmed
+shifts; run this once to backfill it, or after changing shifts outside the
+API. Each month is rebuilt in its own transaction.
+
+Usage (from backend/):
+    python -m app.workers.rebuild_workloads                   # every month with shifts
+    python -m app.workers.rebuild_workloads --month 2025-12   # one month
+"""
+import argparse
+import time
+
+from sqlalchemy import func
+
+from app.db.database import SessionLocal
+from app.models.shift import ConfirmedShift
+from app.models.workload import MonthlyWorkload
+from app.services.workload import WorkloadService
+
+
+def months_to_rebuild(db) -> list:
+    """Months with shifts or with summary rows (stale rows are cleared too)"""
+    first, last = db.query(func.min(ConfirmedShift.date), func.max(ConfirmedShift.date)).one()
+    months = {month for (month,) in db.query(MonthlyWorkload.month).distinct()}
+    if first is not None:
+        total = first.year * 12 + first.month - 1
+        while total <= last.year * 12 + last.month - 1:
+            months.add(f"{total // 12:04d}-{total % 12 + 1:02d}")
+            total += 1
+    return sorted(months)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild monthly_workloads from confirmed_shifts")
+    parser.add_argument("--month", action="append", help="YYYY-MM (repeatable; default: all)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        months = args.month or months_to_rebuild(db)
+        started = time.perf_counter()
+        for month in months:
+            rows = WorkloadService.rebuild(db, month)
+            db.commit()
+            print(f"{month}: {rows} summary row(s)")
+        print(f"Rebuilt {len(months)} month(s) in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark cheap-request latency during a spike of expensive requests
+
+Builds a synthetic organization, promotes ``--admins`` members to admin and
+measures members' month views (``GET /shifts/confirmed``) three times:
+alone, while the admins hammer ``POST /optimization/shifts`` (stub LLM)
+with admission control off, and the same with it on. Reports month-view
+latency and the status codes the optimization requests got.
+
+Usage (from backend/):
+    python -m benchmarks.bench_admission --fake-redis
+    python -m benchmarks.bench_admission --fake-redis --admins 8 --spike-concurrency 24 --llm-latency 1.0
+"""
+from typing import Any, Dict
+import argparse
+import asyncio
+import random
+
+from benchmarks import load, synthetic
+
+
+async def run(args: argparse.Namespace, org: synthetic.Organization, admins) -> Dict[str, Any]:
+    import httpx
+
+    from app.core.config import settings
+    from app.core.security import create_access_token
+    from app.main import create_app
+
+    prefix = settings.API_V1_PREFIX
+    rng = random.Random(args.seed)
+    members = {
+        user_id: {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"}
+        for user_id in org.member_ids
+    }
+    admin_headers = [
+        {"Authorization": f"Bearer {create_access_token({'sub': user_id})}"} for user_id in admins
+    ]
+    months = org.history_months + org.open_months
+
+    transport = httpx.ASGITransport(app=create_app())
+    report = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        async def month_view(i: int):
+            user_id = rng.choice(org.member_ids)
+            response = await client.get(
+                f"{prefix}/shifts/confirmed",
+                params=load.month_range(rng.choice(months)),
+                headers=members[user_id],
+            )
+            return [response.status_code]
+
+        async def spike(done: asyncio.Event, statuses: Dict[int, int]) -> None:
+            async def client_loop(n: int) -> None:
+                while not done.is_set():
+                    response = await client.post(
+                        f"{prefix}/optimization/shifts",
+                        json={"month": org.open_months[n % len(org.open_months)]},
+                        headers=admin_headers[n % len(admin_headers)],
+                    )
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                    if response.status_code in (429, 503):
+                        # Well-behaved clients back off, but not for the whole Retry-After
+                        await asyncio.sleep(min(1.0, float(response.headers.get("retry-after", 1))))
+
+            await asyncio.gather(*(client_loop(n) for n in range(args.spike_concurrency)))
+
+        phases = [("alone", None), ("spike_unlimited", False), ("spike_admission", True)]
+        for name, enabled in phases:
+            statuses: Dict[int, int] = {}
+            done = asyncio.Event()
+            spiking = None
+            if enabled is not None:
+                settings.ADMISSION_CONTROL_ENABLED = enabled
+                spiking = asyncio.create_task(spike(done, statuses))
+                await asyncio.sleep(args.llm_latency / 2)  # let the spike take its connections
+            result = await load.run_scenario(month_view, args.iterations, args.concurrency)
+            done.set()
+            if spiking is not None:
+                await spiking
+            result["optimize_statuses"] = statuses
+            report[name] = result
+            load.print_row(name, result)
+            if statuses:
+                print(f"  {'':<16}  optimize {', '.join(f'{c}x{n}' for c, n in sorted(statuses.items()))}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    synthetic.add_arguments(parser)
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--admins", type=int, default=4)
+    parser.add_argument("--spike-concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Stub LLM seconds per call")
+    parser.add_argument("--fake-redis", action="store_true")
+    args = parser.parse_args()
+
+    org = synthetic.build(args)
+    from app.db.database import SessionLocal
+    from app.models.user import User
+
+    admins = [org.admin_id] + org.member_ids[: max(0, args.admins - 1)]
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.id.in_(admins)).update({"role": "admin"}, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+    load.install_stubs(args.llm_latency, 0.0, args.fake_redis)
+    print(
+        f"users={org.counts['users']} admins={len(admins)} spike={args.spike_concurrency} "
+        f"concurrency={args.concurrency} db={args.database_url}"
+    )
+    asyncio.run(run(args, org, admins))
+
+
+if __name__ == "__main__":
+    main()
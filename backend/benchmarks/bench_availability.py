@@ -0,0 +1,92 @@
+"""Benchmark the free/busy availability engine
+
+Usage (from backend/):
+    python -m benchmarks.bench_availability --users 100 --days 31
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import date, datetime, time as dtime, timedelta
+
+from app.services.availability import AvailabilityService
+
+
+def generate_intervals(user_ids, start_date, days, shifts_per_user, meetings_per_user, seed):
+    """Generate random shifts and meetings for each user"""
+    rng = random.Random(seed)
+    intervals = []
+    for user_id in user_ids:
+        for _ in range(shifts_per_user):
+            day = start_date + timedelta(days=rng.randrange(days))
+            start_hour = rng.randint(7, 16)
+            intervals.append(
+                (
+                    user_id,
+                    datetime.combine(day, dtime(start_hour, 0)),
+                    datetime.combine(day, dtime(start_hour + rng.randint(2, 6), 0)),
+                )
+            )
+        for _ in range(meetings_per_user):
+            day = start_date + timedelta(days=rng.randrange(days))
+            start = datetime.combine(day, dtime(rng.randint(8, 19), rng.choice([0, 15, 30, 45])))
+            intervals.append((user_id, start, start + timedelta(minutes=rng.choice([30, 60, 90]))))
+    return intervals
+
+
+def run(users, days, shifts_per_user, meetings_per_user, repeat, seed):
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    start_date = date(2025, 12, 1)
+    intervals = generate_intervals(
+        user_ids, start_date, days, shifts_per_user, meetings_per_user, seed
+    )
+
+    build_times, search_times = [], []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        busy = AvailabilityService.build_busy_bitmap(user_ids, start_date, days, intervals)
+        t1 = time.perf_counter()
+        slots = AvailabilityService.find_common_slots(
+            busy,
+            start_date=start_date,
+            duration_minutes=60,
+            work_start=dtime(9, 0),
+            work_end=dtime(18, 0),
+            limit=20,
+        )
+        t2 = time.perf_counter()
+        build_times.append((t1 - t0) * 1000)
+        search_times.append((t2 - t1) * 1000)
+
+    total = [b + s for b, s in zip(build_times, search_times)]
+    print(f"users={users} days={days} intervals={len(intervals)} repeat={repeat}")
+    print(f"  build bitmap : median {statistics.median(build_times):7.2f} ms")
+    print(f"  rank slots   : median {statistics.median(search_times):7.2f} ms")
+    print(f"  total        : median {statistics.median(total):7.2f} ms, max {max(total):7.2f} ms")
+    if slots:
+        best_start, best_free = slots[0]
+        print(f"  best slot    : {best_start:%Y-%m-%d %H:%M} ({int(best_free.sum())}/{users} free)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--shifts-per-user", type=int, default=12)
+    parser.add_argument("--meetings-per-user", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(
+        args.users,
+        args.days,
+        args.shifts_per_user,
+        args.meetings_per_user,
+        args.repeat,
+        args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
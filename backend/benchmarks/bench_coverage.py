@@ -0,0 +1,57 @@
+"""Benchmark the project coverage matrix
+
+Usage (from backend/):
+    python -m benchmarks.bench_coverage --projects 40 --days 365
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import date, time as dtime, timedelta
+
+from app.services.analytics import AnalyticsService
+
+
+def generate_rows(project_ids, start_date, days, shifts_per_project_day, seed):
+    """Generate random (project_id, date, start_time, end_time) rows"""
+    rng = random.Random(seed)
+    rows = []
+    for project_id in project_ids:
+        for d in range(days):
+            day = start_date + timedelta(days=d)
+            for _ in range(rng.randint(0, shifts_per_project_day * 2)):
+                start = rng.randint(7, 18)
+                rows.append((project_id, day, dtime(start, 0), dtime(min(start + rng.randint(2, 6), 23), 0)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=40)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--shifts-per-project-day", type=int, default=3)
+    parser.add_argument("--bucket-minutes", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    project_ids = [str(uuid.uuid4()) for _ in range(args.projects)]
+    start_date = date(2025, 1, 1)
+    rows = generate_rows(project_ids, start_date, args.days, args.shifts_per_project_day, args.seed)
+
+    timings = []
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        matrix = AnalyticsService.coverage_matrix(
+            project_ids, start_date, args.days, rows, bucket_minutes=args.bucket_minutes
+        )
+        matrix.tolist()
+        timings.append((time.perf_counter() - t0) * 1000)
+
+    print(f"projects={args.projects} days={args.days} shifts={len(rows)} matrix={matrix.shape}")
+    print(f"  matrix + serialize : median {statistics.median(timings):7.2f} ms, max {max(timings):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
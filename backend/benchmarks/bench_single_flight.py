@@ -0,0 +1,85 @@
+"""Benchmark coalescing of identical concurrent reads (single-flight)
+
+Builds a synthetic organization and sends ``--herd`` simultaneous
+identical requests for a month view, ``--rounds`` times, with
+single-flight off, on within the worker, and on across workers (Redis).
+Reports latency, throughput and how many times the view was actually
+computed. With single-flight off, a herd much larger than the DB pool
+can time out waiting for connections on the slower analytics views.
+
+Usage (from backend/):
+    python -m benchmarks.bench_single_flight --fake-redis
+    python -m benchmarks.bench_single_flight --fake-redis --herd 50 --view coverage
+"""
+from typing import Any, Dict
+import argparse
+import asyncio
+
+from benchmarks import load, synthetic
+
+VIEWS = {
+    "month_view_admin": "/shifts/confirmed",
+    "coverage": "/analytics/coverage",
+    "workload": "/analytics/workload",
+}
+
+
+async def run(args: argparse.Namespace, org: synthetic.Organization) -> Dict[str, Any]:
+    import httpx
+
+    from app.core.config import settings
+    from app.core.security import create_access_token
+    from app.main import create_app
+    from app.services.single_flight import single_flight
+
+    month = org.history_months[-1]
+    params = load.month_range(month) if args.view == "month_view_admin" else {"month": month}
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': org.admin_id})}"}
+    path = f"{settings.API_V1_PREFIX}{VIEWS[args.view]}"
+
+    # Measure coalescing, not the rate limits of the bulk views
+    settings.ADMISSION_CONTROL_ENABLED = False
+    transport = httpx.ASGITransport(app=create_app())
+    report = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        async def view(i: int):
+            response = await client.get(path, params=params, headers=headers)
+            return [response.status_code]
+
+        for name, enabled, across_workers in (
+            ("off", False, False),
+            ("worker", True, False),
+            ("redis", True, True),
+        ):
+            settings.SINGLE_FLIGHT_ENABLED = enabled
+            settings.SINGLE_FLIGHT_REDIS = across_workers
+            before = single_flight.stats["executed"]
+            result = await load.run_scenario(view, args.herd * args.rounds, args.herd)
+            result["executions"] = single_flight.stats["executed"] - before
+            report[name] = result
+            load.print_row(name, result)
+            print(f"  {'':<16}  computed {result['executions']} times for {result['operations']} requests")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    synthetic.add_arguments(parser)
+    parser.add_argument("--view", choices=sorted(VIEWS), default="month_view_admin")
+    parser.add_argument("--herd", type=int, default=200, help="Simultaneous identical requests")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--fake-redis", action="store_true")
+    args = parser.parse_args()
+
+    org = synthetic.build(args)
+    load.install_stubs(0.0, 0.0, args.fake_redis)
+    print(
+        f"users={org.counts['users']} confirmed_shifts={org.counts['confirmed_shifts']} "
+        f"view={args.view} herd={args.herd} db={args.database_url}"
+    )
+    asyncio.run(run(args, org))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark worker cold start: import time, lifespan warm-up and first request
+
+Each sample runs in a fresh interpreter so nothing is cached between runs.
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --runs 5 --no-warmup --path /api/v1/auth/google/url
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CHILD = """
+import json, time
+t0 = time.perf_counter()
+from app.main import create_app
+t1 = time.perf_counter()
+app = create_app()
+t2 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app) as client:  # runs the lifespan (warm-up)
+    t3 = time.perf_counter()
+    status = client.get({path!r}).status_code
+    t4 = time.perf_counter()
+    client.get({path!r})
+    t5 = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (t1 - t0) * 1000,
+    "create_app_ms": (t2 - t1) * 1000,
+    "lifespan_ms": (t3 - t2) * 1000,
+    "first_request_ms": (t4 - t3) * 1000,
+    "second_request_ms": (t5 - t4) * 1000,
+    "ready_to_first_response_ms": (t4 - t0) * 1000,
+    "status": status,
+}}))
+"""
+
+
+def run_child(path: str, warmup: bool) -> dict:
+    env = dict(os.environ, STARTUP_WARMUP="true" if warmup else "false")
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD.format(path=path)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--path", default="/health")
+    parser.add_argument("--no-warmup", action="store_true")
+    args = parser.parse_args()
+
+    samples = [run_child(args.path, not args.no_warmup) for _ in range(args.runs)]
+
+    print(f"path={args.path} warmup={not args.no_warmup} runs={args.runs} status={samples[0]['status']}")
+    for key in (
+        "import_ms",
+        "create_app_ms",
+        "lifespan_ms",
+        "first_request_ms",
+        "second_request_ms",
+        "ready_to_first_response_ms",
+        "process_ms",
+    ):
+        values = [s[key] for s in samples]
+        print(f"  {key:<27}: median {statistics.median(values):8.1f} ms, max {max(values):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark the sorted-merge suggestion diff
+
+Usage (from backend/):
+    python -m benchmarks.bench_suggestion_diff --assignments 5000 --change-rate 0.1
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import date, time as dtime
+
+from app.services.suggestion_diff import SuggestionDiffService
+
+
+def generate(assignments, members, projects, change_rate, seed):
+    """Two sorted row lists where ``change_rate`` of the rows differ"""
+    rng = random.Random(seed)
+    user_ids = [str(uuid.uuid4()) for _ in range(members)]
+    project_ids = [str(uuid.uuid4()) for _ in range(projects)]
+    rows_a = []
+    for _ in range(assignments):
+        start = rng.randint(7, 14)
+        rows_a.append(
+            (
+                rng.choice(user_ids),
+                date(2025, 12, rng.randint(1, 31)),
+                dtime(start, 0),
+                dtime(start + rng.randint(2, 8), 0),
+                rng.choice(project_ids),
+            )
+        )
+    rows_b = []
+    for row in rows_a:
+        roll = rng.random()
+        if roll < change_rate / 3:
+            continue  # removed
+        if roll < 2 * change_rate / 3:
+            rows_b.append(row[:4] + (rng.choice(project_ids),))  # moved
+        else:
+            rows_b.append(row)
+        if roll > 1 - change_rate / 3:
+            rows_b.append((rng.choice(user_ids),) + row[1:])  # added
+    return sorted(rows_a), sorted(rows_b)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--assignments", type=int, default=5000)
+    parser.add_argument("--members", type=int, default=300)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--change-rate", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows_a, rows_b = generate(
+        args.assignments, args.members, args.projects, args.change_rate, args.seed
+    )
+
+    timings = []
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        diff = SuggestionDiffService.diff_rows(rows_a, rows_b)
+        timings.append((time.perf_counter() - t0) * 1000)
+
+    print(
+        f"a={len(rows_a)} b={len(rows_b)} added={len(diff['added'])} removed={len(diff['removed'])} "
+        f"moved={len(diff['moved'])} unchanged={diff['unchanged']} members={len(diff['members'])}"
+    )
+    print(f"  diff : median {statistics.median(timings):7.2f} ms, max {max(timings):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark validation and local repair of optimization results
+
+Usage (from backend/):
+    python -m benchmarks.bench_validation --members 200 --projects 20 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from datetime import date, timedelta
+
+from app.services.assignment_validation import AssignmentRepairService, AssignmentValidator
+
+
+def generate(members, projects, days, error_rate, seed):
+    """Random requests plus an LLM-like result with injected violations"""
+    rng = random.Random(seed)
+    user_ids = [str(uuid.uuid4()) for _ in range(members)]
+    project_data = [
+        {"id": str(uuid.uuid4()), "name": f"P{i}", "required_members": rng.randint(1, 4)}
+        for i in range(projects)
+    ]
+    shift_requests, assignments = [], []
+    for d in range(days):
+        day = (date(2025, 12, 1) + timedelta(days=d)).isoformat()
+        for user_id in rng.sample(user_ids, members // 2):
+            start = rng.randint(7, 14)
+            end = start + rng.randint(3, 8)
+            shift_requests.append(
+                {"user_id": user_id, "date": day, "start_time": f"{start:02d}:00:00", "end_time": f"{end:02d}:00:00"}
+            )
+            assignment = {
+                "user_id": user_id,
+                "project_id": rng.choice(project_data)["id"],
+                "date": day,
+                "start_time": f"{start:02d}:00",
+                "end_time": f"{end:02d}:00",
+            }
+            if rng.random() < error_rate:
+                kind = rng.randrange(3)
+                if kind == 0:
+                    assignment["end_time"] = "23:00"  # outside the request
+                elif kind == 1:
+                    assignment["project_id"] = "missing"
+                else:
+                    assignments.append(dict(assignment))  # double booking
+            assignments.append(assignment)
+    return shift_requests, project_data, {"assignments": assignments, "summary": {}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=200)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    shift_requests, projects, result = generate(
+        args.members, args.projects, args.days, args.error_rate, args.seed
+    )
+
+    validate_timings, repair_timings = [], []
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        validator = AssignmentValidator(shift_requests, projects, "2025-12")
+        _, violations = validator.validate(result["assignments"])
+        validate_timings.append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        repaired, _ = asyncio.run(
+            AssignmentRepairService.validate_and_repair(
+                result, shift_requests, projects, "2025-12", mode="local"
+            )
+        )
+        repair_timings.append((time.perf_counter() - t0) * 1000)
+
+    report = repaired["summary"]["validation"]
+    print(
+        f"requests={len(shift_requests)} assignments={len(result['assignments'])} "
+        f"violations={len(violations)} repaired_days={len(report.get('repaired', []))} "
+        f"added={report.get('added', 0)}"
+    )
+    print(f"  validate          : median {statistics.median(validate_timings):7.2f} ms, max {max(validate_timings):7.2f} ms")
+    print(f"  validate + repair : median {statistics.median(repair_timings):7.2f} ms, max {max(repair_timings):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
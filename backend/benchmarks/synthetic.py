@@ -0,0 +1,334 @@
+"""Synthetic organization generator for load tests
+
+Fills a throwaway database with N members across M projects and a
+realistic month-by-month history: submitted shift requests, confirmed
+shifts (with their schedule_intervals mirror), and project meetings with
+participants. The last ``open_months`` months only have submitted
+requests, ready to be optimized and approved.
+
+Usage (from backend/):
+    python -m benchmarks.synthetic --database-url sqlite:////tmp/sifut_bench.db --users 300 --projects 20
+"""
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List
+import argparse
+import calendar
+import os
+import random
+import time as time_module
+
+CHUNK = 5000
+
+
+@dataclass
+class Organization:
+    """Ids of the generated rows the load scenarios need"""
+
+    admin_id: str
+    member_ids: List[str]
+    project_ids: List[str]
+    project_members: Dict[str, List[str]]
+    history_months: List[str]
+    open_months: List[str]
+    counts: Dict[str, int] = field(default_factory=dict)
+
+
+def month_list(first: str, count: int) -> List[str]:
+    year, month = map(int, first.split("-"))
+    months = []
+    for _ in range(count):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def month_days(month: str) -> List[date]:
+    year, mon = map(int, month.split("-"))
+    return [date(year, mon, d) for d in range(1, calendar.monthrange(year, mon)[1] + 1)]
+
+
+def _bulk(db, model, rows: List[Dict]) -> None:
+    from sqlalchemy import insert
+
+    for i in range(0, len(rows), CHUNK):
+        db.execute(insert(model), rows[i : i + CHUNK])
+
+
+def generate(
+    db,
+    users: int = 300,
+    projects: int = 20,
+    first_month: str = "2025-07",
+    history_months: int = 5,
+    open_months: int = 3,
+    requests_per_month: int = 10,
+    confirm_rate: float = 0.7,
+    meetings_per_project: int = 8,
+    google_rate: float = 0.3,
+    seed: int = 42,
+) -> Organization:
+    """Insert a synthetic organization and commit
+
+    Each member belongs to one to three projects and asks for
+    ``requests_per_month`` shifts on distinct days (starting 07:00-14:00,
+    two to eight hours). In history months ``confirm_rate`` of the requests
+    became confirmed shifts on one of the member's projects. ``google_rate``
+    of the members have (fake) Google tokens, so approvals enqueue calendar
+    syncs and availability searches can ask Google for busy times.
+    """
+    from app.models import (
+        ConfirmedShift,
+        Meeting,
+        MeetingParticipant,
+        Project,
+        ProjectMember,
+        ScheduleInterval,
+        ShiftRequest,
+        User,
+    )
+    from app.db.types import new_id
+    from app.services.workload import WorkloadService
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    months = month_list(first_month, history_months + open_months)
+
+    admin_id = new_id()
+    member_ids = [new_id() for _ in range(users)]
+    user_rows = []
+    for i, user_id in enumerate([admin_id] + member_ids):
+        connected = i > 0 and rng.random() < google_rate
+        user_rows.append(
+            {
+                "id": user_id,
+                "google_id": f"synthetic-{user_id}",
+                "email": f"user{i}@synthetic.example",
+                "name": "Admin" if i == 0 else f"Member {i}",
+                "role": "admin" if i == 0 else "member",
+                "google_access_token": f"fake-access-{i}" if connected else None,
+                "google_refresh_token": f"fake-refresh-{i}" if connected else None,
+                "token_expires_at": now + timedelta(days=365) if connected else None,
+                "share_google_busy": connected,
+            }
+        )
+    _bulk(db, User, user_rows)
+
+    project_ids = [new_id() for _ in range(projects)]
+    _bulk(
+        db,
+        Project,
+        [
+            {
+                "id": project_id,
+                "name": f"Project {i + 1}",
+                "required_members": rng.randint(1, 4),
+                "is_active": True,
+            }
+            for i, project_id in enumerate(project_ids)
+        ],
+    )
+
+    user_projects: Dict[str, List[str]] = {}
+    project_members: Dict[str, List[str]] = {project_id: [] for project_id in project_ids}
+    member_rows = []
+    for user_id in member_ids:
+        joined = rng.sample(project_ids, min(len(project_ids), rng.randint(1, 3)))
+        user_projects[user_id] = joined
+        for project_id in joined:
+            project_members[project_id].append(user_id)
+            member_rows.append(
+                {"id": new_id(), "project_id": project_id, "user_id": user_id, "role": "member"}
+            )
+    _bulk(db, ProjectMember, member_rows)
+
+    request_rows, shift_rows, meeting_rows, participant_rows, interval_rows = [], [], [], [], []
+    for index, month in enumerate(months):
+        history = index < history_months
+        days = month_days(month)
+        for user_id in member_ids:
+            for day in sorted(rng.sample(days, min(len(days), requests_per_month))):
+                start = time(rng.randint(7, 14), rng.choice((0, 30)))
+                end = time(min(start.hour + rng.randint(2, 8), 23), start.minute)
+                request_rows.append(
+                    {
+                        "id": new_id(),
+                        "user_id": user_id,
+                        "date": day,
+                        "start_time": start,
+                        "end_time": end,
+                        "status": "approved" if history else "submitted",
+                        "submitted_at": datetime.combine(days[0], time.min) - timedelta(days=7),
+                    }
+                )
+                if not history or rng.random() >= confirm_rate:
+                    continue
+                shift_id = new_id()
+                project_id = rng.choice(user_projects[user_id])
+                shift_rows.append(
+                    {
+                        "id": shift_id,
+                        "user_id": user_id,
+                        "project_id": project_id,
+                        "date": day,
+                        "start_time": start,
+                        "end_time": end,
+                        "created_by": admin_id,
+                    }
+                )
+                interval_rows.append(
+                    {
+                        "id": new_id(),
+                        "user_id": user_id,
+                        "project_id": project_id,
+                        "kind": "shift",
+                        "source_id": shift_id,
+                        "start_at": datetime.combine(day, start),
+                        "end_at": datetime.combine(day, end),
+                    }
+                )
+
+        for project_id in project_ids:
+            members = project_members[project_id]
+            if not members:
+                continue
+            for _ in range(meetings_per_project):
+                meeting_id = new_id()
+                start_at = datetime.combine(rng.choice(days), time(rng.randint(9, 17), rng.choice((0, 30))))
+                end_at = start_at + timedelta(minutes=rng.choice((30, 60, 90)))
+                meeting_rows.append(
+                    {
+                        "id": meeting_id,
+                        "project_id": project_id,
+                        "title": f"Meeting {len(meeting_rows) + 1}",
+                        "start_datetime": start_at,
+                        "end_datetime": end_at,
+                        "is_recurring": False,
+                        "created_by": admin_id,
+                    }
+                )
+                invited = rng.sample(members, min(len(members), rng.randint(3, 8)))
+                for user_id in [admin_id] + invited:
+                    participant_status = rng.choices(
+                        ("accepted", "pending", "tentative", "declined"), (6, 2, 1, 1)
+                    )[0]
+                    participant_rows.append(
+                        {
+                            "id": new_id(),
+                            "meeting_id": meeting_id,
+                            "user_id": user_id,
+                            "status": participant_status,
+                        }
+                    )
+                    if participant_status != "declined":
+                        interval_rows.append(
+                            {
+                                "id": new_id(),
+                                "user_id": user_id,
+                                "project_id": project_id,
+                                "kind": "meeting",
+                                "source_id": meeting_id,
+                                "start_at": start_at,
+                                "end_at": end_at,
+                            }
+                        )
+
+    _bulk(db, ShiftRequest, request_rows)
+    _bulk(db, ConfirmedShift, shift_rows)
+    _bulk(db, Meeting, meeting_rows)
+    _bulk(db, MeetingParticipant, participant_rows)
+    _bulk(db, ScheduleInterval, interval_rows)
+    WorkloadService.rebuild(db)
+    db.commit()
+
+    return Organization(
+        admin_id=admin_id,
+        member_ids=member_ids,
+        project_ids=project_ids,
+        project_members=project_members,
+        history_months=months[:history_months],
+        open_months=months[history_months:],
+        counts={
+            "users": len(user_rows),
+            "projects": len(project_ids),
+            "project_members": len(member_rows),
+            "shift_requests": len(request_rows),
+            "confirmed_shifts": len(shift_rows),
+            "meetings": len(meeting_rows),
+            "meeting_participants": len(participant_rows),
+            "schedule_intervals": len(interval_rows),
+        },
+    )
+
+
+def reset_database() -> None:
+    """Drop and recreate every table (throwaway databases only)"""
+    import app.models  # noqa: F401  (register every table on Base.metadata)
+    from app.db.database import Base, engine
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--database-url",
+        default="sqlite:////tmp/sifut_bench.db",
+        help="Throwaway database; every table is dropped and recreated",
+    )
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--first-month", default="2025-07")
+    parser.add_argument("--history-months", type=int, default=5)
+    parser.add_argument("--open-months", type=int, default=3)
+    parser.add_argument("--requests-per-month", type=int, default=10)
+    parser.add_argument("--meetings-per-project", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def build(args: argparse.Namespace) -> Organization:
+    """Point the app at ``--database-url``, reset it and generate the organization"""
+    # app.db.database creates its engine from DATABASE_URL on first import
+    os.environ["DATABASE_URL"] = args.database_url
+    from app.core.config import settings
+
+    settings.DATABASE_URL = args.database_url
+
+    from app.db.database import SessionLocal
+
+    reset_database()
+    db = SessionLocal()
+    try:
+        return generate(
+            db,
+            users=args.users,
+            projects=args.projects,
+            first_month=args.first_month,
+            history_months=args.history_months,
+            open_months=args.open_months,
+            requests_per_month=args.requests_per_month,
+            meetings_per_project=args.meetings_per_project,
+            seed=args.seed,
+        )
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    t0 = time_module.perf_counter()
+    org = build(args)
+    elapsed = time_module.perf_counter() - t0
+
+    print(f"Generated in {elapsed:.1f} s into {args.database_url}")
+    for table, count in org.counts.items():
+        print(f"  {table:<21}: {count:8d}")
+    print(f"  history months       : {', '.join(org.history_months)}")
+    print(f"  open months          : {', '.join(org.open_months)}")
+
+
+if __name__ == "__main__":
+    main()
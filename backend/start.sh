@@ -39,6 +39,12 @@ fi
 echo "🗄️  Running database migrations..."
 alembic upgrade head
 
+# Production: pre-fork workers (./start.sh --prod)
+if [ "$1" = "--prod" ]; then
+    echo "✅ Starting production server..."
+    exec python -m app.server
+fi
+
 # Start the server
 echo "✅ Starting FastAPI server..."
 echo "📚 API Documentation will be available at:"
@@ -0,0 +1,195 @@
+from datetime import date, time
+
+import pytest
+
+from app.core.config import settings
+from app.services.assignment_validation import AssignmentRepairService, AssignmentValidator
+from app.services.llm_router import StubProvider, llm_router
+
+MONTH = "2026-03"
+ALICE, BOB, CAROL, DAVE = "alice", "bob", "carol", "dave"
+P1, P2 = "p1", "p2"
+
+PROJECTS = [{"id": P1, "required_members": 2}, {"id": P2, "required_members": 1}]
+REQUESTS = [
+    {"user_id": ALICE, "date": "2026-03-02", "start_time": "09:00", "end_time": "17:00"},
+    {"user_id": BOB, "date": "2026-03-02", "start_time": "09:00", "end_time": "13:00"},
+    {"user_id": CAROL, "date": "2026-03-02", "start_time": "13:00", "end_time": "18:00"},
+    {"user_id": DAVE, "date": "2026-03-03", "start_time": "09:00", "end_time": "17:00"},
+]
+
+
+def assignment(user_id, project_id, day, start, end):
+    return {"user_id": user_id, "project_id": project_id, "date": day, "start_time": start, "end_time": end}
+
+
+VALID = [
+    assignment(ALICE, P1, "2026-03-02", "9:00", "17:00"),
+    assignment(BOB, P1, "2026-03-02", "09:00", "13:00"),
+]
+INVALID = [
+    assignment(CAROL, P2, "2026-03-02", "12:00", "18:00"),  # starts before her request
+    assignment(ALICE, P2, "2026-03-02", "10:00", "12:00"),  # already on P1
+    assignment(DAVE, P1, "2026-04-01", "09:00", "17:00"),
+    {"user_id": DAVE, "date": "2026-03-03"},
+    assignment("eve", P1, "2026-03-03", "09:00", "17:00"),
+    assignment(DAVE, "p9", "2026-03-03", "09:00", "17:00"),
+    assignment(DAVE, P1, "2026-03-03", "17:00", "09:00"),
+]
+
+
+def test_validate_codes():
+    validator = AssignmentValidator(REQUESTS, PROJECTS, MONTH)
+    slots, violations = validator.validate(VALID + INVALID)
+
+    assert slots[0] == (ALICE, P1, date(2026, 3, 2), time(9), time(17))
+    assert [(v["index"], v["code"]) for v in violations] == [
+        (2, "outside_request"),
+        (3, "double_booked"),
+        (4, "outside_month"),
+        (5, "malformed"),
+        (6, "unknown_user"),
+        (7, "unknown_project"),
+        (8, "invalid_time"),
+    ]
+
+
+def test_double_booking_keeps_the_earlier_assignment():
+    validator = AssignmentValidator(REQUESTS, PROJECTS, MONTH)
+    later = assignment(ALICE, P2, "2026-03-02", "12:00", "17:00")
+    earlier = assignment(ALICE, P1, "2026-03-02", "09:00", "13:00")
+    _, violations = validator.validate([later, earlier])
+    assert [(v["index"], v["code"]) for v in violations] == [(0, "double_booked")]
+
+    # Back to back is not a double booking
+    _, violations = validator.validate(
+        [assignment(ALICE, P1, "2026-03-02", "09:00", "13:00"), assignment(ALICE, P2, "2026-03-02", "13:00", "17:00")]
+    )
+    assert violations == []
+
+
+def test_repair_targets():
+    validator = AssignmentValidator(REQUESTS, PROJECTS, MONTH)
+    slots, violations = validator.validate(VALID + INVALID)
+
+    # Malformed and other-month assignments damage no day of this month;
+    # an unknown project may leave any project of that day short
+    assert validator.repair_targets(slots, violations) == {
+        date(2026, 3, 2): {P2},
+        date(2026, 3, 3): {P1, P2},
+    }
+
+
+def test_fill_staffs_least_loaded_free_member():
+    validator = AssignmentValidator(REQUESTS, PROJECTS, MONTH)
+    kept = [(ALICE, P1, date(2026, 3, 2), time(9), time(17))]
+
+    added = validator.fill(kept, {date(2026, 3, 2): {P1, P2}})
+
+    # P1 needs one more: Bob (no load yet) before Carol by id; P2 then gets
+    # Carol, as Alice and Bob are booked for the whole of their requests
+    assert added == [
+        (BOB, P1, date(2026, 3, 2), time(9), time(13)),
+        (CAROL, P2, date(2026, 3, 2), time(13), time(18)),
+    ]
+
+
+def test_fill_accepts_valid_proposals_first():
+    validator = AssignmentValidator(REQUESTS, PROJECTS, MONTH)
+    proposals = [
+        validator.parse(assignment(CAROL, P2, "2026-03-02", "14:00", "16:00")),
+        validator.parse(assignment(BOB, P2, "2026-03-02", "09:00", "13:00")),  # P2 is full by now
+        None,
+    ]
+
+    added = validator.fill([], {date(2026, 3, 2): {P2}}, proposals)
+
+    assert added == [(CAROL, P2, date(2026, 3, 2), time(14), time(16))]
+
+
+@pytest.mark.asyncio
+async def test_validate_and_repair_local():
+    result, attempts = await AssignmentRepairService.validate_and_repair(
+        {"assignments": VALID + INVALID[:2], "summary": {"notes": ["x"]}},
+        REQUESTS,
+        PROJECTS,
+        MONTH,
+        mode="local",
+    )
+
+    assert attempts == []
+    assert result["assignments"] == [
+        assignment(ALICE, P1, "2026-03-02", "09:00", "17:00"),
+        assignment(BOB, P1, "2026-03-02", "09:00", "13:00"),
+        assignment(CAROL, P2, "2026-03-02", "13:00", "18:00"),
+    ]
+    summary = result["summary"]
+    assert summary["notes"] == ["x"]
+    assert summary["total_shifts"] == 3
+    report = summary["validation"]
+    assert report["checked"] == 4
+    assert report["dropped"] == 2
+    assert report["added"] == 1
+    assert report["by_code"] == {"outside_request": 1, "double_booked": 1}
+    assert report["repaired"] == [{"date": "2026-03-02", "project_ids": [P2]}]
+
+
+@pytest.mark.asyncio
+async def test_validate_and_repair_off_only_drops():
+    result, _ = await AssignmentRepairService.validate_and_repair(
+        {"assignments": VALID + INVALID[:2]}, REQUESTS, PROJECTS, MONTH, mode="off"
+    )
+    assert len(result["assignments"]) == 2
+    assert result["summary"]["validation"]["added"] == 0
+
+
+@pytest.mark.asyncio
+async def test_validate_and_repair_valid_result_is_untouched():
+    result, _ = await AssignmentRepairService.validate_and_repair(
+        {"assignments": VALID, "summary": {"total_shifts": 99}}, REQUESTS, PROJECTS, MONTH, mode="llm"
+    )
+    assert len(result["assignments"]) == 2
+    assert result["summary"]["total_shifts"] == 99
+    assert result["summary"]["validation"]["violations"] == 0
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """Registers a StubProvider as the only LLM provider"""
+    monkeypatch.setattr(settings, "AI_PROVIDER", "stub")
+    monkeypatch.setattr(settings, "LLM_FALLBACK_ENABLED", False)
+    yield lambda provider: llm_router.register("stub", provider)
+    llm_router.unregister("stub")
+
+
+@pytest.mark.asyncio
+async def test_validate_and_repair_llm_targets_damaged_days(stub_llm):
+    prompts = []
+
+    def respond(prompt):
+        prompts.append(prompt)
+        return {"assignments": [assignment(CAROL, P2, "2026-03-02", "15:00", "18:00")]}
+
+    stub_llm(StubProvider(respond))
+    result, attempts = await AssignmentRepairService.validate_and_repair(
+        {"assignments": VALID + INVALID[:2]}, REQUESTS, PROJECTS, MONTH, mode="llm"
+    )
+
+    # Only Carol's request is still free on the damaged day
+    assert len(prompts) == 1
+    assert CAROL in prompts[0]
+    assert not any(user_id in prompts[0] for user_id in (ALICE, BOB, DAVE))
+    assert [a["status"] for a in attempts] == ["ok"]
+    assert result["assignments"][-1] == assignment(CAROL, P2, "2026-03-02", "15:00", "18:00")
+    assert result["summary"]["validation"]["added"] == 1
+
+
+@pytest.mark.asyncio
+async def test_validate_and_repair_llm_failure_falls_back_to_local(stub_llm):
+    stub_llm(StubProvider(error=RuntimeError("overloaded")))
+    result, attempts = await AssignmentRepairService.validate_and_repair(
+        {"assignments": VALID + INVALID[:2]}, REQUESTS, PROJECTS, MONTH, mode="llm"
+    )
+
+    assert [a["status"] for a in attempts] == ["error"]
+    assert result["assignments"][-1] == assignment(CAROL, P2, "2026-03-02", "13:00", "18:00")
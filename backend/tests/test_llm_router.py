@@ -0,0 +1,166 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.llm_usage import LLMUsage
+from app.services.llm_router import LLMRouter, LLMRoutingError, StubProvider
+from app.services.llm_usage import LLMUsageService
+
+RESULT = {"assignments": [{"user_id": "u1"}], "summary": {}}
+
+
+@pytest.fixture(autouse=True)
+def router_settings(monkeypatch):
+    monkeypatch.setattr(settings, "AI_PROVIDER", "claude")
+    monkeypatch.setattr(settings, "LLM_FALLBACK_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_HEDGING_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_MAX_PARALLEL", 2)
+    monkeypatch.setattr(settings, "LLM_HEDGE_DEFAULT_SECONDS", 5.0)
+    monkeypatch.setattr(settings, "LLM_TIMEOUT_SECONDS", 5.0)
+    monkeypatch.setattr(settings, "LLM_PRICING", {})
+
+
+def make_router(**providers: StubProvider) -> LLMRouter:
+    router = LLMRouter()
+    for name, provider in providers.items():
+        router.register(name, provider)
+    return router
+
+
+@pytest.mark.asyncio
+async def test_primary_answers():
+    primary, other = StubProvider(RESULT), StubProvider()
+    router = make_router(claude=primary, openai=other)
+
+    result, routing = await router.route("prompt")
+
+    assert result == RESULT
+    assert routing["provider"] == "claude"
+    assert routing["hedged"] is False
+    assert [a["status"] for a in routing["attempts"]] == ["ok"]
+    assert other.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_falls_back_after_error():
+    router = make_router(
+        claude=StubProvider(error=RuntimeError("overloaded")),
+        openai=StubProvider(RESULT, model="gpt-4o"),
+    )
+
+    result, routing = await router.route("prompt")
+
+    assert result == RESULT
+    assert routing["provider"] == "openai"
+    assert [(a["provider"], a["status"]) for a in routing["attempts"]] == [
+        ("claude", "error"),
+        ("openai", "ok"),
+    ]
+    assert routing["attempts"][0]["error"] == "overloaded"
+    assert routing["attempts"][1]["model"] == "gpt-4o"
+
+
+@pytest.mark.asyncio
+async def test_no_fallback_when_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_FALLBACK_ENABLED", False)
+    other = StubProvider(RESULT)
+    router = make_router(claude=StubProvider(error=RuntimeError("overloaded")), openai=other)
+
+    with pytest.raises(LLMRoutingError) as info:
+        await router.route("prompt")
+
+    assert [a["status"] for a in info.value.attempts] == ["error"]
+    assert other.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_hedges_slow_primary(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_HEDGE_DEFAULT_SECONDS", 0.05)
+    router = make_router(claude=StubProvider(latency=2.0), openai=StubProvider(RESULT))
+
+    result, routing = await router.route("prompt")
+
+    assert result == RESULT
+    assert routing["provider"] == "openai"
+    assert routing["hedged"] is True
+    statuses = {a["provider"]: a["status"] for a in routing["attempts"]}
+    assert statuses == {"openai": "ok", "claude": "cancelled"}
+
+
+@pytest.mark.asyncio
+async def test_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_TIMEOUT_SECONDS", 0.1)
+    monkeypatch.setattr(settings, "LLM_HEDGING_ENABLED", False)
+    router = make_router(claude=StubProvider(latency=2.0))
+
+    with pytest.raises(LLMRoutingError) as info:
+        await router.route("prompt")
+
+    assert [a["status"] for a in info.value.attempts] == ["timeout"]
+    assert router.stats["claude"].error_rate == 1.0
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_primary_goes_last():
+    primary = StubProvider(error=RuntimeError("down"))
+    router = make_router(claude=primary, openai=StubProvider(RESULT))
+    for _ in range(5):
+        await router.route("prompt")
+
+    assert router.ranked() == ["openai", "claude"]
+    calls = primary.calls
+    _, routing = await router.route("prompt")
+    assert routing["provider"] == "openai"
+    assert primary.calls == calls
+
+
+def test_unknown_primary(monkeypatch):
+    monkeypatch.setattr(settings, "AI_PROVIDER", "mistral")
+    with pytest.raises(ValueError):
+        make_router(claude=StubProvider()).ranked()
+
+
+def test_estimate_cost(monkeypatch):
+    assert LLMUsageService.estimate_cost("stub", 1000, 1000) == 0
+    # Longest prefix wins: gpt-4o-mini, not gpt-4o
+    assert float(LLMUsageService.estimate_cost("gpt-4o-mini-2024-07-18", 1_000_000, 1_000_000)) == 0.75
+    assert LLMUsageService.estimate_cost("unknown-model", 10, 10) is None
+
+    monkeypatch.setattr(settings, "LLM_PRICING", {"stub": [1.0, 2.0]})
+    assert float(LLMUsageService.estimate_cost("stub", 500_000, 250_000)) == 1.0
+
+
+@pytest.mark.asyncio
+async def test_usage_accounting(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PRICING", {"priced": [1.0, 2.0]})
+    router = make_router(
+        claude=StubProvider(error=RuntimeError("overloaded")),
+        openai=StubProvider(RESULT, model="priced-1"),
+    )
+    prompt = "x" * 4000
+    _, routing = await router.route(prompt)
+
+    engine = create_engine("sqlite://")
+    LLMUsage.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        rows = LLMUsageService.record(db, routing["attempts"], "2026-01")
+        usage = {row["provider"]: row for row in rows}
+        assert usage["claude"]["status"] == "error"
+        assert usage["claude"]["cost_usd"] is None
+        assert usage["openai"]["input_tokens"] == 1000
+        assert usage["openai"]["cost_usd"] is not None
+
+        summary = {
+            row["provider"]: row
+            for row in LLMUsageService.aggregate(db, "2026-01", "2026-02")
+        }
+        assert summary["claude"]["failed_calls"] == 1
+        assert summary["openai"]["successful_calls"] == 1
+        assert summary["openai"]["input_tokens"] == 1000
+        assert summary["openai"]["cost_usd"] == pytest.approx(
+            float(usage["openai"]["cost_usd"]), abs=1e-6
+        )
+    finally:
+        db.close()
@@ -0,0 +1,75 @@
+from app.services.reoptimization import ReoptimizationService
+
+PROJECTS = [{"id": "p1", "name": "P1", "required_members": 2}, {"id": "p2", "name": "P2", "required_members": 1}]
+
+
+def request(user_id, day, start="09:00", end="17:00", comment=None):
+    return {"user_id": user_id, "date": day, "start_time": start, "end_time": end, "comment": comment}
+
+
+REQUESTS = [
+    request("alice", "2026-03-02"),
+    request("bob", "2026-03-02", "09:00", "13:00"),
+    request("alice", "2026-03-03"),
+    request("carol", "2026-03-04"),
+]
+
+
+def changed(requests, projects=PROJECTS, base=REQUESTS):
+    snapshot = ReoptimizationService.snapshot(base, PROJECTS)
+    return ReoptimizationService.changed_days(snapshot, requests, projects)
+
+
+def test_snapshot_keeps_only_what_affects_staffing():
+    snapshot = ReoptimizationService.snapshot(REQUESTS, PROJECTS)
+    assert snapshot["requests"] == REQUESTS
+    assert snapshot["projects"] == [{"id": "p1", "required_members": 2}, {"id": "p2", "required_members": 1}]
+
+
+def test_nothing_changed():
+    assert changed(list(reversed(REQUESTS))) == set()
+    # Renaming a project does not change staffing
+    assert changed(REQUESTS, [{**p, "name": "renamed"} for p in PROJECTS]) == set()
+
+
+def test_changed_request_marks_its_day():
+    requests = [dict(r) for r in REQUESTS]
+    requests[1]["end_time"] = "14:00"
+    assert changed(requests) == {"2026-03-02"}
+
+
+def test_comment_change_is_a_change():
+    requests = [dict(r) for r in REQUESTS]
+    requests[3]["comment"] = "afternoon only"
+    assert changed(requests) == {"2026-03-04"}
+
+
+def test_added_and_withdrawn_requests():
+    requests = REQUESTS[:3] + [request("dave", "2026-03-05")]
+    assert changed(requests) == {"2026-03-04", "2026-03-05"}
+
+
+def test_duplicate_request_is_a_change():
+    # Requests are compared as multisets, not sets
+    assert changed(REQUESTS + [REQUESTS[0]]) == {"2026-03-02"}
+
+
+def test_project_change_affects_every_day():
+    days = {"2026-03-02", "2026-03-03", "2026-03-04", "2026-03-05"}
+    requests = REQUESTS + [request("dave", "2026-03-05")]
+    assert changed(requests, [PROJECTS[0], {**PROJECTS[1], "required_members": 2}]) == days
+    assert changed(requests, PROJECTS[:1]) == days
+
+
+def test_carry_over_keeps_unchanged_days():
+    assignments = [
+        {"user_id": "alice", "project_id": "p1", "date": "2026-03-02", "start_time": "09:00", "end_time": "17:00"},
+        {"user_id": "bob", "project_id": "p1", "date": "2026-03-02", "start_time": "09:00", "end_time": "13:00"},
+        {"user_id": "alice", "project_id": "p2", "date": "2026-03-03", "start_time": "09:00", "end_time": "17:00"},
+        {"user_id": "carol", "project_id": "p1", "date": "2026-03-04", "start_time": "09:00", "end_time": "17:00"},
+    ]
+
+    kept = ReoptimizationService.carry_over(assignments, {"2026-03-02", "2026-03-04"})
+
+    assert kept == [assignments[2]]
+    assert ReoptimizationService.carry_over(assignments, set()) == assignments
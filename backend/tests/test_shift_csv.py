@@ -0,0 +1,163 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.db.types import new_id
+from app.models.schedule import ScheduleInterval
+from app.services.shift_csv import ShiftCSVService
+
+ALICE, BOB = new_id(), new_id()
+PROJECT = new_id()
+
+
+def at(day: int, hour: int, minute: int = 0) -> np.datetime64:
+    return np.datetime64(datetime(2026, 3, day, hour, minute), "s")
+
+
+def overlaps(db, *intervals):
+    """overlaps() for (user_id, start, end) tuples, as a list of bools"""
+    users = np.array([u for u, _, _ in intervals], dtype=object)
+    starts = np.array([s for _, s, _ in intervals], dtype="datetime64[s]")
+    ends = np.array([e for _, _, e in intervals], dtype="datetime64[s]")
+    return ShiftCSVService.overlaps(db, users, starts, ends).tolist()
+
+
+def store_shift(db, user_id: str, start: np.datetime64, end: np.datetime64, kind: str = "shift"):
+    db.add(
+        ScheduleInterval(
+            id=new_id(),
+            user_id=user_id,
+            project_id=PROJECT,
+            kind=kind,
+            source_id=new_id(),
+            start_at=start.item(),
+            end_at=end.item(),
+        )
+    )
+    db.flush()
+
+
+def test_empty(db):
+    assert overlaps(db) == []
+
+
+def test_overlap_within_batch(db):
+    assert overlaps(db, (ALICE, at(2, 9), at(2, 13)), (ALICE, at(2, 12), at(2, 17))) == [True, True]
+
+
+def test_touching_intervals_do_not_overlap(db):
+    assert overlaps(db, (ALICE, at(2, 9), at(2, 13)), (ALICE, at(2, 13), at(2, 17))) == [False, False]
+
+
+def test_other_users_do_not_overlap(db):
+    assert overlaps(db, (ALICE, at(2, 9), at(2, 17)), (BOB, at(2, 9), at(2, 17))) == [False, False]
+
+
+def test_long_interval_overlaps_non_adjacent_ones(db):
+    # The 8-20 shift covers both short ones, which do not touch each other
+    result = overlaps(
+        db,
+        (ALICE, at(2, 8), at(2, 20)),
+        (ALICE, at(2, 9), at(2, 10)),
+        (ALICE, at(2, 15), at(2, 16)),
+        (ALICE, at(2, 21), at(2, 22)),
+    )
+    assert result == [True, True, True, False]
+
+
+def test_result_follows_input_order(db):
+    result = overlaps(
+        db,
+        (BOB, at(3, 9), at(3, 12)),
+        (ALICE, at(2, 14), at(2, 18)),
+        (BOB, at(2, 9), at(2, 12)),
+        (ALICE, at(2, 9), at(2, 15)),
+        (BOB, at(3, 12), at(3, 13)),
+    )
+    assert result == [False, True, False, True, False]
+
+
+def test_users_far_apart_in_time(db):
+    # A late shift of one user must not reach into the next user's range
+    result = overlaps(
+        db,
+        (ALICE, np.datetime64("2099-12-31T20:00:00"), np.datetime64("2100-01-01T04:00:00")),
+        (BOB, np.datetime64("1971-01-01T00:00:00"), np.datetime64("1971-01-01T08:00:00")),
+    )
+    assert result == [False, False]
+
+
+def test_stored_shift(db):
+    store_shift(db, ALICE, at(2, 9), at(2, 17))
+    result = overlaps(
+        db,
+        (ALICE, at(2, 16), at(2, 17)),
+        (ALICE, at(2, 17), at(2, 19)),
+        (ALICE, at(2, 7), at(2, 9)),
+        (BOB, at(2, 10), at(2, 12)),
+    )
+    assert result == [True, False, False, False]
+
+
+def test_stored_meetings_are_ignored(db):
+    store_shift(db, ALICE, at(2, 9), at(2, 17), kind="meeting")
+    assert overlaps(db, (ALICE, at(2, 10), at(2, 11))) == [False]
+
+
+def rows(*values):
+    keys = ("date", "start_time", "end_time", "user_id", "project_id")
+    return [dict(zip(keys, row)) for row in values]
+
+
+@pytest.fixture
+def lookups():
+    return {ALICE: ALICE, "alice@example.com": ALICE, BOB: BOB}, {PROJECT: PROJECT, "P": PROJECT}
+
+
+def test_validate_batch_errors(db, lookups):
+    users, projects = lookups
+    valid, errors, _ = ShiftCSVService.validate_batch(
+        db,
+        rows(
+            ("2026-03-02", "9:00", "17:00", ALICE, PROJECT),
+            ("2026-3-2", "09:00", "17:00", ALICE, PROJECT),
+            ("2026-03-02", "9am", "17:00", BOB, PROJECT),
+            ("2026-03-02", "09:00", "25:00", BOB, PROJECT),
+            ("2026-03-03", "17:00", "09:00", BOB, PROJECT),
+            ("2026-03-03", "09:00", "17:00", new_id(), "Q"),
+        ),
+        users,
+        projects,
+    )
+    assert valid.tolist() == [True, False, False, False, False, False]
+    assert dict(errors) == {
+        1: ["date must be YYYY-MM-DD"],
+        2: ["start_time must be HH:MM"],
+        3: ["end_time must be HH:MM"],
+        4: ["end_time must be after start_time"],
+        5: ["unknown user", "unknown project"],
+    }
+
+
+def test_validate_batch_overlaps(db, lookups):
+    users, projects = lookups
+    store_shift(db, BOB, at(2, 9), at(2, 12))
+    valid, errors, columns = ShiftCSVService.validate_batch(
+        db,
+        [
+            {"date": "2026-03-02", "start_time": "09:00", "end_time": "13:00", "user_email": "Alice@example.com", "project_name": "P"},
+            {"date": "2026-03-02", "start_time": "12:00", "end_time": "18:00", "user_id": ALICE, "project_id": PROJECT},
+            {"date": "2026-03-02", "start_time": "12:00", "end_time": "18:00", "user_id": BOB, "project_id": PROJECT},
+            {"date": "2026-03-02", "start_time": "11:00", "end_time": "12:00", "user_id": BOB, "project_id": PROJECT},
+            # Invalid rows take no part in the overlap check
+            {"date": "2026-03-02", "start_time": "10:00", "end_time": "09:00", "user_id": BOB, "project_id": PROJECT},
+        ],
+        users,
+        projects,
+    )
+    assert valid.tolist() == [False, False, True, False, False]
+    assert errors[0] == errors[1] == errors[3] == ["overlaps another shift of this user"]
+    assert 2 not in errors
+    assert columns["user_id"].tolist()[:2] == [ALICE, ALICE]
+    assert columns["start_at"][2] == at(2, 12)
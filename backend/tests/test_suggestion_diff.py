@@ -0,0 +1,124 @@
+from datetime import date, time
+import random
+import uuid
+
+from app.db.types import new_id
+from app.models.optimization import OptimizationAssignment
+from app.services.suggestion_diff import SuggestionDiffService
+
+D1, D2 = date(2026, 3, 2), date(2026, 3, 3)
+NINE, ONE, FIVE = time(9), time(13), time(17)
+
+
+def row(user_id, day, start, end, project_id="p1"):
+    return (user_id, day, start, end, project_id)
+
+
+def item(user_id, day, start, end, project_id="p1"):
+    return {"user_id": user_id, "project_id": project_id, "date": day, "start_time": start, "end_time": end}
+
+
+def diff(a, b):
+    return SuggestionDiffService.diff_rows(sorted(a), sorted(b))
+
+
+def test_identical():
+    rows = [row("alice", D1, NINE, FIVE), row("bob", D1, NINE, ONE), row("bob", D2, NINE, ONE)]
+    result = diff(rows, rows)
+    assert result == {"added": [], "removed": [], "moved": [], "unchanged": 3, "members": []}
+
+
+def test_added_and_removed_groups():
+    a = [row("alice", D1, NINE, FIVE), row("carol", D2, NINE, ONE)]
+    b = [row("alice", D1, NINE, FIVE), row("bob", D1, NINE, ONE)]
+
+    result = diff(a, b)
+
+    assert result["unchanged"] == 1
+    assert result["added"] == [item("bob", D1, NINE, ONE)]
+    assert result["removed"] == [item("carol", D2, NINE, ONE)]
+    assert result["moved"] == []
+    assert result["members"] == [
+        {"user_id": "bob", "hours_a": 0.0, "hours_b": 4.0, "delta_hours": 4.0},
+        {"user_id": "carol", "hours_a": 4.0, "hours_b": 0.0, "delta_hours": -4.0},
+    ]
+
+
+def test_project_change_is_a_move():
+    result = diff([row("alice", D1, NINE, FIVE, "p1")], [row("alice", D1, NINE, FIVE, "p2")])
+
+    assert result["moved"] == [
+        {"before": item("alice", D1, NINE, FIVE, "p1"), "after": item("alice", D1, NINE, FIVE, "p2")}
+    ]
+    assert result["added"] == result["removed"] == []
+    # Same hours, but the member's schedule changed
+    assert result["members"] == [{"user_id": "alice", "hours_a": 8.0, "hours_b": 8.0, "delta_hours": 0.0}]
+
+
+def test_same_time_pairs_are_matched_first():
+    a = [row("alice", D1, NINE, ONE, "p1"), row("alice", D1, ONE, FIVE, "p1")]
+    b = [row("alice", D1, NINE, time(12), "p1"), row("alice", D1, ONE, FIVE, "p2")]
+
+    result = diff(a, b)
+
+    assert result["moved"] == [
+        {"before": item("alice", D1, ONE, FIVE, "p1"), "after": item("alice", D1, ONE, FIVE, "p2")},
+        {"before": item("alice", D1, NINE, ONE, "p1"), "after": item("alice", D1, NINE, time(12), "p1")},
+    ]
+    assert result["members"][0]["delta_hours"] == -1.0
+
+
+def test_leftovers_in_a_group():
+    a = [row("alice", D1, NINE, ONE)]
+    b = [row("alice", D1, time(10), ONE), row("alice", D1, time(14), FIVE)]
+
+    result = diff(a, b)
+
+    assert result["moved"] == [{"before": item("alice", D1, NINE, ONE), "after": item("alice", D1, time(10), ONE)}]
+    assert result["added"] == [item("alice", D1, time(14), FIVE)]
+    assert result["removed"] == []
+
+
+def test_interleaved_groups_merge_in_order():
+    a = [row(u, d, NINE, ONE) for u in ("a", "c", "e") for d in (D1, D2)]
+    b = [row(u, d, NINE, ONE) for u in ("b", "c", "d") for d in (D1, D2)]
+
+    result = diff(a, b)
+
+    assert result["unchanged"] == 2
+    assert [(x["user_id"], x["date"]) for x in result["removed"]] == [("a", D1), ("a", D2), ("e", D1), ("e", D2)]
+    assert [(x["user_id"], x["date"]) for x in result["added"]] == [("b", D1), ("b", D2), ("d", D1), ("d", D2)]
+    assert [m["user_id"] for m in result["members"]] == ["a", "b", "d", "e"]
+
+
+def test_diff_loads_rows_in_merge_order(db):
+    # Stored GUIDs must come back in the order diff_rows compares them
+    users = [str(uuid.uuid4()) for _ in range(20)]
+    suggestion_a, suggestion_b, project_id = new_id(), new_id(), new_id()
+    rows_a = [row(u, d, NINE, ONE, project_id) for u in users for d in (D1, D2)]
+    first = min(rows_a)
+    rows_b = [r for r in rows_a if r != first] + [row(first[0], D1, ONE, FIVE, project_id)]
+    stored = [(suggestion_a, r) for r in rows_a] + [(suggestion_b, r) for r in rows_b]
+    random.Random(1).shuffle(stored)
+    for suggestion_id, (user_id, day, start, end, _) in stored:
+        db.add(
+            OptimizationAssignment(
+                id=new_id(),
+                suggestion_id=suggestion_id,
+                user_id=user_id,
+                project_id=project_id,
+                date=day,
+                start_time=start,
+                end_time=end,
+            )
+        )
+    db.flush()
+
+    loaded = SuggestionDiffService.load_rows(db, suggestion_a)
+    assert loaded == sorted(rows_a)
+
+    result = SuggestionDiffService.diff(db, suggestion_a, suggestion_b)
+    assert result["unchanged"] == len(rows_a) - 1
+    assert len(result["moved"]) == 1
+    assert result["moved"][0]["before"] == item(*first[:4], project_id)
+    assert result["added"] == result["removed"] == []